@@ -1,20 +1,39 @@
+from .startup_profile import startup_profile
+
+import asyncio
 from contextlib import asynccontextmanager
+from functools import cache
 
+import httpx
 from fastmcp import FastMCP
 from openremote_client.schemas import ExternalServiceSchema
-from starlette.templating import Jinja2Templates
 
-from services.openremote_service import init_openremote_service
-from .config import config
-from .health import init_health
-from .services import init_services
+from services.leader_election import create_leader_election
+from services.openremote_service import create_openremote_client, register_openremote_service, start_leader_election, close_openremote_service, DEFAULT_TARGET
+from services.resilience import RetryPolicy, UpstreamResilience
+from services.upstream_limiter import UpstreamLimiter
+from .config import config, OpenRemoteTarget
+from .health import init_health, health_prober
+from .metrics import init_metrics
+from .middleware import init_middleware
+from .services import init_services, prefetch_asset_infos
 import json
 
+startup_profile.mark("import")
+
 mcp = FastMCP("OpenRemote Tools")
 
+@cache
+def templates():
+    # Only needed for the homepage, so Jinja2 isn't imported on startup
+    from starlette.templating import Jinja2Templates
+
+    return Jinja2Templates(directory="templates")
+
+
 @mcp.custom_route("/", methods=['GET'])
 async def homepage(request):
-    return Jinja2Templates(directory="templates").TemplateResponse(
+    return templates().TemplateResponse(
         "index.html",
         {
             "request": request,
@@ -25,8 +44,10 @@ async def homepage(request):
     )
 
 init_health(mcp)
+init_metrics(mcp)
+init_middleware(mcp)
 
-app = mcp.http_app()
+app = mcp.http_app(stateless_http=config.stateless_http)
 
 
 def extend_lifespan(original_lifespan):
@@ -38,24 +59,89 @@ def extend_lifespan(original_lifespan):
     async def combined_lifespan(app):
         # Run FastMCP's original lifespan (manages session manager)
         async with original_lifespan(app):
-            # Init OpenRemote service
-            await init_openremote_service(
-                host=str(config.openremote_url),
-                client_id=config.openremote_client_id,
-                client_secret=config.openremote_client_secret,
-                verify_SSL=config.openremote_verify_ssl,
-                service_schema=ExternalServiceSchema(
-                    serviceId=config.openremote_service_id,
-                    label="MCP-Server",
-                    homepageUrl=config.app_homepage_url,
-                    status="AVAILABLE",
+            # Init OpenRemote services, the default target and any additional managers
+            targets = {
+                DEFAULT_TARGET: OpenRemoteTarget(
+                    url=config.openremote_url,
+                    client_id=config.openremote_client_id,
+                    client_secret=config.openremote_client_secret,
+                    verify_ssl=config.openremote_verify_ssl,
+                    realms=config.openremote_realms,
+                ),
+                **config.openremote_targets,
+            }
+
+            service_schema = ExternalServiceSchema(
+                serviceId=config.openremote_service_id,
+                label="MCP-Server",
+                homepageUrl=config.app_homepage_url,
+                status="AVAILABLE",
+            )
+            clients = {
+                name: create_openremote_client(
+                    host=str(target.url),
+                    client_id=target.client_id,
+                    client_secret=target.client_secret,
+                    verify_SSL=target.verify_ssl,
+                    limits=httpx.Limits(
+                        max_connections=config.openremote_pool_max_connections,
+                        max_keepalive_connections=config.openremote_pool_max_keepalive,
+                        keepalive_expiry=config.openremote_pool_keepalive_expiry,
+                    ),
+                    timeout=httpx.Timeout(config.openremote_timeout, connect=config.openremote_connect_timeout),
+                    http2=config.openremote_http2,
+                    token_refresh_margin=config.openremote_token_refresh_margin,
+                    # One limiter per manager, each adapts to the load of its own manager
+                    limiter=UpstreamLimiter(
+                        max_concurrency=config.upstream_concurrency,
+                        class_concurrency=config.upstream_class_concurrency,
+                        latency_target=config.upstream_latency_target,
+                        queue_timeout=config.upstream_queue_timeout,
+                    ) if config.upstream_concurrency > 0 else None,
+                    resilience=UpstreamResilience(
+                        retry=RetryPolicy(config.upstream_retry_attempts, config.upstream_retry_base_delay, config.upstream_retry_max_delay),
+                        failure_threshold=config.upstream_breaker_failure_threshold,
+                        reset_timeout=config.upstream_breaker_reset_timeout,
+                    ),
                 )
+                for name, target in targets.items()
+            }
+
+            # Only the leader of the workers (or replicas) registers and sends heartbeats
+            leader_election = create_leader_election(config.leader_election, config.app_leader_lock_path)
+            leader = await leader_election.try_acquire()
+
+            # Register with every manager while the asset infos are fetched, rather than one after the other
+            await asyncio.gather(
+                startup_profile.measure("registration", asyncio.gather(*(
+                    register_openremote_service(
+                        client,
+                        service_schema,
+                        heartbeat_interval=config.openremote_heartbeat_interval,
+                        target=name,
+                        realms=targets[name].realms,
+                        leader=leader,
+                    )
+                    for name, client in clients.items()
+                ))),
+                startup_profile.measure("asset_info_fetch", prefetch_asset_infos(clients[DEFAULT_TARGET])),
             )
 
-            await init_services(mcp)
+            health_prober.start()
+            start_leader_election(leader_election, config.openremote_heartbeat_interval)
+
+            with startup_profile.phase("services"):
+                await init_services(mcp)
+
+            startup_profile.ready()
+            if config.app_startup_profile:
+                startup_profile.log()
 
             yield
 
+            await close_openremote_service()
+            await leader_election.release()
+
     return combined_lifespan
 
 app.router.lifespan_context = extend_lifespan(app.router.lifespan_context)
\ No newline at end of file
@@ -1,11 +1,23 @@
-from pydantic import HttpUrl
+from pathlib import Path
+
+from pydantic import BaseModel, HttpUrl, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 import logging
 
+from .startup_profile import startup_profile
+
 
 logger = logging.getLogger("uvicorn")
 
+class OpenRemoteTarget(BaseModel):
+    url: HttpUrl
+    client_id: str
+    client_secret: str
+    verify_ssl: bool = True
+    realms: list[str] = []
+
+
 class Config(BaseSettings):
     model_config = SettingsConfigDict(
         env_file='.env',
@@ -15,7 +27,12 @@ class Config(BaseSettings):
     )
 
     app_debug: bool = False
+    app_startup_profile: bool = False
     app_homepage_url: str = 'http://localhost:8420/'
+    app_workers: int = 1
+    app_stateless_http: bool = False
+    app_leader_election: str | None = None
+    app_leader_lock_path: str = '.cache/leader.lock'
 
     openremote_url: HttpUrl
     openremote_client_id: str
@@ -23,9 +40,74 @@ class Config(BaseSettings):
     openremote_verify_ssl: bool = True
     openremote_service_id: str = 'MCP-Server'
     openremote_heartbeat_interval: int = 30
+    openremote_pool_max_connections: int = 100
+    openremote_pool_max_keepalive: int = 20
+    openremote_pool_keepalive_expiry: float = 30
+    openremote_http2: bool = False
+    openremote_timeout: float = 30
+    openremote_connect_timeout: float = 10
+    openremote_token_refresh_margin: int = 30
+    openremote_realms: list[str] = []
+    openremote_targets: dict[str, OpenRemoteTarget] = {}
+
+    upstream_concurrency: int = 64
+    upstream_class_concurrency: dict[str, int] = {"query": 16, "write": 16}
+    upstream_latency_target: float = 2.0
+    upstream_queue_timeout: float = 10
+    upstream_retry_attempts: int = 3
+    upstream_retry_base_delay: float = 0.2
+    upstream_retry_max_delay: float = 2.0
+    upstream_breaker_failure_threshold: int = 5
+    upstream_breaker_reset_timeout: float = 30
+
+    health_probe_interval: int = 10
+    health_probe_timeout: float = 5
+
+    coalescing: bool = True
+    coalescing_ttl: float = 1.0
+
+    result_encoding: bool = True
+    result_encoding_tabular: bool = False
+
+    cache_max_size: int = 256
+    cache_asset_model_ttl: int = 300
+    cache_realm_ttl: int = 300
+    cache_ruleset_ttl: int = 5
+    cache_ruleset_max_size: int = 500
+    cache_shared: str | None = None
+    cache_shared_path: str = '.cache/metadata'
+
+    asset_tools_lazy: bool = False
+    asset_snapshot_path: str | None = '.cache/asset_models.json'
+    asset_tools_refresh_interval: int = 300
+    asset_query_max_page_size: int = 500
+    asset_query_realm_concurrency: int = 8
+    asset_write_batch_size: int = 100
+    asset_create_concurrency: int = 8
+    asset_index_ttl: int = 300
+
+    attribute_cache_enabled: bool = False
+    attribute_cache_max_assets: int = 100
+
+    @field_validator('app_leader_lock_path', 'cache_shared_path')
+    @classmethod
+    def resolve_shared_path(cls, path: str) -> str:
+        # Relative to the project rather than the working directory, all workers must use the same path
+        return str(Path(__file__).resolve().parent.parent / path)
+
+    @property
+    def stateless_http(self) -> bool:
+        """Without server side session state, requests of a session can be served by any worker (or replica)."""
+        return self.app_stateless_http or self.app_workers > 1
+
+    @property
+    def leader_election(self) -> str:
+        """A single process doesn't need an election."""
+        return self.app_leader_election or ('file' if self.app_workers > 1 else 'none')
 
 
-config = Config()
+with startup_profile.phase("config"):
+    config = Config()
 
 if config.app_debug:
     logging.basicConfig(level=logging.DEBUG)
\ No newline at end of file
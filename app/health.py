@@ -1,24 +1,157 @@
+import asyncio
+import logging
+import time
+
 from fastmcp import FastMCP
-from httpx import HTTPStatusError
 from starlette.responses import JSONResponse
 
-from services.openremote_service import get_openremote_service
+from services.openremote_client import PooledOpenRemoteClient
+from services.openremote_service import OpenRemoteService, get_openremote_services, fan_out
 from .config import config
+from .startup_profile import startup_profile
+from .utils import metadata_cache
+
+logger = logging.getLogger("uvicorn")
 
 mcp_health = FastMCP("Health Check")
 
 
+class UpstreamStatus:
+    def __init__(self):
+        self.ok: bool | None = None
+        self.latency: float | None = None
+        self.error: str | None = None
+        self.checked_at: float | None = None
+
+
+class HealthProber:
+    """
+    Probes the OpenRemote managers in the background and caches the result, so health checks are served
+    locally instead of each one calling OpenRemote.
+    """
+
+    def __init__(self, interval: int, timeout: float):
+        self.interval = interval
+        self.timeout = timeout
+        self.__task: asyncio.Task | None = None
+
+        self.upstreams: dict[str, UpstreamStatus] = {}
+
+    async def __probe_target(self, openremote_service: OpenRemoteService):
+        upstream = self.upstreams.setdefault(openremote_service.target, UpstreamStatus())
+        started = time.perf_counter()
+
+        try:
+            await asyncio.wait_for(openremote_service.client.status.get_health_status(), self.timeout)
+        except Exception as e:
+            upstream.ok = False
+            upstream.error = str(e) or type(e).__name__
+        else:
+            upstream.ok = True
+            upstream.error = None
+        finally:
+            upstream.latency = time.perf_counter() - started
+            upstream.checked_at = time.time()
+
+    async def probe(self):
+        await fan_out(self.__probe_target)
+
+    async def __probe_loop(self):
+        while True:
+            try:
+                await self.probe()
+            except Exception as e:
+                logger.debug(f"Health probe failed: {e}")
+
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self.__task is None:
+            self.__task = asyncio.create_task(self.__probe_loop())
+
+    def is_stale(self, upstream: UpstreamStatus) -> bool:
+        return upstream.checked_at is None or time.time() - upstream.checked_at > self.interval * 3
+
+    def target_status(self, openremote_service: OpenRemoteService) -> dict:
+        upstream = self.upstreams.get(openremote_service.target, UpstreamStatus())
+        ready = upstream.ok is True and not self.is_stale(upstream) and openremote_service.last_heartbeat_ok is not False
+        resilience = openremote_service.client.http_client.resilience if isinstance(openremote_service.client, PooledOpenRemoteClient) else None
+
+        return {
+            "ready": ready,
+            "upstream": {
+                "ok": upstream.ok,
+                "latency_ms": round(upstream.latency * 1000, 1) if upstream.latency is not None else None,
+                "error": upstream.error,
+                "checked_at": upstream.checked_at,
+                "stale": self.is_stale(upstream),
+            },
+            "heartbeat": {
+                "leader": openremote_service.is_leader,
+                "ok": openremote_service.last_heartbeat_ok,
+                "sent_at": openremote_service.last_heartbeat_at,
+                "registrations": openremote_service.registrations,
+            },
+            "circuit_breakers": resilience.stats()["breakers"] if resilience is not None else {},
+        }
+
+    def status(self) -> dict:
+        targets = {target: self.target_status(openremote_service) for target, openremote_service in get_openremote_services().items()}
+
+        return {
+            "ready": bool(targets) and all(target["ready"] for target in targets.values()),
+            "targets": targets,
+        }
+
+
+health_prober = HealthProber(config.health_probe_interval, config.health_probe_timeout)
+
+
+@mcp_health.custom_route("/api/health/live", methods=['GET'])
+async def live(request):
+    return JSONResponse({"status": "alive", "service_id": config.openremote_service_id}, status_code=200)
+
+
+@mcp_health.custom_route("/api/health/ready", methods=['GET'])
+async def ready(request):
+    status = health_prober.status()
+
+    return JSONResponse(
+        {"status": "ready" if status["ready"] else "unready", "service_id": config.openremote_service_id, **status},
+        status_code=200 if status["ready"] else 503
+    )
+
+
 @mcp_health.custom_route("/api/health", methods=['GET'])
 async def health(request):
-    openremote_service = get_openremote_service()
+    # Imported here so importing the health routes doesn't load the services
+    from .services.asset import live_attributes, create_validation_stats
+    from .services.rule import ruleset_cache
+
+    status = health_prober.status()
+
+    stats = {"cache": metadata_cache.stats(), "create_validation": dict(create_validation_stats), "ruleset_cache": ruleset_cache.stats(), "pool": {}, "auth": {}, "limiter": {}}
+    for target, openremote_service in get_openremote_services().items():
+        if isinstance(openremote_service.client, PooledOpenRemoteClient):
+            stats["pool"][target] = openremote_service.client.http_client.stats()
+            stats["auth"][target] = openremote_service.client.token_manager.stats()
+            if openremote_service.client.http_client.limiter is not None:
+                stats["limiter"][target] = openremote_service.client.http_client.limiter.stats()
+
+    if config.app_startup_profile:
+        stats["startup"] = startup_profile.report()
+
+    if live_attributes:
+        stats["attribute_cache"] = {
+            target: {**cache.stats(), "connected": stream.connected, "events": stream.events}
+            for target, (cache, stream) in live_attributes.items()
+        }
 
-    try:
-        await openremote_service.client.status.get_health_status()
-    except HTTPStatusError:
-        return JSONResponse({"status": "unhealthy", "service_id": config.openremote_service_id, "error": "Failed to connect to OpenRemote"}, status_code=200)
+    if not status["ready"]:
+        return JSONResponse({"status": "unhealthy", "service_id": config.openremote_service_id, "error": "Failed to connect to OpenRemote", **status, **stats}, status_code=200)
 
-    return JSONResponse({"status": "healthy", "service_id": config.openremote_service_id}, status_code=200)
+    return JSONResponse({"status": "healthy", "service_id": config.openremote_service_id, **status, **stats}, status_code=200)
 
 
 def init_health(mcp: FastMCP):
-    mcp.mount(mcp_health)
\ No newline at end of file
+    mcp.mount(mcp_health)
@@ -0,0 +1,185 @@
+from fastmcp import FastMCP
+from starlette.responses import PlainTextResponse
+
+from services.openremote_client import PooledOpenRemoteClient
+from services.openremote_service import get_openremote_services
+from .middleware import metrics, coalescing
+from .utils import metadata_cache
+
+mcp_metrics = FastMCP("Metrics")
+
+
+def _labels(**labels: str) -> str:
+    if not labels:
+        return ""
+
+    escaped = (
+        f'{key}="{str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")}"'
+        for key, value in labels.items()
+    )
+
+    return "{" + ",".join(escaped) + "}"
+
+
+class MetricsWriter:
+    """Minimal writer for the Prometheus text exposition format."""
+
+    def __init__(self):
+        self.lines: list[str] = []
+
+    def metric(self, name: str, kind: str, description: str):
+        self.lines.append(f"# HELP {name} {description}")
+        self.lines.append(f"# TYPE {name} {kind}")
+
+    def sample(self, name: str, value: float | int | None, **labels: str):
+        if value is not None:
+            self.lines.append(f"{name}{_labels(**labels)} {value}")
+
+    def histogram(self, name: str, histogram, **labels: str):
+        for bound, count in histogram.cumulative():
+            self.sample(f"{name}_bucket", count, **labels, le=bound)
+        self.sample(f"{name}_sum", round(histogram.sum, 6), **labels)
+        self.sample(f"{name}_count", histogram.count, **labels)
+
+    def render(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def _write_tool_metrics(writer: MetricsWriter):
+    writer.metric("mcp_tool_calls_total", "counter", "Number of tool calls.")
+    for tool, tool_metrics in metrics.tools.items():
+        writer.sample("mcp_tool_calls_total", tool_metrics.calls, tool=tool)
+
+    writer.metric("mcp_tool_errors_total", "counter", "Number of tool calls that raised an error.")
+    for tool, tool_metrics in metrics.tools.items():
+        writer.sample("mcp_tool_errors_total", tool_metrics.errors, tool=tool)
+
+    writer.metric("mcp_tool_upstream_requests_total", "counter", "Number of OpenRemote requests made by tool calls.")
+    for tool, tool_metrics in metrics.tools.items():
+        writer.sample("mcp_tool_upstream_requests_total", tool_metrics.upstream_requests, tool=tool)
+
+    writer.metric("mcp_tool_duration_seconds", "histogram", "Tool call latency, split into local overhead and OpenRemote upstream time.")
+    for tool, tool_metrics in metrics.tools.items():
+        writer.histogram("mcp_tool_duration_seconds", tool_metrics.local_seconds, tool=tool, phase="local")
+        writer.histogram("mcp_tool_duration_seconds", tool_metrics.upstream_seconds, tool=tool, phase="upstream")
+
+    writer.metric("mcp_tool_calls_in_flight", "gauge", "Number of tool calls currently being handled.")
+    writer.sample("mcp_tool_calls_in_flight", metrics.in_flight)
+
+    coalescing_stats = coalescing.stats()
+    writer.metric("mcp_coalescing_calls_total", "counter", "Number of read-only tool calls passing the coalescing layer.")
+    writer.sample("mcp_coalescing_calls_total", coalescing_stats["calls"])
+    writer.metric("mcp_coalescing_shared_total", "counter", "Number of read-only tool calls answered with the result of an identical call.")
+    writer.sample("mcp_coalescing_shared_total", coalescing_stats["coalesced"], kind="in_flight")
+    writer.sample("mcp_coalescing_shared_total", coalescing_stats["reused"], kind="recent")
+
+    # Imported here so importing the metrics routes doesn't load the services
+    from .services.asset import create_validation_stats
+
+    writer.metric("mcp_create_validations_total", "counter", "Number of create tool calls validated before calling OpenRemote.")
+    writer.sample("mcp_create_validations_total", create_validation_stats["validated"], outcome="validated")
+    writer.sample("mcp_create_validations_total", create_validation_stats["rejected"], outcome="rejected")
+
+
+def _write_cache_metrics(writer: MetricsWriter):
+    stats = metadata_cache.stats()
+
+    writer.metric("mcp_cache_entries", "gauge", "Number of cached metadata entries.")
+    writer.sample("mcp_cache_entries", stats["size"])
+    writer.metric("mcp_cache_max_entries", "gauge", "Maximum number of cached metadata entries.")
+    writer.sample("mcp_cache_max_entries", stats["max_size"])
+
+    for key, description in (
+            ("hits", "Number of metadata lookups served from the cache."),
+            ("misses", "Number of metadata lookups fetched from OpenRemote."),
+            ("coalesced", "Number of metadata lookups that waited on an in-flight fetch."),
+            ("evictions", "Number of metadata entries evicted to stay within the maximum size."),
+            ("shared_hits", "Number of metadata lookups served from the cache shared by the workers."),
+    ):
+        writer.metric(f"mcp_cache_{key}_total", "counter", description)
+        writer.sample(f"mcp_cache_{key}_total", stats[key])
+
+
+def _write_client_metrics(writer: MetricsWriter, clients: dict[str, PooledOpenRemoteClient]):
+    pools = {target: client.http_client.stats() for target, client in clients.items()}
+    auths = {target: client.token_manager.stats() for target, client in clients.items()}
+
+    writer.metric("openremote_pool_connections", "gauge", "Number of pooled connections to OpenRemote.")
+    for target, pool in pools.items():
+        writer.sample("openremote_pool_connections", pool["active_connections"], target=target, state="active")
+        writer.sample("openremote_pool_connections", pool["idle_connections"], target=target, state="idle")
+
+    for name, key, kind, description in (
+            ("openremote_pool_max_connections", "max_connections", "gauge", "Maximum number of connections to OpenRemote."),
+            ("openremote_requests_total", "requests", "counter", "Number of requests sent to OpenRemote."),
+            ("openremote_requests_in_flight", "in_flight", "gauge", "Number of requests to OpenRemote awaiting a response."),
+            ("openremote_requests_max_in_flight", "max_in_flight", "gauge", "Highest number of concurrent requests to OpenRemote."),
+    ):
+        writer.metric(name, kind, description)
+        for target, pool in pools.items():
+            writer.sample(name, pool[key], target=target)
+
+    for name, key, kind, description in (
+            ("openremote_token_refreshes_total", "refreshes", "counter", "Number of access token refreshes."),
+            ("openremote_token_refresh_failures_total", "refresh_failures", "counter", "Number of failed access token refreshes."),
+            ("openremote_token_refresh_seconds_total", "refresh_seconds_total", "counter", "Total time spent refreshing the access token."),
+            ("openremote_token_refresh_seconds_max", "refresh_seconds_max", "gauge", "Slowest access token refresh."),
+    ):
+        writer.metric(name, kind, description)
+        for target, auth in auths.items():
+            writer.sample(name, auth[key], target=target)
+
+    resiliences = {
+        target: client.http_client.resilience.stats()
+        for target, client in clients.items() if client.http_client.resilience is not None
+    }
+    writer.metric("openremote_retries_total", "counter", "Number of retried requests to OpenRemote.")
+    for target, resilience in resiliences.items():
+        writer.sample("openremote_retries_total", resilience["retries"], target=target)
+
+    writer.metric("openremote_circuit_open", "gauge", "Whether the circuit breaker of an endpoint is open (1), half open (0.5) or closed (0).")
+    for target, resilience in resiliences.items():
+        for endpoint, breaker in resilience["breakers"].items():
+            writer.sample("openremote_circuit_open", {"closed": 0, "half_open": 0.5, "open": 1}[breaker["state"]], target=target, endpoint=endpoint)
+
+    writer.metric("openremote_circuit_short_circuited_total", "counter", "Number of requests to OpenRemote rejected by an open circuit breaker.")
+    for target, resilience in resiliences.items():
+        for endpoint, breaker in resilience["breakers"].items():
+            writer.sample("openremote_circuit_short_circuited_total", breaker["short_circuited"], target=target, endpoint=endpoint)
+
+    limiters = {
+        target: client.http_client.limiter.stats()
+        for target, client in clients.items() if client.http_client.limiter is not None
+    }
+    for name, key, kind, description in (
+            ("openremote_limiter_limit", "limit", "gauge", "Current adaptive concurrency limit of requests to OpenRemote."),
+            ("openremote_limiter_in_flight", "in_flight", "gauge", "Number of requests to OpenRemote holding a limiter slot."),
+            ("openremote_limiter_queued", "queued", "gauge", "Number of requests to OpenRemote waiting for a limiter slot."),
+            ("openremote_limiter_rejected_total", "rejected", "counter", "Number of requests to OpenRemote rejected after the queue deadline."),
+            ("openremote_limiter_decreases_total", "decreases", "counter", "Number of times the concurrency limit was decreased."),
+    ):
+        writer.metric(name, kind, description)
+        for target, limiter in limiters.items():
+            for endpoint_class, stats in limiter.items():
+                if isinstance(stats, dict):
+                    writer.sample(name, stats[key], target=target, endpoint_class=endpoint_class)
+
+
+@mcp_metrics.custom_route("/api/metrics", methods=['GET'])
+async def metrics_endpoint(request):
+    writer = MetricsWriter()
+
+    _write_tool_metrics(writer)
+    _write_cache_metrics(writer)
+
+    _write_client_metrics(writer, {
+        target: openremote_service.client
+        for target, openremote_service in get_openremote_services().items()
+        if isinstance(openremote_service.client, PooledOpenRemoteClient)
+    })
+
+    return PlainTextResponse(writer.render(), media_type="text/plain; version=0.0.4")
+
+
+def init_metrics(mcp: FastMCP):
+    mcp.mount(mcp_metrics)
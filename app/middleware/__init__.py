@@ -0,0 +1,27 @@
+from fastmcp import FastMCP
+
+from services.openremote_service import DEFAULT_TARGET
+from ..config import config
+from .backpressure import BackpressureMiddleware
+from .coalescing import coalescing, CoalescingMiddleware
+from .metrics import metrics, MetricsMiddleware
+from .result_encoding import ResultEncodingMiddleware
+from .session_tracking import session_tracking, SessionTrackingMiddleware
+from .target_routing import TargetRoutingMiddleware
+
+
+def init_middleware(mcp: FastMCP):
+    mcp.add_middleware(metrics)
+    # Sessions only last for a single request when stateless, there are none to notify of changes later on
+    if not config.stateless_http:
+        mcp.add_middleware(session_tracking)
+    mcp.add_middleware(BackpressureMiddleware())
+
+    if config.openremote_targets:
+        mcp.add_middleware(TargetRoutingMiddleware([DEFAULT_TARGET, *config.openremote_targets]))
+
+    if config.coalescing:
+        mcp.add_middleware(coalescing)
+
+    if config.result_encoding:
+        mcp.add_middleware(ResultEncodingMiddleware())
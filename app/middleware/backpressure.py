@@ -0,0 +1,32 @@
+from fastmcp.exceptions import ToolError
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+
+from services.resilience import UpstreamUnavailableError
+from services.upstream_limiter import current_session
+
+
+class BackpressureMiddleware(Middleware):
+    """
+    Queues the upstream requests of a tool call under its MCP session, so the upstream limiter serves sessions
+    fairly, and fails the call with a clear tool error when OpenRemote can't be called (overloaded or short-circuited).
+    """
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        session_id = None
+        if context.fastmcp_context is not None:
+            try:
+                session_id = context.fastmcp_context.session_id
+            except (RuntimeError, ValueError):
+                pass  # No request context available
+
+        token = current_session.set(session_id)
+        try:
+            return await call_next(context)
+        except (ToolError, UpstreamUnavailableError) as e:
+            # Tool errors wrap the original exception, and may mask its message
+            cause = e if isinstance(e, UpstreamUnavailableError) else e.__cause__
+            if isinstance(cause, UpstreamUnavailableError):
+                raise ToolError(str(cause)) from cause
+            raise
+        finally:
+            current_session.reset(token)
@@ -0,0 +1,106 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Hashable
+
+from fastmcp.server.dependencies import get_access_token
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+from fastmcp.tools.tool import ToolResult
+
+from services.openremote_service import current_target
+from ..config import config
+from ..utils import SingleFlight
+
+
+class CoalescingMiddleware(Middleware):
+    """
+    Shares the result of identical calls to read-only tools (tool name, target, access token and arguments),
+    concurrent calls wait for the first one and results are reused for `ttl` seconds. Tools without the `readOnlyHint`
+    annotation (e.g. create and write tools) always bypass it.
+    Any call to a tool that isn't read-only drops the reusable results, so reads following a write see its effect.
+    """
+
+    def __init__(self, ttl: float = 1.0, max_size: int = 1024):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.__results: OrderedDict[Hashable, tuple[float, ToolResult]] = OrderedDict()
+        self.__pending = SingleFlight()
+        self.__read_only: dict[str, bool] = {}
+        self.__generation = 0
+
+        self.calls = 0
+        self.reused = 0
+        self.coalesced = 0
+
+    async def __is_read_only(self, context: MiddlewareContext) -> bool:
+        name = context.message.name
+        if name not in self.__read_only:
+            if context.fastmcp_context is None:
+                return False
+
+            tool = await context.fastmcp_context.fastmcp.get_tool(name)
+            self.__read_only[name] = bool(tool.annotations and tool.annotations.readOnlyHint)
+
+        return self.__read_only[name]
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        if not await self.__is_read_only(context):
+            try:
+                return await call_next(context)
+            finally:
+                self.__generation += 1
+                self.__results.clear()
+
+        self.calls += 1
+        key = self.__key(context)
+
+        entry = self.__results.get(key)
+        if entry is not None:
+            expires_on, result = entry
+            if time.monotonic() < expires_on:
+                self.reused += 1
+                return result
+            del self.__results[key]
+
+        if key in self.__pending:
+            self.coalesced += 1
+
+        generation = self.__generation
+        return await self.__pending.run(key, lambda: self.__call(key, context, call_next, generation))
+
+    @staticmethod
+    def __key(context: MiddlewareContext) -> Hashable:
+        # Results are only shared between callers with the same access, and calls routed to the same manager.
+        # When routing runs after this middleware instead, the 'target' is still part of the arguments
+        access_token = get_access_token()
+
+        return (
+            context.message.name,
+            current_target.get(),
+            hashlib.sha256(access_token.token.encode()).hexdigest() if access_token is not None else None,
+            json.dumps(context.message.arguments or {}, sort_keys=True, separators=(',', ':'), default=str),
+        )
+
+    async def __call(self, key: Hashable, context: MiddlewareContext, call_next, generation: int) -> ToolResult:
+        result = await call_next(context)
+
+        # Don't keep results of reads that overlapped with a write
+        if self.ttl > 0 and generation == self.__generation:
+            self.__results[key] = (time.monotonic() + self.ttl, result)
+            while len(self.__results) > self.max_size:
+                self.__results.popitem(last=False)
+
+        return result
+
+    def invalidate(self):
+        """Forget the results and which tools are read-only, e.g. after tools were replaced."""
+        self.__generation += 1
+        self.__results.clear()
+        self.__read_only.clear()
+
+    def stats(self) -> dict:
+        return {"calls": self.calls, "reused": self.reused, "coalesced": self.coalesced, "size": len(self.__results)}
+
+
+coalescing = CoalescingMiddleware(config.coalescing_ttl)
@@ -0,0 +1,79 @@
+import time
+from bisect import bisect_left
+
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+
+from services.openremote_client import UpstreamTimer, upstream_timer
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Cumulative histogram in the Prometheus sense, the last bucket counts everything (+Inf)."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        total = 0
+        result = []
+        for bound, count in zip([*map(str, self.buckets), "+Inf"], self.counts):
+            total += count
+            result.append((bound, total))
+
+        return result
+
+
+class ToolMetrics:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.upstream_requests = 0
+        self.local_seconds = Histogram()
+        self.upstream_seconds = Histogram()
+
+
+class MetricsMiddleware(Middleware):
+    """
+    Records call counts, errors and latency of every tool call, split into local overhead and the time
+    spent waiting on OpenRemote.
+    """
+
+    def __init__(self):
+        self.tools: dict[str, ToolMetrics] = {}
+        self.in_flight = 0
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        metrics = self.tools.setdefault(context.message.name, ToolMetrics())
+        timer = UpstreamTimer()
+        token = upstream_timer.set(timer)
+
+        self.in_flight += 1
+        started = time.perf_counter()
+        try:
+            return await call_next(context)
+        except Exception:
+            metrics.errors += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self.in_flight -= 1
+            upstream_timer.reset(token)
+
+            # Concurrent upstream requests can add up to more than the elapsed time
+            upstream = min(timer.seconds, elapsed)
+            metrics.calls += 1
+            metrics.upstream_requests += timer.requests
+            metrics.local_seconds.observe(elapsed - upstream)
+            metrics.upstream_seconds.observe(upstream)
+
+
+metrics = MetricsMiddleware()
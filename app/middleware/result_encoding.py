@@ -0,0 +1,72 @@
+import json
+import logging
+
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+from fastmcp.tools.tool import ToolResult
+from mcp.types import TextContent
+
+from ..config import config
+from ..utils import compact, tabulate, encode_json
+
+logger = logging.getLogger("uvicorn")
+
+
+class ResultEncodingMiddleware(Middleware):
+    """
+    Re-encodes the JSON text results of every tool into a compact form, dropping nested nulls, empty values and
+    response metadata, optionally encoding lists of objects as tables. Structured content is compacted as well,
+    unless the tool has an output schema.
+    """
+
+    def __init__(self):
+        self.__output_schemas: dict[str, bool] = {}
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        result: ToolResult = await call_next(context)
+
+        original_size = 0
+        encoded_size = 0
+        content = []
+        for block in result.content:
+            if not isinstance(block, TextContent):
+                content.append(block)
+                continue
+
+            try:
+                value = json.loads(block.text)
+            except ValueError:
+                content.append(block)
+                continue
+
+            value = compact(value)
+            if config.result_encoding_tabular:
+                value = tabulate(value)
+
+            text = encode_json(value)
+            original_size += len(block.text)
+            encoded_size += len(text)
+            content.append(block.model_copy(update={"text": text}))
+
+        if encoded_size:
+            logger.debug(f"Encoded result of '{context.message.name}': {original_size} -> {encoded_size} bytes")
+
+        structured_content = result.structured_content
+        if structured_content is not None and not await self.__has_output_schema(context):
+            # Compacted like the text content, dropped when it no longer is an object (e.g. an unwrapped list)
+            structured_content = compact(structured_content)
+            if not isinstance(structured_content, dict):
+                structured_content = None
+
+        return ToolResult(content=content, structured_content=structured_content)
+
+    async def __has_output_schema(self, context: MiddlewareContext) -> bool:
+        """Structured content of tools with an output schema must match it, so it is left as is."""
+        name = context.message.name
+        if name not in self.__output_schemas:
+            if context.fastmcp_context is None:
+                return True
+
+            tool = await context.fastmcp_context.fastmcp.get_tool(name)
+            self.__output_schemas[name] = tool.output_schema is not None
+
+        return self.__output_schemas[name]
@@ -0,0 +1,40 @@
+import logging
+import weakref
+
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+from mcp.server.session import ServerSession
+
+logger = logging.getLogger("uvicorn")
+
+
+class SessionTrackingMiddleware(Middleware):
+    """Keeps track of the connected MCP sessions, so notifications can be sent outside of a request."""
+
+    def __init__(self):
+        self.sessions: weakref.WeakSet[ServerSession] = weakref.WeakSet()
+
+    async def on_request(self, context: MiddlewareContext, call_next):
+        if context.fastmcp_context is not None:
+            try:
+                self.sessions.add(context.fastmcp_context.session)
+            except ValueError:
+                pass  # No request context available
+
+        return await call_next(context)
+
+    async def notify_tool_list_changed(self):
+        """Send a `tools/list_changed` notification to every connected session."""
+        sessions = list(self.sessions)
+
+        for session in sessions:
+            try:
+                await session.send_tool_list_changed()
+            except Exception as e:
+                # The session has most likely been closed
+                logger.debug(f"Failed to notify session: {e}")
+                self.sessions.discard(session)
+
+        logger.debug(f"Sent tools/list_changed to {len(sessions)} session(s)")
+
+
+session_tracking = SessionTrackingMiddleware()
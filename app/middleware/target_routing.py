@@ -0,0 +1,61 @@
+from fastmcp.exceptions import ToolError
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+
+from services.openremote_service import current_target, resolve_target
+
+
+def _realm_of(arguments: dict) -> str | None:
+    """Realm a tool call is about, e.g. the realm of a created asset or the realm predicate of a query."""
+    for key in ("realm", "realm_name"):
+        if isinstance(arguments.get(key), str):
+            return arguments[key]
+
+    for value in arguments.values():
+        if isinstance(value, dict) and isinstance(value.get("realm"), dict):
+            return value["realm"].get("name")
+
+    return None
+
+
+class TargetRoutingMiddleware(Middleware):
+    """
+    Routes tool calls to one of multiple OpenRemote managers, using the 'target' argument that is added to
+    every tool, or else the manager the realm of the call is mapped to.
+    """
+
+    def __init__(self, targets: list[str]):
+        self.targets = targets
+
+    async def on_list_tools(self, context: MiddlewareContext, call_next):
+        tools = await call_next(context)
+
+        target_property = {
+            "type": "string",
+            "enum": self.targets,
+            "description": "OpenRemote manager to use, defaults to the manager of the realm or the default manager.",
+        }
+
+        return [
+            tool.model_copy(update={
+                "parameters": {
+                    **tool.parameters,
+                    "properties": {**tool.parameters.get("properties", {}), "target": target_property},
+                }
+            })
+            for tool in tools
+        ]
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        arguments = dict(context.message.arguments or {})
+        target = arguments.pop("target", None) or resolve_target(_realm_of(arguments))
+
+        if target is not None and target not in self.targets:
+            raise ToolError(f"Unknown target '{target}', available targets are {self.targets}")
+
+        context = context.copy(message=context.message.model_copy(update={"arguments": arguments}))
+
+        token = current_target.set(target)
+        try:
+            return await call_next(context)
+        finally:
+            current_target.reset(token)
@@ -1,13 +1,15 @@
 from fastmcp import FastMCP
 
-from .asset import init_asset_service
+from .asset import init_asset_service, prefetch_asset_infos
 from .asset_model import asset_model_mcp
+from .hierarchy import hierarchy_mcp
 from .realm import realm_mcp
-#from .rule import rule_mcp
+from .rule import rule_mcp
 
 
 async def init_services(mcp_app: FastMCP):
     await init_asset_service(mcp_app)
     await mcp_app.import_server(asset_model_mcp, prefix="asset_model")
     await mcp_app.import_server(realm_mcp, prefix="realm")
-    #await mcp_app.import_server(rule_mcp, prefix="rule")
+    await mcp_app.import_server(hierarchy_mcp, prefix="hierarchy")
+    await mcp_app.import_server(rule_mcp, prefix="rule")
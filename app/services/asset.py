@@ -1,49 +1,335 @@
+import asyncio
 import logging
-
-from fastmcp import FastMCP
+import os
+import resource
+import time
+from functools import partial, lru_cache
+from itertools import islice
+from typing import Annotated, Any
+
+from fastmcp import FastMCP, Context
 from fastmcp.tools import Tool
 from fastmcp.tools.tool_transform import ArgTransform
 from httpx import HTTPStatusError
-from openremote_client.schemas import AssetQuerySchema, RealmPredicateSchema, AssetObjectSchema
-from pydantic import Field, BaseModel
-
-from services.openremote_service import get_openremote_service
-from app.utils import asset_attribute_model_factory
+from mcp.types import ToolAnnotations
+from openremote_client import OpenRemoteClient
+from openremote_client.schemas import AssetQuerySchema, RealmPredicateSchema, AssetObjectSchema, AttributeStateSchema, AttributeRefSchema, SelectSchema
+from pydantic import Field, BaseModel, TypeAdapter, ValidationError
+
+from services.attribute_event_stream import AttributeEventStream
+from services.openremote_service import OpenRemoteService, get_openremote_service, get_openremote_services, fan_out, DEFAULT_TARGET
+from app.config import config
+from app.startup_profile import startup_profile
+from app.middleware import session_tracking, coalescing
+from app.services.hierarchy import observe_assets, forget_asset
+from app.utils import asset_attribute_model_factory, metadata_cache, content, json_content, LazyTool, hash_asset_infos, load_asset_model_snapshot, save_asset_model_snapshot, hash_query, encode_cursor, decode_cursor, run_in_background, AttributeValueCache, CachedAsset, CachedAttribute, SingleFlight
 
 logger = logging.getLogger("uvicorn")
 
 asset_mcp = FastMCP("Asset Service")
 
+# Content hash and attribute descriptors per asset type, filled by `sync_asset_tools`
+asset_info_hashes: dict[str, str] = {}
+asset_attribute_descriptors: dict[str, list] = {}
+# Compiled attribute models per asset type, see `get_asset_attribute_model`
+asset_attribute_models: dict[str, type[BaseModel]] = {}
+# Built create tools per asset type, see `get_create_tool`
+asset_create_tools: dict[str, Tool] = {}
+# Outcome of the local validation of create calls, rejected calls never reach OpenRemote
+create_validation_stats: dict[str, int] = {"validated": 0, "rejected": 0}
+# Live attribute values and the event stream updating them per target, see `get_live_attributes`
+live_attributes: dict[str, tuple[AttributeValueCache, AttributeEventStream]] = {}
+# Snapshot fetches of attribute values in progress per (target, asset id), see `_load_attribute_values`
+attribute_snapshots = SingleFlight()
+
 
 class AssetQuerySchemaDescription(AssetQuerySchema):
     types: list[str] | None = Field(default=None, description="Asset types to query, (Make sure to use the 'get_all_asset_types' tool to gather which types there are)")
     realm: RealmPredicateSchema | None = Field(default=None, description="Realm to query (Make sure to use the 'get_all_realms' tool to now which realms to query)")
 
-@asset_mcp.tool
-async def query(asset_query_schema: AssetQuerySchemaDescription):
+def _project_asset(asset: AssetObjectSchema, fields: list[str] | None, attributes: list[str] | None) -> dict:
+    """Reduce an asset to the requested fields and attributes, the id is always included."""
+    projected = {"id": asset.id}
+    for field in fields or AssetObjectSchema.model_fields:
+        projected[field] = getattr(asset, field, None)
+
+    if attributes is not None:
+        asset_attributes = asset.attributes or {}
+        projected["attributes"] = {name: asset_attributes[name] for name in attributes if name in asset_attributes}
+    elif fields:
+        # All attributes unless they are filtered, also when only some fields are requested
+        projected["attributes"] = asset.attributes
+
+    return projected
+
+
+@asset_mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
+async def query(
+        asset_query_schema: AssetQuerySchemaDescription,
+        cursor: str | None = Field(default=None, description="Cursor of the page to fetch, use the 'next_cursor' of the previous page together with the same query."),
+        page_size: int = Field(default=100, ge=1, description="Maximum number of assets to return in this page."),
+        fields: list[str] | None = Field(default=None, description="Only return these asset fields (e.g. name, type, parentId), all fields are returned if omitted."),
+        attributes: list[str] | None = Field(default=None, description="Only return these attributes of each asset, all attributes are returned if omitted."),
+):
     """
-    Lists all assets available.
+    Lists the assets matching the query, one page at a time.
+
+    The result always contains 'assets' and 'next_cursor', pass the 'next_cursor' as 'cursor' to fetch the next page,
+    it's null on the last page. Use 'fields' and 'attributes' to only return what you need, this keeps results small.
 
     If 403 is returned, that either means you don't have to correct access rights or the realms you specified do not exist.
     Try calling the 'get_all_realms' tool to see which realms are available.
     """
     openremote_service = get_openremote_service()
 
+    unknown_fields = set(fields or []) - set(AssetObjectSchema.model_fields)
+    if unknown_fields:
+        return {"detail": f"Unknown fields {sorted(unknown_fields)}, available fields are {list(AssetObjectSchema.model_fields)}"}
+
+    query_hash = hash_query(asset_query_schema)
     try:
-        return await openremote_service.client.asset.query_assets(asset_query_schema)
+        offset = decode_cursor(cursor, query_hash).offset if cursor else (asset_query_schema.offset or 0)
+    except ValueError as e:
+        return {"detail": str(e)}
+
+    # Honour an explicit limit of the query as the total over all pages
+    limit = min(page_size, config.asset_query_max_page_size)
+    if asset_query_schema.limit is not None:
+        limit = min(limit, (asset_query_schema.offset or 0) + asset_query_schema.limit - offset)
+    if limit <= 0:
+        return {"assets": [], "next_cursor": None}
+
+    # Request one extra asset to know whether there is a next page
+    page_query = asset_query_schema.model_copy(update={"offset": offset, "limit": limit + 1})
+
+    try:
+        response = await openremote_service.client.asset.query_assets(page_query)
     except HTTPStatusError as e:
         return {
             "status_code": e.response.status_code,
             "detail": e.response.text,
         }
 
+    observe_assets(openremote_service.target, response.content)
 
-@asset_mcp.tool
+    has_next = len(response.content) > limit
+    if asset_query_schema.limit is not None:
+        has_next = has_next and offset + limit < (asset_query_schema.offset or 0) + asset_query_schema.limit
+
+    return {
+        "assets": [_project_asset(asset, fields, attributes) for asset in islice(response.content, limit)],
+        "next_cursor": encode_cursor(query_hash, offset + limit) if has_next else None,
+    }
+
+
+@asset_mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
 async def get_by_id(asset_id: str):
     """Retrieve a single asset by ID."""
     openremote_service = get_openremote_service()
 
-    return await openremote_service.client.asset.get_asset(asset_id)
+    try:
+        response = await openremote_service.client.asset.get_asset(asset_id)
+    except HTTPStatusError as e:
+        if e.response.status_code == 404:
+            forget_asset(openremote_service.target, asset_id)
+        return {
+            "status_code": e.response.status_code,
+            "detail": e.response.text,
+        }
+
+    observe_assets(openremote_service.target, [response.content])
+
+    return response
+
+
+async def query_all_targets(
+        asset_query_schema: AssetQuerySchemaDescription,
+        targets: list[str] | None = Field(default=None, description="Only query these OpenRemote managers, all managers are queried if omitted."),
+        fields: list[str] | None = Field(default=None, description="Only return these asset fields (e.g. name, type, parentId), all fields are returned if omitted."),
+        attributes: list[str] | None = Field(default=None, description="Only return these attributes of each asset, all attributes are returned if omitted."),
+):
+    """
+    Lists the assets matching the query on all OpenRemote managers at once, each asset includes the 'target' manager it belongs to.
+
+    At most one page of assets is returned per manager, managers listed in 'truncated' have more matching assets.
+    Use the 'query' tool with a 'target' to page through the assets of a single manager.
+    """
+    unknown_fields = set(fields or []) - set(AssetObjectSchema.model_fields)
+    if unknown_fields:
+        return {"detail": f"Unknown fields {sorted(unknown_fields)}, available fields are {list(AssetObjectSchema.model_fields)}"}
+
+    limit = min(asset_query_schema.limit or config.asset_query_max_page_size, config.asset_query_max_page_size)
+    # Request one extra asset to know whether a manager has more
+    target_query = asset_query_schema.model_copy(update={"limit": limit + 1})
+
+    try:
+        results = await fan_out(lambda openremote_service: openremote_service.client.asset.query_assets(target_query), targets)
+    except ValueError as e:
+        return {"detail": str(e)}
+
+    assets = []
+    truncated = []
+    errors = {}
+    for target, result in results.items():
+        if isinstance(result, HTTPStatusError):
+            errors[target] = {"status_code": result.response.status_code, "detail": result.response.text}
+        elif isinstance(result, Exception):
+            errors[target] = {"detail": str(result) or type(result).__name__}
+        else:
+            assets.extend({"target": target, **_project_asset(asset, fields, attributes)} for asset in islice(result.content, limit))
+            if len(result.content) > limit and asset_query_schema.limit is None:
+                truncated.append(target)
+
+    return {"assets": assets, "truncated": truncated, "errors": errors}
+
+
+@asset_mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
+async def query_realms(
+        asset_query_schema: AssetQuerySchemaDescription,
+        ctx: Context,
+        realms: list[str] | None = Field(default=None, description="Realms to query, all realms are queried if omitted."),
+        fields: list[str] | None = Field(default=None, description="Only return these asset fields (e.g. name, type, parentId), all fields are returned if omitted."),
+        attributes: list[str] | None = Field(default=None, description="Only return these attributes of each asset, all attributes are returned if omitted."),
+):
+    """
+    Lists the assets matching the query in multiple realms at once, use this instead of querying realm by realm.
+    The realm of the query is ignored, each asset includes the 'realm' it belongs to.
+
+    At most one page of assets is returned per realm, see 'realms' in the result for the count, duration and error of each realm.
+    """
+    unknown_fields = set(fields or []) - set(AssetObjectSchema.model_fields)
+    if unknown_fields:
+        return {"detail": f"Unknown fields {sorted(unknown_fields)}, available fields are {list(AssetObjectSchema.model_fields)}"}
+
+    if realms is None:
+        openremote_service = get_openremote_service()
+        all_realms = await metadata_cache.get_or_fetch(
+            "realm", (openremote_service.target, None),
+            lambda: content(openremote_service.client.realm.get_all_realms())
+        )
+        realms = [realm.name for realm in all_realms]
+
+    realms = list(dict.fromkeys(realms))
+    limit = min(asset_query_schema.limit or config.asset_query_max_page_size, config.asset_query_max_page_size)
+    semaphore = asyncio.Semaphore(config.asset_query_realm_concurrency)
+    completed = 0
+
+    async def query_realm(realm: str) -> tuple[list[AssetObjectSchema], dict]:
+        nonlocal completed
+
+        # Request one extra asset to know whether the realm has more
+        realm_query = asset_query_schema.model_copy(update={"realm": RealmPredicateSchema(name=realm), "limit": limit + 1})
+        assets = []
+
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await get_openremote_service(realm=realm).client.asset.query_assets(realm_query)
+                assets = list(islice(response.content, limit))
+                result = {"count": len(assets), "truncated": len(response.content) > limit and asset_query_schema.limit is None}
+            except HTTPStatusError as e:
+                result = {"status_code": e.response.status_code, "error": e.response.text}
+            except Exception as e:
+                result = {"error": str(e) or type(e).__name__}
+            result["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+        completed += 1
+        await ctx.report_progress(completed, len(realms), f"Realm '{realm}': {result.get('count', 0)} assets")
+
+        return assets, result
+
+    results = await asyncio.gather(*(query_realm(realm) for realm in realms))
+
+    merged = {}
+    for realm, (assets, _) in zip(realms, results):
+        for asset in assets:
+            merged.setdefault(asset.id, {"realm": realm, **_project_asset(asset, fields, attributes)})
+
+    return {
+        "assets": list(merged.values()),
+        "realms": {realm: result for realm, (_, result) in zip(realms, results)},
+    }
+
+
+# Keys of an attribute object, as opposed to a bare attribute value
+ATTRIBUTE_OBJECT_KEYS = {"name", "type", "value", "meta", "timestamp"}
+
+
+def _is_attribute_object(attribute: Any) -> bool:
+    return isinstance(attribute, dict) and bool(attribute.keys() & {"type", "value"}) and attribute.keys() <= ATTRIBUTE_OBJECT_KEYS
+
+
+def _validate_asset_attributes(asset_type: str | None, attributes: dict) -> tuple[dict, list[dict]]:
+    """
+    Validate the attributes of a new asset against the compiled attribute model of its type: required attributes,
+    value types and constraints. Bare values are wrapped in attribute objects. Returns the attributes to send
+    and the errors, attributes the asset type doesn't describe are left to OpenRemote.
+    """
+    attribute_model = get_asset_attribute_model(asset_type)
+    descriptors = {descriptor["name"]: descriptor for descriptor in asset_attribute_descriptors.get(asset_type) or []}
+
+    attribute_objects = {}
+    values = {}
+    for attribute_name, attribute in attributes.items():
+        attribute_object = dict(attribute) if _is_attribute_object(attribute) else {"value": attribute}
+        attribute_object.setdefault("name", attribute_name)
+        if attribute_name in descriptors and isinstance(descriptors[attribute_name].get("type"), str):
+            attribute_object.setdefault("type", descriptors[attribute_name]["type"])
+
+        attribute_objects[attribute_name] = attribute_object
+        if attribute_object.get("value") is not None:
+            values[attribute_name] = attribute_object["value"]
+
+    if attribute_model is None:
+        return attribute_objects, []
+
+    try:
+        validated = attribute_model.model_validate(values)
+    except ValidationError as e:
+        errors = []
+        for error in e.errors():
+            attribute_name = error["loc"][0] if error["loc"] else None
+            if error["type"] == "missing" and attribute_name in attribute_objects:
+                continue  # Present without a value
+
+            errors.append({
+                "attribute": attribute_name,
+                "type": error["type"],
+                "error": "Required attribute is missing" if error["type"] == "missing" else error["msg"],
+                **({"input": error["input"]} if error["type"] != "missing" else {}),
+                **({"path": list(error["loc"][1:])} if len(error["loc"]) > 1 else {}),
+            })
+        if errors:
+            return attribute_objects, errors
+    else:
+        # Send the coerced values, e.g. "5" as 5.0 for a number attribute
+        for attribute_name in values.keys() & type(validated).model_fields.keys():
+            attribute_objects[attribute_name]["value"] = getattr(validated, attribute_name)
+
+    return attribute_objects, []
+
+
+def _validate_new_asset(asset_type: str | None, attributes: dict, target: str | None = DEFAULT_TARGET) -> tuple[dict, dict | None]:
+    """Validate the type and attributes of a new asset, returns the attributes to send and the error if it's invalid."""
+    if target != DEFAULT_TARGET:
+        # Only the asset models of the default target are known, other managers validate their own assets
+        attributes, _ = _validate_asset_attributes(None, attributes)
+        return attributes, None
+
+    if asset_type is not None and asset_attribute_descriptors and asset_type not in asset_attribute_descriptors:
+        create_validation_stats["rejected"] += 1
+        return attributes, {"detail": f"Unknown asset type '{asset_type}', use the 'asset_model_get_all_types' tool to list the available types"}
+
+    attributes, errors = _validate_asset_attributes(asset_type, attributes)
+    if errors:
+        create_validation_stats["rejected"] += 1
+        return attributes, {
+            "detail": f"Invalid attributes for asset type '{asset_type}', nothing was created. Fix these errors and try again.",
+            "errors": errors,
+        }
+
+    create_validation_stats["validated"] += 1
+    return attributes, None
 
 
 class AssetAttributeSchema(BaseModel):
@@ -76,8 +362,8 @@ async def create(name: str, attributes: dict, type: str | None = None, parentId:
         - Look at the required attributes
         - Fill in attributes automatically with logical placeholder types
 
-   4. If OpenRemote returns 400:
-        - It means the schema is wrong or missing required attribute fields.
+   4. If 400 is returned:
+        - It means the schema is wrong or missing required attribute fields, 'errors' lists the problem per attribute.
         - You must ask the user for missing information or generate logical defaults.
 
    """
@@ -87,8 +373,16 @@ async def create(name: str, attributes: dict, type: str | None = None, parentId:
     #
     # attributes_convert = {key: AssetAttributeSchema(name=key) for key, attribute in attributes.values() }
 
+    # Validate locally first, so invalid attempts don't cost a request to OpenRemote
+    attributes, error = _validate_new_asset(type, attributes, openremote_service.target)
+    if error is not None:
+        return {"status_code": 400, **error}
+
     try:
-        return await openremote_service.client.asset.create_asset(AssetObjectSchema(name=name, type=type, parentId=parentId, realm=realm, attributes=attributes))
+        response = await openremote_service.client.asset.create_asset(AssetObjectSchema(name=name, type=type, parentId=parentId, realm=realm, attributes=attributes))
+        observe_assets(openremote_service.target, [response.content])
+
+        return response
     except HTTPStatusError as e:
         return {
             "status_code": e.response.status_code,
@@ -100,33 +394,344 @@ async def create(name: str, attributes: dict, type: str | None = None, parentId:
         }
 
 
-async def init_asset_service(mcp: FastMCP):
+class BulkAssetSchema(BaseModel):
+    ref: str | None = Field(None, description="Reference of the asset within this request, other assets of the request can use it as their 'parentId'.")
+    name: str = Field(description="Name of the asset.")
+    type: str = Field(description="Asset type, e.g. 'ThingAsset'.")
+    attributes: dict = Field(default_factory=dict, description="Attributes of the asset by name, attribute objects or bare values.")
+    parentId: str | None = Field(None, description="ID of an existing parent asset, or the 'ref' of a parent asset in this request.")
+    realm: str | None = Field(None, description="Realm of the asset, defaults to the realm of its parent in this request or the realm of the service.")
+    children: list["BulkAssetSchema"] = Field(default_factory=list, description="Child assets, created after this asset.")
+
+
+def _plan_bulk_create(assets: list[BulkAssetSchema]) -> tuple[list[BulkAssetSchema], list[int | None], list[dict]]:
+    """
+    Flatten the asset trees (parents before their children) and resolve the parents within the request.
+    Returns the assets, the index of their parent in the request (if any) and a result per asset, with a
+    'failure' for duplicate refs and parent cycles.
+    """
+    flattened: list[tuple[BulkAssetSchema, int | None]] = []
+
+    def flatten(asset: BulkAssetSchema, parent: int | None):
+        flattened.append((asset, parent))
+        index = len(flattened) - 1
+        for child in asset.children:
+            flatten(child, index)
+
+    for asset in assets:
+        flatten(asset, None)
+
+    items = [asset for asset, _ in flattened]
+    results = [
+        {"index": index, **({"ref": asset.ref} if asset.ref else {}), "name": asset.name, "type": asset.type}
+        for index, asset in enumerate(items)
+    ]
+
+    refs: dict[str, int] = {}
+    for index, asset in enumerate(items):
+        if asset.ref is None:
+            continue
+        if asset.ref in refs:
+            results[index].update(failure="DUPLICATE_REF", detail=f"Ref '{asset.ref}' is already used by asset {refs[asset.ref]}")
+            continue
+        refs[asset.ref] = index
+
+    parents = [parent if parent is not None else refs.get(asset.parentId) for asset, parent in flattened]
+
+    # Depth of each asset in the request, None when it (or one of its ancestors) is its own ancestor
+    levels: dict[int, int | None] = {}
+    for index in range(len(items)):
+        path = []
+        current = index
+        while current is not None and current not in levels and current not in path:
+            path.append(current)
+            current = parents[current]
+
+        level = -1 if current is None else None if current in path else levels[current]
+        for ancestor in reversed(path):
+            level = None if level is None else level + 1
+            levels[ancestor] = level
+
+    for index, result in enumerate(results):
+        if levels[index] is None:
+            result.setdefault("failure", "PARENT_CYCLE")
+            result.setdefault("detail", "The asset is its own ancestor through 'parentId'")
+        else:
+            result["level"] = levels[index]
+
+    return items, parents, results
+
+
+@asset_mcp.tool
+async def create_many(assets: list[BulkAssetSchema], dry_run: bool = False):
+    """
+    Create many assets at once, as a list and/or as trees (using 'children'), e.g. when commissioning a site.
+    Much more efficient than calling a create tool for each asset.
+
+    All assets are validated before anything is created, if any asset is invalid nothing is created.
+    Parents are created before their children, other assets are created concurrently.
+    Use 'dry_run' to only validate the assets.
+
+    Returns the result of each asset, children follow their parent, with the 'id' of each created asset
+    and a 'failure' reason for assets that couldn't be created.
+    """
     openremote_service = get_openremote_service()
 
-    logger.debug("Compiling asset tools...")
+    items, parents, results = _plan_bulk_create(assets)
+
+    attribute_objects: dict[int, dict] = {}
+    for index, asset in enumerate(items):
+        attributes, error = _validate_new_asset(asset.type, asset.attributes, openremote_service.target)
+        if error is not None and "failure" not in results[index]:
+            results[index].update(failure="INVALID_ASSET", **error)
+        attribute_objects[index] = attributes
+
+    invalid = sum("failure" in result for result in results)
+    if invalid:
+        return {
+            "status_code": 400,
+            "detail": f"{invalid} of {len(items)} assets are invalid, nothing was created. Fix these errors and try again.",
+            "results": results,
+        }
+
+    if dry_run:
+        return {"dry_run": True, "detail": f"All {len(items)} assets are valid", "results": results}
+
+    semaphore = asyncio.Semaphore(config.asset_create_concurrency)
+    created: dict[int, AssetObjectSchema] = {}
+    tasks: dict[int, asyncio.Task] = {}
+
+    async def submit(index: int) -> bool:
+        asset, parent = items[index], parents[index]
+        parent_id, realm = asset.parentId, asset.realm or openremote_service.client.realm_name
+        if parent is not None:
+            if not await tasks[parent]:
+                results[index].update(success=False, failure="PARENT_FAILED", detail=f"Parent asset {parent} was not created")
+                return False
+            parent_id, realm = created[parent].id, asset.realm or created[parent].realm
+
+        async with semaphore:
+            try:
+                response = await openremote_service.client.asset.create_asset(
+                    AssetObjectSchema(name=asset.name, type=asset.type, parentId=parent_id, realm=realm, attributes=attribute_objects[index])
+                )
+            except HTTPStatusError as e:
+                results[index].update(success=False, failure="UNKNOWN", detail=f"{e.response.status_code}: {e.response.text}")
+                return False
+            except Exception as e:
+                results[index].update(success=False, failure="UNKNOWN", detail=str(e))
+                return False
+
+        created[index] = response.content
+        results[index].update(success=True, id=response.content.id)
+        return True
+
+    # All tasks exist before any of them runs, so children can wait on parents listed after them
+    for index in range(len(items)):
+        tasks[index] = asyncio.create_task(submit(index))
+    await asyncio.gather(*tasks.values())
+
+    observe_assets(openremote_service.target, created.values())
+    logger.debug(f"Created {len(created)} of {len(items)} assets")
+
+    return {"created": len(created), "failed": len(items) - len(created), "results": results}
 
-    # Fetch all asset types and create specialized tools for each one
-    asset_models = await openremote_service.client.asset_model.get_asset_infos()
 
-    for asset_model in asset_models.content:
-        asset_model_name = asset_model.assetDescriptor['name']
+def get_asset_attribute_model(asset_type: str | None) -> type[BaseModel] | None:
+    """Get the compiled attribute model of an asset type, compiling it on first use."""
+    if asset_type not in asset_attribute_models:
+        attribute_descriptors = asset_attribute_descriptors.get(asset_type)
+        if attribute_descriptors is None:
+            return None
 
-        asset_mcp.add_tool(Tool.from_tool(
+        asset_attribute_models[asset_type] = asset_attribute_model_factory(asset_type, attribute_descriptors)
+
+    return asset_attribute_models[asset_type]
+
+
+def get_create_tool(asset_model_name: str) -> Tool:
+    """Get the `create_<AssetType>` tool of an asset type, building it on first use."""
+    if asset_model_name not in asset_create_tools:
+        asset_create_tools[asset_model_name] = Tool.from_tool(
             create,
             name=f"create_{asset_model_name}",
             description=f"Create a new '{asset_model_name}' in the OpenRemote platform.",
             transform_args={
+                'type': ArgTransform(hide=True, default=asset_model_name),
                 'attributes': ArgTransform(
                     name='attributes',
                     description='Attributes of the asset to create.',
-                    type=asset_attribute_model_factory(asset_model_name, asset_model.attributeDescriptors),
+                    type=get_asset_attribute_model(asset_model_name),
                     required=True,
                 )
             }
-        ))
-    logger.info(f"Compiled {len(asset_models.content)} asset tools.")
+        )
+
+    return asset_create_tools[asset_model_name]
+
+
+def sync_asset_tools(asset_infos: list[dict], schemas: dict[str, dict] | None = None) -> bool:
+    """
+    Bring the `create_<AssetType>` tools in line with the given asset infos.
+    Only tools of added, removed or changed asset types are (re)built, returns whether anything changed.
+    """
+    schemas = schemas or {}
+    asset_infos_by_name = {asset_info['assetDescriptor']['name']: asset_info for asset_info in asset_infos}
+
+    removed = [name for name in asset_info_hashes if name not in asset_infos_by_name]
+    changed = []
+    for asset_model_name, asset_info in asset_infos_by_name.items():
+        if asset_info_hashes.get(asset_model_name) != hash_asset_infos([asset_info]):
+            changed.append(asset_model_name)
+
+    if removed or changed:
+        asset_attribute_model_factory.clear()
+
+    for asset_model_name in removed + changed:
+        if asset_model_name in asset_info_hashes:
+            asset_mcp.remove_tool(f"create_{asset_model_name}")
+        asset_info_hashes.pop(asset_model_name, None)
+        asset_attribute_descriptors.pop(asset_model_name, None)
+        asset_attribute_models.pop(asset_model_name, None)
+        asset_create_tools.pop(asset_model_name, None)
+
+    for asset_model_name in changed:
+        asset_info = asset_infos_by_name[asset_model_name]
+        asset_info_hashes[asset_model_name] = hash_asset_infos([asset_info])
+        asset_attribute_descriptors[asset_model_name] = asset_info['attributeDescriptors']
+        asset_attribute_model_factory.resolver.register(asset_info.get('valueDescriptors') or [])
+
+        if config.asset_tools_lazy:
+            # Only register a descriptor, the model and tool are built on first listing or invocation
+            asset_mcp.add_tool(LazyTool.from_factory(
+                partial(get_create_tool, asset_model_name),
+                name=f"create_{asset_model_name}",
+                description=f"Create a new '{asset_model_name}' in the OpenRemote platform.",
+                parameters=schemas.get(asset_model_name),
+            ))
+        else:
+            asset_mcp.add_tool(get_create_tool(asset_model_name))
+
+    if removed or changed:
+        logger.debug(f"Synced asset tools, removed: {removed}, added or changed: {changed}")
+
+    return bool(removed or changed)
+
+
+async def save_asset_snapshot(asset_infos: list[dict]):
+    """
+    Snapshot the asset infos and the parameter schemas of their create tools.
+    With lazy tools only the schemas of tools built so far are stored, the others are built on first use.
+    """
+    if config.asset_tools_lazy:
+        schemas = {name: tool.parameters for name, tool in asset_create_tools.items() if name in asset_attribute_descriptors}
+        save_asset_model_snapshot(config.asset_snapshot_path, str(config.openremote_url), asset_infos, schemas)
+        return
+
+    schemas = {}
+    for asset_model_name in list(asset_attribute_descriptors):
+        if asset_model_name in asset_attribute_descriptors:
+            schemas[asset_model_name] = get_create_tool(asset_model_name).parameters
+            # Building the models is CPU bound, don't starve the event loop
+            await asyncio.sleep(0)
+
+    save_asset_model_snapshot(config.asset_snapshot_path, str(config.openremote_url), asset_infos, schemas)
+
+
+async def fetch_asset_infos() -> list[dict]:
+    openremote_service = get_openremote_service()
+
+    return await metadata_cache.get_or_fetch(
+        "asset_model", (openremote_service.target, None),
+        lambda: json_content(openremote_service.client.asset_model.get_asset_infos())
+    )
+
+
+async def prefetch_asset_infos(openremote_client: OpenRemoteClient, target: str = DEFAULT_TARGET):
+    """Fetch the asset infos while the service is still registering, `init_asset_service` then uses the cached response."""
+    if config.asset_snapshot_path and os.path.exists(config.asset_snapshot_path):
+        return  # The tools are served from the snapshot, refreshed in the background
+
+    try:
+        await metadata_cache.get_or_fetch(
+            "asset_model", (target, None),
+            lambda: json_content(openremote_client.asset_model.get_asset_infos())
+        )
+    except Exception as e:
+        # Fetched again by `init_asset_service`, which reports the failure
+        logger.debug(f"Failed to prefetch asset infos: {e}")
+
+
+async def refresh_asset_tools() -> bool:
+    """Fetch the current asset infos from OpenRemote and sync the asset tools, connected sessions are notified on changes."""
+    metadata_cache.invalidate("asset_model")
+    asset_infos = await fetch_asset_infos()
+
+    if not sync_asset_tools(asset_infos):
+        return False
+
+    logger.info(f"Asset types changed, refreshed asset tools ({len(asset_attribute_descriptors)} asset types)")
+    coalescing.invalidate()
+    await session_tracking.notify_tool_list_changed()
+    if config.asset_snapshot_path:
+        run_in_background(save_asset_snapshot(asset_infos))
+
+    return True
 
-    await mcp.import_server(asset_mcp, prefix="asset")
+
+async def __asset_tools_refresh_loop():
+    while True:
+        await asyncio.sleep(config.asset_tools_refresh_interval)
+
+        try:
+            await refresh_asset_tools()
+        except Exception as e:
+            logger.warning("Failed to refresh asset tools")
+            logger.debug(e)
+
+
+async def init_asset_service(mcp: FastMCP):
+    logger.debug("Compiling asset tools...")
+    started_on = time.perf_counter()
+    started_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    snapshot = None
+    if config.asset_snapshot_path:
+        with startup_profile.phase("snapshot_load"):
+            snapshot = load_asset_model_snapshot(config.asset_snapshot_path, str(config.openremote_url))
+
+    if snapshot is not None:
+        # Serve the tools from the snapshot right away, the manager is checked in the background
+        logger.info(f"Using asset model snapshot '{config.asset_snapshot_path}' ({snapshot.content_hash[:12]})")
+        with startup_profile.phase("model_compilation"):
+            sync_asset_tools(snapshot.asset_infos, snapshot.schemas)
+        run_in_background(refresh_asset_tools())
+    else:
+        # Fetch all asset types and create specialized tools for each one
+        with startup_profile.phase("asset_info_fetch"):
+            asset_infos = await fetch_asset_infos()
+        with startup_profile.phase("model_compilation"):
+            sync_asset_tools(asset_infos)
+        if config.asset_snapshot_path:
+            run_in_background(save_asset_snapshot(asset_infos))
+
+    if config.asset_tools_refresh_interval > 0:
+        run_in_background(__asset_tools_refresh_loop())
+
+    if len(get_openremote_services()) > 1:
+        asset_mcp.add_tool(Tool.from_function(query_all_targets, annotations=ToolAnnotations(readOnlyHint=True)))
+
+    if config.attribute_cache_enabled:
+        asset_mcp.add_tool(Tool.from_function(read_attribute_values, annotations=ToolAnnotations(readOnlyHint=True)))
+
+    logger.info(
+        f"{'Registered' if config.asset_tools_lazy else 'Compiled'} {len(asset_attribute_descriptors)} asset tools "
+        f"in {(time.perf_counter() - started_on) * 1000:.0f}ms "
+        f"(max RSS +{(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - started_rss) / 1024:.1f}MB)."
+    )
+
+    # Mounted rather than imported so tools rebuilt later on are visible
+    mcp.mount(asset_mcp, prefix="asset")
 #
 # @asset_mcp.tool
 # async def update_asset(asset_id: str, asset_object_schema: AssetObjectSchema):
@@ -150,12 +755,210 @@ async def write_attribute_value(asset_id: str, attribute_name: str, value: str |
     """Write/update a single attribute value on an asset. Use this to change sensor values, settings, etc."""
     openremote_service = get_openremote_service()
 
-    return await openremote_service.client.asset.write_attribute_value(asset_id, attribute_name, value)
+    try:
+        return await openremote_service.client.asset.write_attribute_value(asset_id, attribute_name, value)
+    except HTTPStatusError as e:
+        return {
+            "status_code": e.response.status_code,
+            "detail": e.response.text,
+        }
 
 
-# @asset_mcp.tool
-# async def write_attribute_values(attribute_state_schema: AttributeStateSchema):
-#     """Write/update multiple attribute values at once. More efficient than writing individually."""
-#     openremote_service = get_openremote_service()
-#
-#     return await openremote_service.client.asset.write_attribute_values(attribute_state_schema)
+def get_live_attributes(openremote_service: OpenRemoteService) -> tuple[AttributeValueCache, AttributeEventStream]:
+    """Attribute value cache of a target, and the event stream keeping it up to date, connected on first use."""
+    if openremote_service.target not in live_attributes:
+        client = openremote_service.client
+        cache = AttributeValueCache(config.attribute_cache_max_assets)
+        stream = AttributeEventStream(
+            client.host,
+            client.token_manager,
+            on_event=cache.apply_event,
+            on_missed_events=cache.mark_stale,
+            realm=client.realm_name,
+            verify_SSL=client.verify_SSL,
+        )
+        stream.start()
+        live_attributes[openremote_service.target] = (cache, stream)
+
+    return live_attributes[openremote_service.target]
+
+
+async def _load_attribute_values(openremote_service: OpenRemoteService, cache: AttributeValueCache, stream: AttributeEventStream, asset_id: str) -> CachedAsset:
+    """Subscribe to the attribute events of an asset and seed the cache with its current values."""
+    # Subscribe before fetching so no update is missed, events received meanwhile win if newer.
+    # Not live until the values are in, so concurrent reads don't serve an incomplete entry
+    evicted = cache.seed(asset_id, {}, live=False)
+    stale_marks = cache.stale_marks
+    await stream.subscribe(asset_id)
+
+    try:
+        response = await openremote_service.client.asset.get_asset(asset_id)
+    except BaseException:
+        cache.discard(asset_id)
+        await stream.unsubscribe(asset_id)
+        raise
+
+    # Only live if no events may have been missed meanwhile (e.g. by a reconnect)
+    evicted += cache.seed(asset_id, {
+        name: CachedAttribute(value=attribute.get("value"), timestamp=attribute.get("timestamp"))
+        for name, attribute in (response.content.attributes or {}).items()
+    }, live=cache.stale_marks == stale_marks)
+    for evicted_id in evicted:
+        await stream.unsubscribe(evicted_id)
+
+    return cache.peek(asset_id)
+
+
+async def read_attribute_values(
+        asset_id: str,
+        attribute_names: list[str] | None = Field(default=None, description="Attributes to read, all attributes are returned if omitted."),
+):
+    """
+    Read the current attribute values of an asset, use this instead of 'get_by_id' to (repeatedly) check values.
+    Each value includes its 'age_seconds', 'live' tells whether the values are kept up to date by OpenRemote events.
+    """
+    openremote_service = get_openremote_service()
+    cache, stream = get_live_attributes(openremote_service)
+
+    asset = cache.get(asset_id) if stream.connected else None
+    source = "cache"
+    if asset is None:
+        source = "openremote"
+        try:
+            asset = await attribute_snapshots.run(
+                (openremote_service.target, asset_id),
+                lambda: _load_attribute_values(openremote_service, cache, stream, asset_id)
+            )
+        except HTTPStatusError as e:
+            return {
+                "status_code": e.response.status_code,
+                "detail": e.response.text,
+            }
+
+    now = time.monotonic()
+    names = attribute_names or list(asset.attributes)
+
+    return {
+        "asset_id": asset_id,
+        "source": source,
+        "live": stream.connected and asset.live,
+        "attributes": {
+            name: {
+                "value": asset.attributes[name].value,
+                "timestamp": asset.attributes[name].timestamp,
+                "age_seconds": round(now - asset.attributes[name].updated_at, 3),
+            }
+            for name in names if name in asset.attributes
+        },
+        "missing": [name for name in names if name not in asset.attributes],
+    }
+
+
+class AttributeWriteSchema(BaseModel):
+    asset_id: str = Field(description="ID of the asset to write to.")
+    attribute_name: str = Field(description="Name of the attribute to write.")
+    value: Any = Field(description="New value of the attribute.")
+
+
+def _validate_attribute_value(asset_type: str | None, attribute_name: str, value: Any):
+    """Validate a value against the compiled attribute model of the asset type, unknown attributes are left to OpenRemote."""
+    attribute_model = get_asset_attribute_model(asset_type)
+    if attribute_model is None or attribute_name not in attribute_model.model_fields:
+        return value
+
+    return _attribute_value_adapter(attribute_model, attribute_name).validate_python(value)
+
+
+@lru_cache(maxsize=1024)
+def _attribute_value_adapter(attribute_model: type[BaseModel], attribute_name: str) -> TypeAdapter:
+    """Building a TypeAdapter is costly, reuse it for every value written to the same attribute."""
+    field = attribute_model.model_fields[attribute_name]
+
+    return TypeAdapter(Annotated[field.annotation, field])
+
+
+async def _write_attribute_states(states: list[AttributeStateSchema]) -> dict[tuple[str, str], str | None]:
+    """Send a chunk of attribute states in a single request, returns the failure per (asset_id, attribute_name)."""
+    openremote_service = get_openremote_service()
+
+    response = await openremote_service.client.put(
+        '/asset/attributes',
+        json=[state.model_dump(warnings=False) for state in states]
+    )
+    response.raise_for_status()
+
+    return {(result['ref']['id'], result['ref']['name']): result.get('failure') for result in response.json()}
+
+
+@asset_mcp.tool
+async def write_attribute_values(writes: list[AttributeWriteSchema]):
+    """
+    Write/update multiple attribute values at once, possibly across multiple assets.
+    Much more efficient than calling 'write_attribute_value' for each attribute.
+
+    Returns the result of each write in the same order, failed writes contain a 'failure' reason.
+    """
+    if not writes:
+        return []
+
+    openremote_service = get_openremote_service()
+
+    results: list[dict] = [{"asset_id": write.asset_id, "attribute_name": write.attribute_name, "success": False} for write in writes]
+
+    # Resolve the asset types so the values can be validated before sending them
+    asset_ids = list({write.asset_id for write in writes})
+    try:
+        assets = await openremote_service.client.asset.query_assets(AssetQuerySchema(ids=asset_ids, select=SelectSchema(basic=True)))
+    except HTTPStatusError as e:
+        return {
+            "status_code": e.response.status_code,
+            "detail": e.response.text,
+        }
+    asset_types = {asset.id: asset.type for asset in assets.content}
+
+    # The chunks are sent concurrently, so only the last value written to an attribute is sent,
+    # the results of its earlier writes follow the one of the last write
+    pending: dict[tuple[str, str], tuple[list[int], AttributeStateSchema]] = {}
+    for index, write in enumerate(writes):
+        if write.asset_id not in asset_types:
+            results[index]["failure"] = "ASSET_NOT_FOUND"
+            continue
+
+        try:
+            value = _validate_attribute_value(asset_types[write.asset_id], write.attribute_name, write.value)
+        except ValidationError as e:
+            results[index]["failure"] = "INVALID_VALUE"
+            results[index]["detail"] = [error["msg"] for error in e.errors()]
+            continue
+
+        indexes, _ = pending.pop((write.asset_id, write.attribute_name), ([], None))
+        pending[(write.asset_id, write.attribute_name)] = (indexes + [index], AttributeStateSchema.model_construct(
+            ref=AttributeRefSchema(id=write.asset_id, name=write.attribute_name),
+            value=value,
+        ))
+
+    states = list(pending.values())
+    chunks = [states[i:i + config.asset_write_batch_size] for i in range(0, len(states), config.asset_write_batch_size)]
+    responses = await asyncio.gather(
+        *[_write_attribute_states([state for _, state in chunk]) for chunk in chunks],
+        return_exceptions=True
+    )
+
+    for chunk, response in zip(chunks, responses):
+        for indexes, state in chunk:
+            for index in indexes:
+                if isinstance(response, HTTPStatusError):
+                    results[index]["failure"] = "UNKNOWN"
+                    results[index]["detail"] = f"{response.response.status_code}: {response.response.text}"
+                elif isinstance(response, BaseException):
+                    results[index]["failure"] = "UNKNOWN"
+                    results[index]["detail"] = str(response)
+                else:
+                    failure = response.get((state.ref.id, state.ref.name), "UNKNOWN")
+                    results[index]["success"] = failure is None
+                    if failure is not None:
+                        results[index]["failure"] = failure
+
+    logger.debug(f"Wrote {len(states)} attribute values in {len(chunks)} request(s)")
+
+    return results
@@ -1,21 +1,29 @@
 from fastmcp import FastMCP
+from mcp.types import ToolAnnotations
 
 from services.openremote_service import get_openremote_service
+from app.utils import metadata_cache, json_content
 
 asset_model_mcp = FastMCP("Asset Model Service")
 
 
-@asset_model_mcp.tool
+@asset_model_mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
 async def get_all_types():
     """Retrieve the asset type information of each available asset type"""
     openremote_service = get_openremote_service()
 
-    return await openremote_service.client.asset_model.get_asset_infos()
+    return await metadata_cache.get_or_fetch(
+        "asset_model", (openremote_service.target, None),
+        lambda: json_content(openremote_service.client.asset_model.get_asset_infos())
+    )
 
 
-@asset_model_mcp.tool
+@asset_model_mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
 async def get_type(asset_type: str):
     """Retrieve the asset type information of an asset type"""
     openremote_service = get_openremote_service()
 
-    return await openremote_service.client.asset_model.get_asset_info(asset_type)
\ No newline at end of file
+    return await metadata_cache.get_or_fetch(
+        "asset_model", (openremote_service.target, asset_type),
+        lambda: json_content(openremote_service.client.asset_model.get_asset_info(asset_type))
+    )
@@ -0,0 +1,195 @@
+import asyncio
+import logging
+import time
+from itertools import islice
+from typing import Iterable
+
+from fastmcp import FastMCP
+from mcp.types import ToolAnnotations
+from openremote_client.schemas import AssetObjectSchema, AssetQuerySchema, OrderBySchema, RealmPredicateSchema, SelectSchema
+from pydantic import Field
+
+from services.openremote_service import OpenRemoteService, get_openremote_service
+from app.config import config
+from app.utils import AssetIndex, IndexedAsset, metadata_cache, content, run_in_background
+
+logger = logging.getLogger("uvicorn")
+
+hierarchy_mcp = FastMCP("Asset Hierarchy Service")
+
+# Asset index per OpenRemote target, see `get_asset_index`
+asset_indexes: dict[str, AssetIndex] = {}
+__index_locks: dict[str, asyncio.Lock] = {}
+__index_refreshes: dict[str, asyncio.Task] = {}
+
+
+def _to_indexed_asset(asset: AssetObjectSchema) -> IndexedAsset:
+    return IndexedAsset(id=asset.id, name=asset.name, type=asset.type, realm=asset.realm, parent_id=asset.parentId)
+
+
+def observe_assets(target: str, assets: Iterable[AssetObjectSchema]):
+    """Keep the index fresh with assets seen in responses of other tools (e.g. created or queried assets)."""
+    index = asset_indexes.get(target)
+    if index is None:
+        return
+
+    for asset in assets:
+        if getattr(asset, "id", None):
+            index.upsert(_to_indexed_asset(asset))
+
+
+def forget_asset(target: str, asset_id: str):
+    """Remove an asset that was found to be deleted (and its descendants) from the index."""
+    index = asset_indexes.get(target)
+    if index is not None:
+        index.remove(asset_id)
+
+
+async def fetch_indexed_assets(openremote_service: OpenRemoteService) -> list[IndexedAsset]:
+    """Fetch the basic fields of all assets of all realms, page by page."""
+    realms = await metadata_cache.get_or_fetch(
+        "realm", (openremote_service.target, None),
+        lambda: content(openremote_service.client.realm.get_all_realms())
+    )
+    semaphore = asyncio.Semaphore(config.asset_query_realm_concurrency)
+    page_size = config.asset_query_max_page_size
+
+    async def fetch_realm(realm: str) -> list[IndexedAsset]:
+        assets: dict[str, IndexedAsset] = {}
+        offset = 0
+        async with semaphore:
+            while True:
+                # Oldest first, so assets created meanwhile end up on the last page instead of shifting the pages
+                page = await openremote_service.client.asset.query_assets(AssetQuerySchema(
+                    realm=RealmPredicateSchema(name=realm),
+                    select=SelectSchema(basic=True),
+                    orderBy=OrderBySchema(property="CREATED_ON"),
+                    offset=offset,
+                    limit=page_size,
+                ))
+                offset += len(page.content)
+                assets.update((asset.id, _to_indexed_asset(asset)) for asset in page.content)
+
+                if len(page.content) < page_size:
+                    return list(assets.values())
+
+    realm_assets = await asyncio.gather(*(fetch_realm(realm.name) for realm in realms))
+
+    return [asset for assets in realm_assets for asset in assets]
+
+
+async def rebuild_asset_index(openremote_service: OpenRemoteService):
+    started_on = time.perf_counter()
+    index = asset_indexes.setdefault(openremote_service.target, AssetIndex())
+
+    changes = index.track_changes()
+    try:
+        assets = await fetch_indexed_assets(openremote_service)
+        index.replace(assets, changes)
+    finally:
+        index.untrack_changes(changes)
+
+    logger.info(f"Indexed {len(assets)} assets of target '{openremote_service.target}' in {(time.perf_counter() - started_on) * 1000:.0f}ms")
+
+
+async def __refresh_asset_index(openremote_service: OpenRemoteService):
+    try:
+        await rebuild_asset_index(openremote_service)
+    except Exception as e:
+        logger.warning(f"Failed to refresh the asset index of target '{openremote_service.target}'")
+        logger.debug(e)
+
+
+async def get_asset_index() -> AssetIndex:
+    """
+    Asset index of the current target, built on first use. Once older than `asset_index_ttl` it is rebuilt
+    in the background, while the current index keeps being served.
+    """
+    openremote_service = get_openremote_service()
+    target = openremote_service.target
+    index = asset_indexes.setdefault(target, AssetIndex())
+
+    if not index.is_built:
+        async with __index_locks.setdefault(target, asyncio.Lock()):
+            if not index.is_built:
+                await rebuild_asset_index(openremote_service)
+    elif index.age() > config.asset_index_ttl and target not in __index_refreshes:
+        task = run_in_background(__refresh_asset_index(openremote_service))
+        __index_refreshes[target] = task
+        task.add_done_callback(lambda _: __index_refreshes.pop(target, None))
+
+    return asset_indexes[target]
+
+
+def _summarize(asset: IndexedAsset, **extra) -> dict:
+    return {"id": asset.id, "name": asset.name, "type": asset.type, "realm": asset.realm, "parentId": asset.parent_id, **extra}
+
+
+@hierarchy_mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
+async def get_subtree(
+        asset_id: str,
+        max_depth: int | None = Field(default=None, ge=1, description="Only include descendants up to this many levels below the asset."),
+        limit: int = Field(default=500, ge=1, description="Maximum number of descendants to return."),
+):
+    """List the descendants of an asset breadth first, with their depth below the asset. Use this instead of querying the children level by level."""
+    index = await get_asset_index()
+    if asset_id not in index.assets:
+        return {"detail": f"Asset '{asset_id}' not found"}
+
+    descendants = list(islice(index.descendants(asset_id, max_depth), limit + 1))
+
+    return {
+        "asset": _summarize(index.assets[asset_id]),
+        "descendants": [_summarize(asset, depth=depth) for asset, depth in descendants[:limit]],
+        "truncated": len(descendants) > limit,
+    }
+
+
+@hierarchy_mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
+async def get_path(asset_id: str):
+    """Get the path of an asset, from the root asset down to the asset itself."""
+    index = await get_asset_index()
+    if asset_id not in index.assets:
+        return {"detail": f"Asset '{asset_id}' not found"}
+
+    path = [*index.ancestors(asset_id), index.assets[asset_id]]
+
+    return {
+        "path": [_summarize(asset) for asset in path],
+        "names": " / ".join(asset.name or asset.id for asset in path),
+    }
+
+
+@hierarchy_mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
+async def search(
+        root_id: str | None = Field(default=None, description="Only search the descendants of this asset, the whole hierarchy is searched if omitted."),
+        name: str | None = Field(default=None, description="Only match assets whose name contains this text (case insensitive)."),
+        types: list[str] | None = Field(default=None, description="Only match assets of these asset types."),
+        realm: str | None = Field(default=None, description="Only match assets of this realm."),
+        max_depth: int | None = Field(default=None, ge=1, description="Only search up to this many levels below the root."),
+        limit: int = Field(default=100, ge=1, description="Maximum number of assets to return."),
+):
+    """Search the asset hierarchy, or the descendants of an asset, by name, type and realm. Each match includes its path."""
+    index = await get_asset_index()
+    if root_id is not None and root_id not in index.assets:
+        return {"detail": f"Asset '{root_id}' not found"}
+
+    name = name.casefold() if name else None
+    types = set(types) if types else None
+
+    def matches(asset: IndexedAsset) -> bool:
+        return (
+            (name is None or name in (asset.name or "").casefold())
+            and (types is None or asset.type in types)
+            and (realm is None or asset.realm == realm)
+        )
+
+    found = list(islice((asset for asset, _ in index.descendants(root_id, max_depth) if matches(asset)), limit + 1))
+
+    return {
+        "assets": [
+            _summarize(asset, path=" / ".join(ancestor.name or ancestor.id for ancestor in [*index.ancestors(asset.id), asset]))
+            for asset in found[:limit]
+        ],
+        "truncated": len(found) > limit,
+    }
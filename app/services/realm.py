@@ -1,21 +1,29 @@
 from fastmcp import FastMCP
+from mcp.types import ToolAnnotations
 
 from services.openremote_service import get_openremote_service
+from app.utils import metadata_cache, content
 
 realm_mcp = FastMCP("Realm Service")
 
 
-@realm_mcp.tool
+@realm_mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
 async def get_all():
     """Retrieve all realms."""
     openremote_service = get_openremote_service()
 
-    return await openremote_service.client.realm.get_all_realms()
+    return await metadata_cache.get_or_fetch(
+        "realm", (openremote_service.target, None),
+        lambda: content(openremote_service.client.realm.get_all_realms())
+    )
 
 
-@realm_mcp.tool
+@realm_mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
 async def get_by_name(realm_name: str):
     """Retrieve details about the currently authenticated and active realm."""
     openremote_service = get_openremote_service()
 
-    return await openremote_service.client.realm.get_realm(realm_name)
\ No newline at end of file
+    return await metadata_cache.get_or_fetch(
+        "realm", (openremote_service.target, realm_name),
+        lambda: content(openremote_service.client.realm.get_realm(realm_name))
+    )
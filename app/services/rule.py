@@ -1,26 +1,121 @@
+import asyncio
+import logging
+from typing import Literal
+from urllib.parse import quote
+
 from fastmcp import FastMCP
+from httpx import HTTPStatusError
+from mcp.types import ToolAnnotations
 from openremote_client.schemas import GlobalRulesetSchema, RealmRulesetSchema, AssetRulesetSchema
+from pydantic import Field
+
+from services.openremote_service import OpenRemoteService, get_openremote_service
+from app.config import config
+from app.utils import metadata_cache, RulesetCache
 
-from services.openremote_service import get_openremote_service
+logger = logging.getLogger("uvicorn")
 
 rule_mcp = FastMCP("Rule Service")
 
+RulesetKind = Literal["global", "realm", "asset"]
 
-# Global Rulesets
-@rule_mcp.tool
-async def get_global_rulesets():
-    """Retrieve all global rulesets. Global rules apply across all realms."""
-    openremote_service = get_openremote_service()
+# Full rulesets per (target, kind, id), see `_list_rulesets`
+ruleset_cache = RulesetCache(config.cache_ruleset_max_size)
 
-    return await openremote_service.client.rule.get_global_rulesets()
 
+def _summarize(ruleset: dict) -> dict:
+    return {key: value for key, value in ruleset.items() if key != "rules"}
 
-@rule_mcp.tool
-async def get_global_ruleset(rule_id: int):
-    """Retrieve a specific global ruleset by ID."""
+
+async def _fetch_ruleset(openremote_service: OpenRemoteService, kind: RulesetKind, rule_id: int) -> dict:
+    """Fetch a full ruleset and cache it."""
+    response = await getattr(openremote_service.client.rule, f"get_{kind}_ruleset")(rule_id)
+    ruleset = response.response.json()
+    ruleset_cache.put((openremote_service.target, kind, rule_id), ruleset)
+
+    return ruleset
+
+
+async def _list_rulesets(kind: RulesetKind, path: str, include_rules: bool):
+    """
+    List rulesets without their rules, the listing is cached briefly. With `include_rules` the rules of each ruleset
+    are added from the ruleset cache, only rulesets of which the version changed are fetched.
+    """
     openremote_service = get_openremote_service()
 
-    return await openremote_service.client.rule.get_global_ruleset(rule_id)
+    async def fetch() -> list[dict]:
+        response = await openremote_service.client.get(path, params={"fullyPopulate": "false"})
+        response.raise_for_status()
+        return response.json()
+
+    try:
+        rulesets = await metadata_cache.get_or_fetch("ruleset", (openremote_service.target, path), fetch)
+    except HTTPStatusError as e:
+        return {
+            "status_code": e.response.status_code,
+            "detail": e.response.text,
+        }
+
+    # Managers that return the rules anyway save fetching them one by one later
+    for ruleset in rulesets:
+        if ruleset.get("rules") is not None:
+            ruleset_cache.put((openremote_service.target, kind, ruleset["id"]), ruleset)
+
+    if not include_rules:
+        return [_summarize(ruleset) for ruleset in rulesets]
+
+    cached = [ruleset_cache.get((openremote_service.target, kind, ruleset["id"]), ruleset.get("version")) for ruleset in rulesets]
+    stale = [ruleset["id"] for ruleset, full in zip(rulesets, cached) if full is None]
+    fetched = dict(zip(stale, await asyncio.gather(
+        *(_fetch_ruleset(openremote_service, kind, rule_id) for rule_id in stale),
+        return_exceptions=True
+    )))
+
+    logger.debug(f"Listed {len(rulesets)} {kind} rulesets, fetched the rules of {len(stale)}")
+
+    results = []
+    for ruleset, full in zip(rulesets, cached):
+        if full is None:
+            full = fetched[ruleset["id"]]
+        if isinstance(full, HTTPStatusError):
+            full = {**_summarize(ruleset), "detail": f"Failed to fetch the rules, {full.response.status_code}: {full.response.text}"}
+        elif isinstance(full, BaseException):
+            full = {**_summarize(ruleset), "detail": f"Failed to fetch the rules, {full}"}
+        results.append(full)
+
+    return results
+
+
+async def _get_ruleset(kind: RulesetKind, rule_id: int):
+    openremote_service = get_openremote_service()
+
+    try:
+        return await _fetch_ruleset(openremote_service, kind, rule_id)
+    except HTTPStatusError as e:
+        return {
+            "status_code": e.response.status_code,
+            "detail": e.response.text,
+        }
+
+
+def _rulesets_changed(openremote_service: OpenRemoteService, kind: RulesetKind, rule_id: int | None = None):
+    """Drop the cached listings, and the cached ruleset that was updated or deleted."""
+    metadata_cache.invalidate("ruleset")
+    if rule_id is not None:
+        ruleset_cache.discard((openremote_service.target, kind, rule_id))
+
+
+# Global Rulesets
+@rule_mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
+async def get_global_rulesets(include_rules: bool = Field(default=False, description="Include the rules (source) of each ruleset, only their metadata is returned if omitted.")):
+    """Retrieve all global rulesets. Global rules apply across all realms."""
+    return await _list_rulesets("global", "/rules", include_rules)
+
+
+@rule_mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
+async def get_global_ruleset(rule_id: int):
+    """Retrieve a specific global ruleset by ID, including its rules."""
+    return await _get_ruleset("global", rule_id)
 
 
 @rule_mcp.tool
@@ -28,7 +123,10 @@ async def create_global_ruleset(global_ruleset_schema: GlobalRulesetSchema):
     """Create a new global ruleset. Returns the ID of the created ruleset."""
     openremote_service = get_openremote_service()
 
-    return await openremote_service.client.rule.create_global_ruleset(global_ruleset_schema)
+    response = await openremote_service.client.rule.create_global_ruleset(global_ruleset_schema)
+    _rulesets_changed(openremote_service, "global")
+
+    return response
 
 
 @rule_mcp.tool
@@ -36,7 +134,10 @@ async def update_global_ruleset(rule_id: int, global_ruleset_schema: GlobalRules
     """Update an existing global ruleset. First retrieve it with 'get_global_ruleset', modify, then call this."""
     openremote_service = get_openremote_service()
 
-    return await openremote_service.client.rule.update_global_ruleset(rule_id, global_ruleset_schema)
+    response = await openremote_service.client.rule.update_global_ruleset(rule_id, global_ruleset_schema)
+    _rulesets_changed(openremote_service, "global", rule_id)
+
+    return response
 
 
 @rule_mcp.tool
@@ -44,24 +145,23 @@ async def delete_global_ruleset(rule_id: int):
     """Delete a global ruleset by ID. Use with caution - this action cannot be undone."""
     openremote_service = get_openremote_service()
 
-    return await openremote_service.client.rule.delete_global_ruleset(rule_id)
+    response = await openremote_service.client.rule.delete_global_ruleset(rule_id)
+    _rulesets_changed(openremote_service, "global", rule_id)
+
+    return response
 
 
 # Realm Rulesets
-@rule_mcp.tool
-async def get_realm_rulesets(realm_name: str):
+@rule_mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
+async def get_realm_rulesets(realm_name: str, include_rules: bool = Field(default=False, description="Include the rules (source) of each ruleset, only their metadata is returned if omitted.")):
     """Retrieve all rulesets for a specific realm. Use 'get_all_realms' to see available realms."""
-    openremote_service = get_openremote_service()
-
-    return await openremote_service.client.rule.get_realm_rulesets(realm_name)
+    return await _list_rulesets("realm", f"/rules/realm/for/{quote(realm_name, safe='')}", include_rules)
 
 
-@rule_mcp.tool
+@rule_mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
 async def get_realm_ruleset(rule_id: int):
-    """Retrieve a specific realm ruleset by ID."""
-    openremote_service = get_openremote_service()
-
-    return await openremote_service.client.rule.get_realm_ruleset(rule_id)
+    """Retrieve a specific realm ruleset by ID, including its rules."""
+    return await _get_ruleset("realm", rule_id)
 
 
 @rule_mcp.tool
@@ -69,7 +169,10 @@ async def create_realm_ruleset(realm_ruleset_schema: RealmRulesetSchema):
     """Create a new realm ruleset. Returns the ID of the created ruleset."""
     openremote_service = get_openremote_service()
 
-    return await openremote_service.client.rule.create_realm_ruleset(realm_ruleset_schema)
+    response = await openremote_service.client.rule.create_realm_ruleset(realm_ruleset_schema)
+    _rulesets_changed(openremote_service, "realm")
+
+    return response
 
 
 @rule_mcp.tool
@@ -77,7 +180,10 @@ async def update_realm_ruleset(rule_id: int, realm_ruleset_schema: RealmRulesetS
     """Update an existing realm ruleset. First retrieve it with 'get_realm_ruleset', modify, then call this."""
     openremote_service = get_openremote_service()
 
-    return await openremote_service.client.rule.update_realm_ruleset(rule_id, realm_ruleset_schema)
+    response = await openremote_service.client.rule.update_realm_ruleset(rule_id, realm_ruleset_schema)
+    _rulesets_changed(openremote_service, "realm", rule_id)
+
+    return response
 
 
 @rule_mcp.tool
@@ -85,24 +191,23 @@ async def delete_realm_ruleset(rule_id: int):
     """Delete a realm ruleset by ID. Use with caution - this action cannot be undone."""
     openremote_service = get_openremote_service()
 
-    return await openremote_service.client.rule.delete_realm_ruleset(rule_id)
+    response = await openremote_service.client.rule.delete_realm_ruleset(rule_id)
+    _rulesets_changed(openremote_service, "realm", rule_id)
+
+    return response
 
 
 # Asset Rulesets
-@rule_mcp.tool
-async def get_asset_rulesets(asset_id: str):
+@rule_mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
+async def get_asset_rulesets(asset_id: str, include_rules: bool = Field(default=False, description="Include the rules (source) of each ruleset, only their metadata is returned if omitted.")):
     """Retrieve all rulesets for a specific asset."""
-    openremote_service = get_openremote_service()
-
-    return await openremote_service.client.rule.get_asset_rulesets(asset_id)
+    return await _list_rulesets("asset", f"/rules/asset/for/{quote(asset_id, safe='')}", include_rules)
 
 
-@rule_mcp.tool
+@rule_mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
 async def get_asset_ruleset(rule_id: int):
-    """Retrieve a specific asset ruleset by ID."""
-    openremote_service = get_openremote_service()
-
-    return await openremote_service.client.rule.get_asset_ruleset(rule_id)
+    """Retrieve a specific asset ruleset by ID, including its rules."""
+    return await _get_ruleset("asset", rule_id)
 
 
 @rule_mcp.tool
@@ -110,7 +215,10 @@ async def create_asset_ruleset(asset_ruleset_schema: AssetRulesetSchema):
     """Create a new asset ruleset. Returns the ID of the created ruleset."""
     openremote_service = get_openremote_service()
 
-    return await openremote_service.client.rule.create_asset_ruleset(asset_ruleset_schema)
+    response = await openremote_service.client.rule.create_asset_ruleset(asset_ruleset_schema)
+    _rulesets_changed(openremote_service, "asset")
+
+    return response
 
 
 @rule_mcp.tool
@@ -118,7 +226,10 @@ async def update_asset_ruleset(rule_id: int, asset_ruleset_schema: AssetRulesetS
     """Update an existing asset ruleset. First retrieve it with 'get_asset_ruleset', modify, then call this."""
     openremote_service = get_openremote_service()
 
-    return await openremote_service.client.rule.update_asset_ruleset(rule_id, asset_ruleset_schema)
+    response = await openremote_service.client.rule.update_asset_ruleset(rule_id, asset_ruleset_schema)
+    _rulesets_changed(openremote_service, "asset", rule_id)
+
+    return response
 
 
 @rule_mcp.tool
@@ -126,11 +237,14 @@ async def delete_asset_ruleset(rule_id: int):
     """Delete an asset ruleset by ID. Use with caution - this action cannot be undone."""
     openremote_service = get_openremote_service()
 
-    return await openremote_service.client.rule.delete_asset_ruleset(rule_id)
+    response = await openremote_service.client.rule.delete_asset_ruleset(rule_id)
+    _rulesets_changed(openremote_service, "asset", rule_id)
+
+    return response
 
 
 # Rules Engine Info
-@rule_mcp.tool
+@rule_mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
 async def get_global_engine_info():
     """Get information about the global rules engine status and configuration."""
     openremote_service = get_openremote_service()
@@ -138,7 +252,7 @@ async def get_global_engine_info():
     return await openremote_service.client.rule.get_global_engine_info()
 
 
-@rule_mcp.tool
+@rule_mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
 async def get_realm_engine_info(realm_name: str):
     """Get information about a realm's rules engine status and configuration."""
     openremote_service = get_openremote_service()
@@ -146,7 +260,7 @@ async def get_realm_engine_info(realm_name: str):
     return await openremote_service.client.rule.get_realm_engine_info(realm_name)
 
 
-@rule_mcp.tool
+@rule_mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
 async def get_asset_engine_info(asset_id: str):
     """Get information about an asset's rules engine status and configuration."""
     openremote_service = get_openremote_service()
@@ -154,13 +268,9 @@ async def get_asset_engine_info(asset_id: str):
     return await openremote_service.client.rule.get_asset_engine_info(asset_id)
 
 
-@rule_mcp.tool
+@rule_mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
 async def get_asset_geofences(asset_id: str):
     """Get the geofences configured for an asset."""
     openremote_service = get_openremote_service()
 
     return await openremote_service.client.rule.get_asset_geofences(asset_id)
-
-
-def init_rule(mcp: FastMCP):
-    mcp.mount(rule_mcp)
@@ -0,0 +1,69 @@
+import logging
+import time
+from contextlib import contextmanager
+from typing import Awaitable, TypeVar
+
+logger = logging.getLogger("uvicorn")
+
+T = TypeVar('T')
+
+
+class StartupProfile:
+    """
+    Durations of the startup phases (imports, config, registration, ...), measured from the import of the app
+    until it's ready to accept traffic. Only depends on the standard library so it can be imported first.
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.phases: dict[str, float] = {}
+        self.ready_after: float | None = None
+        self.__last_mark = self.started_at
+        # Time of the (outermost) phases since the previous mark, so marks don't count it twice
+        self.__phased = 0.0
+        self.__open_phases = 0
+
+    def mark(self, name: str):
+        """
+        Record the time since the previous mark (or the start) as a phase, for phases that run one after another.
+        Phases measured in between (e.g. config during the imports) are reported on their own and left out.
+        """
+        now = time.perf_counter()
+        self.phases[name] = self.phases.get(name, 0.0) + now - self.__last_mark - self.__phased
+        self.__last_mark = now
+        self.__phased = 0.0
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        outermost = self.__open_phases == 0
+        self.__open_phases += 1
+        try:
+            yield
+        finally:
+            self.__open_phases -= 1
+            elapsed = time.perf_counter() - started
+            self.phases[name] = self.phases.get(name, 0.0) + elapsed
+            if outermost:
+                self.__phased += elapsed
+
+    async def measure(self, name: str, awaitable: Awaitable[T]) -> T:
+        """Record the wall time of an awaitable as a phase, for phases that run concurrently."""
+        with self.phase(name):
+            return await awaitable
+
+    def ready(self):
+        self.ready_after = time.perf_counter() - self.started_at
+
+    def report(self) -> dict:
+        return {
+            "phases_ms": {name: round(seconds * 1000, 1) for name, seconds in self.phases.items()},
+            "ready_ms": round(self.ready_after * 1000, 1) if self.ready_after is not None else None,
+        }
+
+    def log(self):
+        phases = ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in self.phases.items())
+        logger.info(f"Ready {self.ready_after * 1000:.0f}ms after import ({phases})")
+
+
+startup_profile = StartupProfile()
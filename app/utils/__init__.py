@@ -1 +1,12 @@
-from .asset_attribute_model import asset_attribute_model_factory
+from .asset_attribute_model import asset_attribute_model_factory, AssetAttributeModelFactory, AttributeTypeResolver
+from .metadata_cache import metadata_cache, MetadataCache, content, json_content
+from .shared_cache import SharedCacheStore, FileSharedCacheStore
+from .single_flight import SingleFlight
+from .lazy_tool import LazyTool
+from .asset_model_snapshot import AssetModelSnapshot, hash_asset_infos, load_asset_model_snapshot, save_asset_model_snapshot
+from .pagination import hash_query, encode_cursor, decode_cursor
+from .result_encoding import compact, tabulate, encode_json
+from .background import run_in_background
+from .asset_index import AssetIndex, IndexedAsset
+from .attribute_value_cache import AttributeValueCache, CachedAsset, CachedAttribute
+from .ruleset_cache import RulesetCache
@@ -1,7 +1,12 @@
-from typing import Optional
+import logging
+import weakref
+from typing import Any, Iterable, Optional
 
 from openremote_client.schemas import AttributeDescriptorObjectSchema
-from pydantic import create_model, Field
+from pydantic import BaseModel, ConfigDict, Field, create_model
+from pydantic.fields import FieldInfo
+
+logger = logging.getLogger("uvicorn")
 
 TYPE_MAP = {
     "text": str,
@@ -10,19 +15,19 @@ TYPE_MAP = {
     "email": str,
     "text[]": list[str],
     "colourRGB": str,
-    "GEO_JSONPoint": str,
+    "GEO_JSONPoint": dict,
     "hostOrIPAddress": str,
     "TCP_IPPortNumber": str,
-    "usernameAndPassword": str,
+    "usernameAndPassword": dict,
     "connectionStatus": str,
-    "oAuthGrant": str,
+    "oAuthGrant": dict,
     "assetType": str,
     "positiveNumber": float,
     "number": float,
     "executionStatus": str,
     "positiveInteger[][]": list[list[int]],
     "connectorType": str,
-    "multivaluedTextMap": str,
+    "multivaluedTextMap": dict,
     "HTTP_URL": str,
     "integer": int,
     "SNMPVersion": str,
@@ -31,8 +36,8 @@ TYPE_MAP = {
     "panelOrientation": str,
     "UUID": str,
     "WS_URL": str,
-    "websocketSubscription": str,
-    "websocketSubscription[]": list[str],
+    "websocketSubscription": dict,
+    "websocketSubscription[]": list[dict],
     "energyType": str,
     "operationMode": str,
     "consoleProviders": str,
@@ -40,18 +45,93 @@ TYPE_MAP = {
     "vegetableType": str
 }
 
+# Python types of the JSON types of value descriptors, used for value types missing from TYPE_MAP
+JSON_TYPE_MAP = {
+    "string": str,
+    "number": float,
+    "integer": int,
+    "boolean": bool,
+    "object": dict,
+    "array": list,
+}
+
 
+class AttributeTypeResolver:
+    """
+    Resolves value types to Python types: TYPE_MAP first, then arrays of a known type, then the JSON type
+    of the manager's value descriptors. Anything else is accepted as is (Any) rather than failing.
+    """
 
-def asset_attribute_model_factory(name: str, attributes: list[AttributeDescriptorObjectSchema]):
-    model_fields = {}
+    def __init__(self):
+        self.__json_types: dict[str, tuple[str | None, int]] = {}
+        self.__resolved: dict[str, Any] = {}
+        self.unknown: set[str | None] = set()
 
-    for attribute in attributes:
-        field_name = attribute["name"]
-        field_type = attribute.get("type")
-        optional = attribute.get("optional", False)
-        constraints = attribute.get("constraints", [])
+    def register(self, value_descriptors: Iterable[dict]):
+        """Register the value descriptors of an asset info (`valueDescriptors`)."""
+        for value_descriptor in value_descriptors:
+            if not isinstance(value_descriptor, dict) or not value_descriptor.get("name"):
+                continue
+
+            json_type = (value_descriptor.get("jsonType"), value_descriptor.get("arrayDimensions") or 0)
+            if self.__json_types.get(value_descriptor["name"]) != json_type:
+                self.__json_types[value_descriptor["name"]] = json_type
+                self.__resolved.clear()
+
+    def resolve(self, value_type: str | dict | None) -> Any:
+        if isinstance(value_type, dict):
+            self.register([value_type])
+            value_type = value_type.get("name")
+
+        if value_type not in self.__resolved:
+            self.__resolved[value_type] = self.__resolve(value_type)
+
+        return self.__resolved[value_type]
+
+    def __resolve(self, value_type: str | None) -> Any:
+        if value_type in TYPE_MAP:
+            return TYPE_MAP[value_type]
+
+        if value_type and value_type.endswith("[]"):
+            return list[self.resolve(value_type[:-2])]
+
+        json_type, array_dimensions = self.__json_types.get(value_type, (None, 0))
+        if json_type in JSON_TYPE_MAP:
+            py_type = JSON_TYPE_MAP[json_type]
+            for _ in range(array_dimensions if json_type != "array" else 0):
+                py_type = list[py_type]
+            return py_type
+
+        if value_type not in self.unknown:
+            self.unknown.add(value_type)
+            logger.warning(f"Unknown value type '{value_type}', accepting any value")
+
+        return Any
 
-        py_type = TYPE_MAP[field_type]
+
+def _drop_title(schema: dict):
+    # Models are shared by asset types with the same attributes, so their (class) name isn't meaningful
+    schema.pop("title", None)
+
+
+class AssetAttributeModelFactory:
+    """
+    Builds the pydantic attribute models of asset types. Fields and whole models are interned by their
+    definition, so asset types sharing attributes (e.g. location, notes) or all of them build those once.
+
+    Models are only interned while in use (weakly referenced), the fields until `clear` is called.
+    """
+
+    def __init__(self):
+        self.resolver = AttributeTypeResolver()
+        self.__fields: dict[tuple, tuple[Any, FieldInfo]] = {}
+        self.__models: weakref.WeakValueDictionary[tuple, type[BaseModel]] = weakref.WeakValueDictionary()
+        self.built = 0
+        self.reused = 0
+
+    def __field(self, attribute: dict) -> tuple[tuple, tuple[Any, FieldInfo]]:
+        py_type = self.resolver.resolve(attribute.get("type"))
+        optional = attribute.get("optional", False)
 
         # Build Field() constraints
         field_args = {}
@@ -61,13 +141,41 @@ def asset_attribute_model_factory(name: str, attributes: list[AttributeDescripto
             py_type = Optional[py_type]
             field_args["default"] = None
 
-
-        for c in constraints:
+        for c in attribute.get("constraints") or []:
             if c["type"] == "min":
                 field_args["ge"] = c["min"]
             elif c["type"] == "max":
                 field_args["le"] = c["max"]
 
-        model_fields[field_name] = (py_type, Field(**field_args))
+        key = (attribute["name"], py_type, tuple(sorted(field_args.items())))
+        if key not in self.__fields:
+            self.__fields[key] = (py_type, Field(**field_args))
+
+        return key, self.__fields[key]
+
+    def __call__(self, name: str, attributes: list[AttributeDescriptorObjectSchema]) -> type[BaseModel]:
+        fields = [self.__field(attribute) for attribute in attributes]
+        key = tuple(field_key for field_key, _ in fields)
+
+        model = self.__models.get(key)
+        if model is not None:
+            self.reused += 1
+        else:
+            self.built += 1
+            model = self.__models[key] = create_model(
+                name,
+                __config__=ConfigDict(json_schema_extra=_drop_title),
+                **{field_key[0]: field for field_key, field in fields}
+            )
+
+        return model
+
+    def clear(self):
+        """Drop the interned fields, e.g. before the models of changed asset types are rebuilt."""
+        self.__fields.clear()
+
+    def stats(self) -> dict:
+        return {"models": len(self.__models), "fields": len(self.__fields), "built": self.built, "reused": self.reused}
+
 
-    return create_model(name, **model_fields)
+asset_attribute_model_factory = AssetAttributeModelFactory()
@@ -0,0 +1,142 @@
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+
+
+@dataclass(slots=True)
+class IndexedAsset:
+    id: str
+    name: str | None
+    type: str | None
+    realm: str | None
+    parent_id: str | None
+
+
+class AssetIndex:
+    """
+    In-memory parent/child index of the asset hierarchy, so subtrees and ancestry can be answered
+    locally instead of walking the tree with a request per level.
+
+    Only the basic asset fields are kept. Lookups are O(subtree) for descendants and O(depth) for ancestry.
+    """
+
+    def __init__(self):
+        self.assets: dict[str, IndexedAsset] = {}
+        self.children: dict[str | None, dict[str, None]] = {}
+        self.built_at: float | None = None
+        # Changes made while rebuilds are in progress, see `track_changes`
+        self.__changes: list[dict[str, IndexedAsset | None]] = []
+
+    def __len__(self) -> int:
+        return len(self.assets)
+
+    @property
+    def is_built(self) -> bool:
+        return self.built_at is not None
+
+    def age(self) -> float:
+        return time.monotonic() - self.built_at if self.built_at is not None else float("inf")
+
+    def track_changes(self) -> dict[str, IndexedAsset | None]:
+        """
+        Record the upserts and removals from now on, until `untrack_changes`. Pass them to `replace`, so changes
+        made while the assets were being fetched aren't lost. Removed assets are recorded as None.
+        """
+        changes = {}
+        self.__changes.append(changes)
+
+        return changes
+
+    def untrack_changes(self, changes: dict[str, IndexedAsset | None]):
+        self.__changes = [tracked for tracked in self.__changes if tracked is not changes]
+
+    def replace(self, assets: Iterable[IndexedAsset], changes: dict[str, IndexedAsset | None] | None = None):
+        """Replace the whole index, e.g. after a full rebuild, and apply the changes made since it started."""
+        self.assets = {}
+        self.children = {}
+        for asset in assets:
+            self.__upsert(asset)
+
+        for asset_id, asset in list((changes or {}).items()):
+            if asset is None:
+                self.__remove(asset_id)
+            else:
+                self.__upsert(asset)
+
+        self.built_at = time.monotonic()
+
+    def __record(self, asset_id: str, asset: IndexedAsset | None):
+        for changes in self.__changes:
+            # Moved to the end, changes are applied in the order they were made
+            changes.pop(asset_id, None)
+            changes[asset_id] = asset
+
+    def upsert(self, asset: IndexedAsset):
+        self.__record(asset.id, asset)
+        self.__upsert(asset)
+
+    def __upsert(self, asset: IndexedAsset):
+        previous = self.assets.get(asset.id)
+        if previous is not None and previous.parent_id != asset.parent_id:
+            self.children.get(previous.parent_id, {}).pop(asset.id, None)
+
+        self.assets[asset.id] = asset
+        # Dicts keep the insertion order, unlike sets, so listings are stable
+        self.children.setdefault(asset.parent_id, {})[asset.id] = None
+
+    def remove(self, asset_id: str):
+        """Remove an asset and its descendants, OpenRemote deletes children together with their parent."""
+        self.__record(asset_id, None)
+        self.__remove(asset_id)
+
+    def __remove(self, asset_id: str):
+        asset = self.assets.get(asset_id)
+        if asset is None:
+            return
+
+        for descendant, _ in list(self.descendants(asset_id)):
+            self.assets.pop(descendant.id, None)
+            self.children.pop(descendant.id, None)
+
+        self.children.get(asset.parent_id, {}).pop(asset_id, None)
+        self.children.pop(asset_id, None)
+        del self.assets[asset_id]
+
+    def roots(self) -> list[IndexedAsset]:
+        """Assets without a parent, or whose parent isn't indexed (e.g. in a realm that isn't accessible)."""
+        return [asset for asset in self.assets.values() if asset.parent_id is None or asset.parent_id not in self.assets]
+
+    def ancestors(self, asset_id: str) -> list[IndexedAsset]:
+        """Ancestors of an asset, from the root down to its parent."""
+        ancestors = []
+        seen = {asset_id}
+        parent_id = self.assets[asset_id].parent_id
+
+        while parent_id is not None and parent_id in self.assets and parent_id not in seen:
+            seen.add(parent_id)
+            ancestors.append(self.assets[parent_id])
+            parent_id = self.assets[parent_id].parent_id
+
+        ancestors.reverse()
+
+        return ancestors
+
+    def descendants(self, asset_id: str | None, max_depth: int | None = None) -> Iterator[tuple[IndexedAsset, int]]:
+        """Breadth-first descendants of an asset, with their depth below it. When None, the roots are at depth 1."""
+        if asset_id is None:
+            queue = deque((root.id, 1) for root in self.roots())
+        else:
+            queue = deque((child_id, 1) for child_id in self.children.get(asset_id, {}))
+        seen = set()
+
+        while queue:
+            child_id, depth = queue.popleft()
+            if child_id in seen or child_id not in self.assets:
+                continue
+
+            seen.add(child_id)
+            yield self.assets[child_id], depth
+
+            if max_depth is None or depth < max_depth:
+                queue.extend((grandchild_id, depth + 1) for grandchild_id in self.children.get(child_id, {}))
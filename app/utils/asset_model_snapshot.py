@@ -0,0 +1,79 @@
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+
+from pydantic import BaseModel, ValidationError
+
+logger = logging.getLogger("uvicorn")
+
+# Bump whenever the stored schemas would change for the same asset infos (e.g. factory changes).
+# 3: models shared by asset types (interning) have no title, unknown value types are resolved
+# 4: object value types (e.g. GEO_JSONPoint) are objects instead of strings
+SNAPSHOT_VERSION = 4
+
+
+class AssetModelSnapshot(BaseModel):
+    version: int
+    source: str
+    content_hash: str
+    asset_infos: list[dict]
+    schemas: dict[str, dict] = {}
+
+
+def hash_asset_infos(asset_infos: list[dict]) -> str:
+    """Content hash of the asset infos, independent of key order."""
+    return hashlib.sha256(json.dumps(asset_infos, sort_keys=True, separators=(',', ':')).encode()).hexdigest()
+
+
+def load_asset_model_snapshot(path: str, source: str) -> AssetModelSnapshot | None:
+    """Load the snapshot at path, returns None if it is missing, corrupt, outdated or from another manager."""
+    snapshot_path = Path(path)
+    if not snapshot_path.is_file():
+        return None
+
+    try:
+        snapshot = AssetModelSnapshot.model_validate_json(snapshot_path.read_bytes())
+    except (OSError, ValidationError) as e:
+        logger.warning(f"Discarding corrupt asset model snapshot '{path}'")
+        logger.debug(e)
+        return None
+
+    if snapshot.version != SNAPSHOT_VERSION or snapshot.source != source:
+        logger.info(f"Discarding stale asset model snapshot '{path}'")
+        return None
+
+    if snapshot.content_hash != hash_asset_infos(snapshot.asset_infos):
+        logger.warning(f"Discarding corrupt asset model snapshot '{path}', content hash mismatch")
+        return None
+
+    return snapshot
+
+
+def save_asset_model_snapshot(path: str, source: str, asset_infos: list[dict], schemas: dict[str, dict]) -> AssetModelSnapshot | None:
+    """Atomically write a snapshot of the asset infos and their generated schemas."""
+    snapshot = AssetModelSnapshot(
+        version=SNAPSHOT_VERSION,
+        source=source,
+        content_hash=hash_asset_infos(asset_infos),
+        asset_infos=asset_infos,
+        schemas=schemas,
+    )
+
+    snapshot_path = Path(path)
+    temp_path = snapshot_path.with_name(f"{snapshot_path.name}.{os.getpid()}.tmp")
+
+    try:
+        snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path.write_text(snapshot.model_dump_json())
+        os.replace(temp_path, snapshot_path)
+    except OSError as e:
+        logger.warning(f"Failed to write asset model snapshot '{path}'")
+        logger.debug(e)
+        temp_path.unlink(missing_ok=True)
+        return None
+
+    logger.debug(f"Wrote asset model snapshot '{path}' ({snapshot.content_hash[:12]})")
+
+    return snapshot
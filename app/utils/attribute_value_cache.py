@@ -0,0 +1,105 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any
+
+
+@dataclass(slots=True)
+class CachedAttribute:
+    value: Any
+    timestamp: int | None
+    updated_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass(slots=True)
+class CachedAsset:
+    attributes: dict[str, CachedAttribute]
+    # Whether the values are kept up to date by events, false after missing events (e.g. on a reconnect)
+    live: bool = True
+
+
+class AttributeValueCache:
+    """Latest attribute values of the most recently read assets, the least recently read assets are evicted first."""
+
+    def __init__(self, max_assets: int = 100):
+        self.max_assets = max_assets
+        self.__assets: OrderedDict[str, CachedAsset] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Number of times events may have been missed, see `mark_stale`
+        self.stale_marks = 0
+
+    def __contains__(self, asset_id: str) -> bool:
+        return asset_id in self.__assets
+
+    def get(self, asset_id: str) -> CachedAsset | None:
+        """Cached asset, if its values are live."""
+        asset = self.__assets.get(asset_id)
+        if asset is None or not asset.live:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.__assets.move_to_end(asset_id)
+
+        return asset
+
+    def peek(self, asset_id: str) -> CachedAsset | None:
+        return self.__assets.get(asset_id)
+
+    def discard(self, asset_id: str):
+        self.__assets.pop(asset_id, None)
+
+    def seed(self, asset_id: str, attributes: dict[str, CachedAttribute], live: bool = True) -> list[str]:
+        """
+        Store the current values of an asset, values received by events in the meantime are kept if newer.
+        Seed with `live` false to collect events before the values are known. Returns the ids of the evicted assets.
+        """
+        asset = self.__assets.get(asset_id)
+        if asset is None:
+            self.__assets[asset_id] = CachedAsset(attributes=dict(attributes), live=live)
+        else:
+            for name, attribute in attributes.items():
+                current = asset.attributes.get(name)
+                if current is None or current.timestamp is None or (attribute.timestamp or 0) >= current.timestamp:
+                    asset.attributes[name] = attribute
+            asset.live = live
+
+        self.__assets.move_to_end(asset_id)
+
+        evicted = []
+        while len(self.__assets) > self.max_assets:
+            evicted_id, _ = self.__assets.popitem(last=False)
+            evicted.append(evicted_id)
+            self.evictions += 1
+
+        return evicted
+
+    def apply_event(self, asset_id: str, attribute_name: str, value: Any, timestamp: int | None):
+        asset = self.__assets.get(asset_id)
+        if asset is None:
+            return
+
+        current = asset.attributes.get(attribute_name)
+        if current is not None and current.timestamp is not None and timestamp is not None and timestamp < current.timestamp:
+            return  # Out of order
+
+        asset.attributes[attribute_name] = CachedAttribute(value=value, timestamp=timestamp)
+
+    def mark_stale(self):
+        self.stale_marks += 1
+        for asset in self.__assets.values():
+            asset.live = False
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+
+        return {
+            "size": len(self.__assets),
+            "max_size": self.max_assets,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
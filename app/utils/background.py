@@ -0,0 +1,13 @@
+import asyncio
+from typing import Coroutine
+
+__background_tasks: set[asyncio.Task] = set()
+
+
+def run_in_background(coroutine: Coroutine) -> asyncio.Task:
+    # Keep a reference so the task isn't garbage collected before it finishes
+    task = asyncio.create_task(coroutine)
+    __background_tasks.add(task)
+    task.add_done_callback(__background_tasks.discard)
+
+    return task
@@ -0,0 +1,58 @@
+from functools import cache
+from typing import Any, Callable
+
+from fastmcp.tools import Tool
+from fastmcp.tools.tool import ToolResult
+from mcp.types import Tool as MCPTool
+from pydantic import Field
+
+
+class LazyTool(Tool):
+    """
+    Lightweight placeholder for a tool that is expensive to build.
+
+    Only the name, description and a factory are stored at registration, the actual tool is built
+    the first time it is listed or invoked and memoized. When the parameters schema is already known
+    (e.g. from a snapshot), listing is served from it and only invocation builds the tool.
+    Copies made by FastMCP (prefixing, mounting) share the memoized tool.
+    """
+
+    factory: Callable[[], Tool] = Field(exclude=True)
+    compile_on_list: bool = True
+
+    @classmethod
+    def from_factory(cls, factory: Callable[[], Tool], name: str, description: str | None = None, parameters: dict | None = None, **kwargs: Any) -> "LazyTool":
+        return cls(
+            name=name,
+            description=description,
+            parameters=parameters or {"type": "object", "properties": {}},
+            factory=cache(factory),
+            compile_on_list=parameters is None,
+            **kwargs
+        )
+
+    @property
+    def is_compiled(self) -> bool:
+        return self.factory.cache_info().currsize > 0
+
+    def compile(self) -> Tool:
+        tool = self.factory()
+        if self.compile_on_list:
+            # Keep the properties added to the placeholder schema since, e.g. the 'target' of TargetRoutingMiddleware
+            self.parameters = {
+                **tool.parameters,
+                "properties": {**tool.parameters.get("properties", {}), **self.parameters.get("properties", {})},
+            }
+            self.output_schema = tool.output_schema
+            self.compile_on_list = False
+
+        return tool
+
+    def to_mcp_tool(self, *, include_fastmcp_meta: bool | None = None, **overrides: Any) -> MCPTool:
+        if self.compile_on_list:
+            self.compile()
+
+        return super().to_mcp_tool(include_fastmcp_meta=include_fastmcp_meta, **overrides)
+
+    async def run(self, arguments: dict[str, Any]) -> ToolResult:
+        return await self.compile().run(arguments)
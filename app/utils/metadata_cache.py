@@ -0,0 +1,131 @@
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+from ..config import config
+from .shared_cache import SharedCacheStore, create_shared_cache_store
+from .single_flight import SingleFlight
+
+
+async def content(request: Awaitable[Any]) -> Any:
+    """Content of an OpenRemote response, what's cached instead of the response itself."""
+    return (await request).content
+
+
+async def json_content(request: Awaitable[Any]) -> Any:
+    """JSON body of an OpenRemote response, for content that's only used as plain data."""
+    return (await request).response.json()
+
+
+class MetadataCache:
+    """
+    In-process cache for OpenRemote metadata that rarely changes (asset models, realms).
+
+    Entries expire after a per-resource TTL and the least recently used entry is evicted once
+    `max_size` is reached. Concurrent misses for the same key share a single upstream request.
+    With a `shared` store, misses are looked up there before fetching, and fetched entries are shared.
+    """
+
+    def __init__(self, ttls: dict[str, int], max_size: int = 256, default_ttl: int = 60, shared: SharedCacheStore | None = None):
+        self.__ttls = ttls
+        self.__default_ttl = default_ttl
+        self.__max_size = max_size
+        self.shared = shared
+        self.__entries: OrderedDict[tuple[str, Hashable], tuple[float, Any]] = OrderedDict()
+        self.__pending = SingleFlight()
+        self.__generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.shared_hits = 0
+
+    async def get_or_fetch(self, resource: str, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Cached value of a key, fetched on a miss. `fetch` returns plain content (see `content`), not a response."""
+        cache_key = (resource, key)
+
+        entry = self.__entries.get(cache_key)
+        if entry is not None:
+            expires_on, value = entry
+            if expires_on > time.monotonic():
+                self.__entries.move_to_end(cache_key)
+                self.hits += 1
+                return value
+            del self.__entries[cache_key]
+
+        if cache_key in self.__pending:
+            self.coalesced += 1
+        elif self.shared is not None and (entry := self.shared.get(resource, key)) is not None:
+            expires_at, value = entry
+            self.shared_hits += 1
+            self.__store(cache_key, value, expires_at - time.time())
+            return value
+        else:
+            self.misses += 1
+
+        generation = self.__generation
+        return await self.__pending.run(cache_key, lambda: self.__fetch(resource, key, fetch, generation))
+
+    async def __fetch(self, resource: str, key: Hashable, fetch: Callable[[], Awaitable[Any]], generation: int) -> Any:
+        value = await fetch()
+
+        # Don't store results that were fetched before an invalidation
+        if generation == self.__generation:
+            ttl = self.__ttls.get(resource, self.__default_ttl)
+            self.__store((resource, key), value, ttl)
+            if self.shared is not None and ttl > 0:
+                self.shared.set(resource, key, value, ttl)
+
+        return value
+
+    def __store(self, cache_key: tuple[str, Hashable], value: Any, ttl: float):
+        if ttl <= 0:
+            return
+
+        self.__entries[cache_key] = (time.monotonic() + ttl, value)
+        self.__entries.move_to_end(cache_key)
+
+        while len(self.__entries) > self.__max_size:
+            self.__entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, resource: str | None = None, key: Hashable | None = None):
+        """Drop cached entries, all of them, those of a resource, or a single key of a resource."""
+        self.__generation += 1
+        if self.shared is not None:
+            self.shared.invalidate(resource, key)
+
+        if resource is None:
+            self.__entries.clear()
+            return
+
+        for cache_key in list(self.__entries):
+            if cache_key[0] == resource and (key is None or cache_key[1] == key):
+                del self.__entries[cache_key]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced + self.shared_hits
+
+        return {
+            "size": len(self.__entries),
+            "max_size": self.__max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "shared_hits": self.shared_hits,
+            "hit_ratio": round((self.hits + self.coalesced + self.shared_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+metadata_cache = MetadataCache(
+    ttls={
+        "asset_model": config.cache_asset_model_ttl,
+        "realm": config.cache_realm_ttl,
+        "ruleset": config.cache_ruleset_ttl,
+    },
+    max_size=config.cache_max_size,
+    # Shared by default when running multiple workers, so only one of them fetches each entry
+    shared=create_shared_cache_store(config.cache_shared or ("file" if config.app_workers > 1 else None), config.cache_shared_path),
+)
@@ -0,0 +1,31 @@
+import base64
+import hashlib
+
+from pydantic import BaseModel
+
+
+class Cursor(BaseModel):
+    query_hash: str
+    offset: int
+
+
+def hash_query(query: BaseModel) -> str:
+    """Short hash of a query, used to make sure a cursor is only used with the query it was issued for."""
+    return hashlib.sha256(query.model_dump_json(exclude={'limit', 'offset'}).encode()).hexdigest()[:16]
+
+
+def encode_cursor(query_hash: str, offset: int) -> str:
+    return base64.urlsafe_b64encode(Cursor(query_hash=query_hash, offset=offset).model_dump_json().encode()).decode()
+
+
+def decode_cursor(cursor: str, query_hash: str) -> Cursor:
+    """Decode an opaque cursor, raises ValueError if it is invalid or belongs to another query."""
+    try:
+        decoded = Cursor.model_validate_json(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        raise ValueError("Invalid cursor")
+
+    if decoded.query_hash != query_hash:
+        raise ValueError("Cursor does not belong to this query, use the same query as the previous page")
+
+    return decoded
@@ -0,0 +1,80 @@
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # Optional, falls back to the standard library encoder
+    orjson = None
+
+# Shape of a serialized `openremote_client` ResponseModel, only its content is of interest to the AI
+RESPONSE_MODEL_KEYS = {"status_code", "content", "response"}
+
+# Attribute values and meta items are data, a null or empty value in them means something
+DATA_KEYS = {"value", "meta"}
+
+
+def compact(value: Any) -> Any:
+    """
+    Drop nulls and empty containers from the objects nested in JSON data and unwrap serialized OpenRemote responses.
+    The keys of the result itself are kept (e.g. the empty 'assets' of a page), and so are attribute values and meta.
+    """
+    if isinstance(value, dict):
+        if value.keys() == RESPONSE_MODEL_KEYS:
+            # An OpenRemote object (e.g. an asset) rather than a result of this server
+            return _compact(value["content"])
+
+        return {key: _compact(item, key) for key, item in value.items()}
+
+    return _compact(value)
+
+
+def _compact(value: Any, key: str | None = None) -> Any:
+    if key in DATA_KEYS:
+        return value
+
+    if isinstance(value, dict):
+        if value.keys() == RESPONSE_MODEL_KEYS:
+            return _compact(value["content"])
+
+        compacted = {}
+        for item_key, item in value.items():
+            item = _compact(item, item_key)
+            if item_key not in DATA_KEYS and (item is None or item == {} or item == []):
+                continue
+            compacted[item_key] = item
+
+        return compacted
+
+    if isinstance(value, list):
+        return [_compact(item) for item in value]
+
+    return value
+
+
+def tabulate(value: Any, min_rows: int = 3) -> Any:
+    """
+    Encode homogeneous lists of objects (e.g. assets) as {"columns": [...], "rows": [[...]]},
+    so keys aren't repeated for every item.
+    """
+    if isinstance(value, dict):
+        return {key: tabulate(item, min_rows) for key, item in value.items()}
+
+    if isinstance(value, list):
+        if len(value) >= min_rows and all(isinstance(item, dict) for item in value):
+            columns = list(dict.fromkeys(key for item in value for key in item))
+
+            return {
+                "columns": columns,
+                "rows": [[tabulate(item.get(column), min_rows) for column in columns] for item in value],
+            }
+
+        return [tabulate(item, min_rows) for item in value]
+
+    return value
+
+
+def encode_json(value: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(value).decode()
+
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False)
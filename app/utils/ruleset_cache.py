@@ -0,0 +1,51 @@
+from collections import OrderedDict
+from typing import Hashable
+
+
+class RulesetCache:
+    """
+    Full rulesets (including their rules) stored with their version, so a ruleset is only fetched again once
+    its version changed. The least recently used rulesets are evicted first.
+    """
+
+    def __init__(self, max_size: int = 500):
+        self.max_size = max_size
+        self.__rulesets: OrderedDict[Hashable, tuple[int | None, dict]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, version: int | None) -> dict | None:
+        """Cached ruleset, if it's of the given version."""
+        entry = self.__rulesets.get(key)
+        if entry is None or entry[0] != version or version is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.__rulesets.move_to_end(key)
+
+        return entry[1]
+
+    def put(self, key: Hashable, ruleset: dict):
+        if self.max_size <= 0:
+            return
+
+        self.__rulesets[key] = (ruleset.get("version"), ruleset)
+        self.__rulesets.move_to_end(key)
+
+        while len(self.__rulesets) > self.max_size:
+            self.__rulesets.popitem(last=False)
+            self.evictions += 1
+
+    def discard(self, key: Hashable):
+        self.__rulesets.pop(key, None)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self.__rulesets),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
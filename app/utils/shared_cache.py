@@ -0,0 +1,98 @@
+import hashlib
+import logging
+import os
+import pickle
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Hashable
+
+from pydantic import ImportString, TypeAdapter
+
+logger = logging.getLogger("uvicorn")
+
+
+class SharedCacheStore(ABC):
+    """
+    Second level of the metadata cache, shared by the workers (or replicas) so only one of them fetches an entry
+    from OpenRemote. Implementations must not raise, a failing store should behave like an empty one.
+    """
+
+    @abstractmethod
+    def get(self, resource: str, key: Hashable) -> tuple[float, Any] | None:
+        """The expiry time (`time.time()` based) and value of an entry, None if it's missing or expired."""
+
+    @abstractmethod
+    def set(self, resource: str, key: Hashable, value: Any, ttl: float):
+        """Store an entry for `ttl` seconds."""
+
+    @abstractmethod
+    def invalidate(self, resource: str | None = None, key: Hashable | None = None):
+        """Drop all entries, those of a resource, or a single key of a resource."""
+
+
+class FileSharedCacheStore(SharedCacheStore):
+    """
+    Entries pickled to files in a directory, for the workers of a single host (or replicas sharing a volume).
+    Only point it at a directory private to the service, entries are unpickled.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+
+    def __path(self, resource: str, key: Hashable) -> Path:
+        return self.directory / f"{resource}-{hashlib.sha256(repr(key).encode()).hexdigest()[:32]}.pickle"
+
+    def get(self, resource: str, key: Hashable) -> tuple[float, Any] | None:
+        path = self.__path(resource, key)
+        try:
+            expires_at, value = pickle.loads(path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.debug(f"Failed to read shared cache entry '{path}': {e}")
+            return None
+
+        if expires_at <= time.time():
+            path.unlink(missing_ok=True)
+            return None
+
+        return expires_at, value
+
+    def set(self, resource: str, key: Hashable, value: Any, ttl: float):
+        path = self.__path(resource, key)
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+
+        try:
+            data = pickle.dumps((time.time() + ttl, value))
+            self.directory.mkdir(parents=True, exist_ok=True)
+            temp_path.write_bytes(data)
+            os.replace(temp_path, path)
+        except Exception as e:
+            logger.debug(f"Failed to write shared cache entry '{path}': {e}")
+            temp_path.unlink(missing_ok=True)
+
+    def invalidate(self, resource: str | None = None, key: Hashable | None = None):
+        if resource is not None and key is not None:
+            paths = [self.__path(resource, key)]
+        else:
+            paths = self.directory.glob(f"{resource}-*.pickle" if resource is not None else "*.pickle")
+
+        for path in paths:
+            try:
+                path.unlink(missing_ok=True)
+            except OSError as e:
+                logger.debug(f"Failed to remove shared cache entry '{path}': {e}")
+
+
+def create_shared_cache_store(backend: str | None, path: str) -> SharedCacheStore | None:
+    """
+    Create the shared cache `backend`: 'file' (a directory at `path`), None (no shared cache),
+    or the import path of a `SharedCacheStore` factory, e.g. 'my_package.cache:RedisSharedCacheStore'.
+    """
+    if not backend:
+        return None
+    if backend == "file":
+        return FileSharedCacheStore(path)
+
+    return TypeAdapter(ImportString).validate_python(backend)()
@@ -0,0 +1,52 @@
+import asyncio
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Runs concurrent calls for the same key only once, every caller awaits the result of the same call.
+
+    The call runs in its own task, so a cancelled caller doesn't fail the others waiting on it.
+    The call itself is only cancelled once none of its callers is waiting anymore.
+    """
+
+    def __init__(self):
+        self.__flights: dict[Hashable, _Flight] = {}
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.__flights
+
+    def __len__(self) -> int:
+        return len(self.__flights)
+
+    async def run(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        flight = self.__flights.get(key)
+        if flight is None:
+            flight = self.__flights[key] = _Flight(asyncio.ensure_future(call()))
+            flight.task.add_done_callback(lambda _: self.__done(key, flight))
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+                # Later callers start a new call instead of joining the cancelled one
+                self.__done(key, flight)
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def __done(self, key: Hashable, flight: _Flight):
+        if self.__flights.get(key) is flight:
+            del self.__flights[key]
@@ -0,0 +1,118 @@
+"""
+Build time and memory of the asset attribute models, for synthetic asset models of many asset types.
+
+Compares building every model from scratch (a new factory per asset type) with the interning factory,
+for asset types that share attribute descriptor sets like the asset types of an OpenRemote manager do.
+
+    uv run python benchmarks/asset_models.py --types 2000 --unique 0.2
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# Importing the app requires its configuration, no manager is contacted
+os.environ.setdefault("OPENREMOTE_URL", "http://localhost:8080")
+os.environ.setdefault("OPENREMOTE_CLIENT_ID", "benchmark")
+os.environ.setdefault("OPENREMOTE_CLIENT_SECRET", "benchmark")
+
+from app.utils.asset_attribute_model import AssetAttributeModelFactory, TYPE_MAP  # noqa: E402
+
+COMMON_ATTRIBUTES = [
+    {"name": "location", "type": "GEO_JSONPoint", "optional": True},
+    {"name": "notes", "type": "text", "optional": True},
+    {"name": "email", "type": "email", "optional": True},
+    {"name": "tags", "type": "text[]", "optional": True},
+]
+# Value types missing from TYPE_MAP, resolved by their value descriptor (or Any)
+VALUE_DESCRIPTORS = [
+    {"name": "chargerStatus", "jsonType": "string"},
+    {"name": "loadProfile", "jsonType": "number", "arrayDimensions": 1},
+    {"name": "vendorSettings", "jsonType": "object"},
+]
+
+
+def synthetic_asset_infos(types: int, unique: float, attributes: int, seed: int = 1) -> list[dict]:
+    """
+    Asset infos of `types` asset types, a fraction `unique` of them has its own attribute descriptors,
+    the others reuse the descriptors of one of the (few) shared descriptor sets.
+    """
+    rng = random.Random(seed)
+    value_types = [*TYPE_MAP, *(value_descriptor["name"] for value_descriptor in VALUE_DESCRIPTORS), "unknownType[]"]
+
+    def descriptor_set(index: int) -> list[dict]:
+        specific = [
+            {
+                "name": f"attribute{index}_{number}",
+                "type": rng.choice(value_types),
+                "optional": rng.random() < 0.7,
+                **({"constraints": [{"type": "min", "min": 0}, {"type": "max", "max": 100}]} if rng.random() < 0.2 else {}),
+            }
+            for number in range(attributes - len(COMMON_ATTRIBUTES))
+        ]
+        return [*COMMON_ATTRIBUTES, *specific]
+
+    shared_sets = [descriptor_set(index) for index in range(max(1, types // 50))]
+
+    return [
+        {
+            "assetDescriptor": {"name": f"Synthetic{index}Asset", "descriptorType": "asset"},
+            "attributeDescriptors": descriptor_set(len(shared_sets) + index) if rng.random() < unique else rng.choice(shared_sets),
+            "valueDescriptors": VALUE_DESCRIPTORS,
+        }
+        for index in range(types)
+    ]
+
+
+def measure(asset_infos: list[dict], interned: bool) -> dict:
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+
+    factory = AssetAttributeModelFactory()
+    models = []
+    for asset_info in asset_infos:
+        if not interned:
+            factory = AssetAttributeModelFactory()
+        factory.resolver.register(asset_info["valueDescriptors"])
+        models.append(factory(asset_info["assetDescriptor"]["name"], asset_info["attributeDescriptors"]))
+
+    duration = time.perf_counter() - started
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "seconds": duration,
+        "models": len({id(model) for model in models}),
+        "memory_mib": current / 1024 / 1024,
+        "peak_memory_mib": peak / 1024 / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--types", type=int, default=1000, help="Number of asset types.")
+    parser.add_argument("--unique", type=float, default=0.2, help="Fraction of asset types with their own attribute descriptors.")
+    parser.add_argument("--attributes", type=int, default=12, help="Attributes per asset type.")
+    options = parser.parse_args()
+
+    asset_infos = synthetic_asset_infos(options.types, options.unique, options.attributes)
+
+    print(f"{options.types} asset types, {options.attributes} attributes each, {options.unique:.0%} with unique attributes\n")
+    print(f"{'factory':<16}{'models':>8}{'total ms':>12}{'µs/type':>12}{'MiB':>10}{'KiB/type':>12}{'peak MiB':>12}")
+    for name, interned in (("from scratch", False), ("interned", True)):
+        results = measure(asset_infos, interned)
+        print(
+            f"{name:<16}{results['models']:>8}{results['seconds'] * 1000:>12.1f}"
+            f"{results['seconds'] / options.types * 1e6:>12.0f}{results['memory_mib']:>10.1f}"
+            f"{results['memory_mib'] * 1024 / options.types:>12.1f}{results['peak_memory_mib']:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
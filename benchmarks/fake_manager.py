@@ -0,0 +1,182 @@
+"""
+Minimal stand-in for an OpenRemote manager, implementing the endpoints used by the MCP server.
+
+Configured with environment variables:
+- BENCH_ASSET_TYPES: number of asset types (and so `create_X` tools), defaults to 20
+- BENCH_ASSETS: number of assets, spread over the realms in a tree of 3 children per asset, defaults to 1000
+- BENCH_LATENCY: seconds added to every API response, to simulate a remote manager, defaults to 0
+"""
+import asyncio
+import os
+import uuid
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+ASSET_TYPES = int(os.environ.get("BENCH_ASSET_TYPES", "20"))
+ASSET_COUNT = int(os.environ.get("BENCH_ASSETS", "1000"))
+LATENCY = float(os.environ.get("BENCH_LATENCY", "0"))
+REALMS = ["master", "building"]
+
+
+def _asset_info(index: int) -> dict:
+    return {
+        "assetDescriptor": {"name": f"Bench{index}Asset", "descriptorType": "asset", "icon": "cube", "colour": "1B5630"},
+        "attributeDescriptors": [
+            {"name": "notes", "type": "text", "optional": True},
+            {"name": "location", "type": "GEO_JSONPoint", "optional": True},
+            {"name": "temperature", "type": "number", "optional": False, "constraints": [{"type": "min", "min": -50}, {"type": "max", "max": 100}]},
+            {"name": "enabled", "type": "boolean", "optional": True},
+        ],
+        "metaItemDescriptors": [],
+        "valueDescriptors": [],
+    }
+
+
+ASSET_INFOS = [_asset_info(index) for index in range(ASSET_TYPES)]
+ASSETS = {
+    f"bench{index:018d}": {
+        "id": f"bench{index:018d}",
+        "version": 1,
+        "name": f"Asset {index}",
+        "type": f"Bench{index % ASSET_TYPES}Asset",
+        "realm": REALMS[index % len(REALMS)],
+        "parentId": f"bench{(index - 1) // 3:018d}" if index else None,
+        "attributes": {
+            "temperature": {"name": "temperature", "type": "number", "value": 20.0 + index % 10, "timestamp": 1700000000000, "meta": {}},
+            "notes": {"name": "notes", "type": "text", "value": f"Benchmark asset {index}", "meta": {}},
+        },
+    }
+    for index in range(ASSET_COUNT)
+}
+INSTANCES: set[int] = set()
+
+
+async def _latency():
+    if LATENCY:
+        await asyncio.sleep(LATENCY)
+
+
+async def token(request: Request):
+    return JSONResponse({"access_token": uuid.uuid4().hex, "expires_in": 300, "token_type": "Bearer"})
+
+
+async def register_service(request: Request):
+    service = await request.json()
+    service["instanceId"] = len(INSTANCES) + 1
+    INSTANCES.add(service["instanceId"])
+
+    return JSONResponse(service)
+
+
+async def heartbeat(request: Request):
+    if request.method == "DELETE":
+        INSTANCES.discard(int(request.path_params["instance_id"]))
+        return Response(status_code=204)
+
+    return Response(status_code=204 if int(request.path_params["instance_id"]) in INSTANCES else 404)
+
+
+async def asset_infos(request: Request):
+    await _latency()
+    return JSONResponse(ASSET_INFOS)
+
+
+async def asset_info(request: Request):
+    await _latency()
+    for info in ASSET_INFOS:
+        if info["assetDescriptor"]["name"] == request.path_params["asset_type"]:
+            return JSONResponse(info)
+
+    return Response(status_code=404)
+
+
+async def realms(request: Request):
+    await _latency()
+    return JSONResponse([{"name": realm, "displayName": realm.title(), "enabled": True} for realm in REALMS])
+
+
+async def realm(request: Request):
+    await _latency()
+    if request.path_params["name"] not in REALMS:
+        return Response(status_code=404)
+
+    return JSONResponse({"name": request.path_params["name"], "displayName": request.path_params["name"].title(), "enabled": True})
+
+
+async def query_assets(request: Request):
+    await _latency()
+    query = await request.json()
+    assets = ASSETS.values()
+
+    if query.get("ids"):
+        assets = [ASSETS[asset_id] for asset_id in query["ids"] if asset_id in ASSETS]
+    if query.get("types"):
+        assets = [asset for asset in assets if asset["type"] in query["types"]]
+    if (query.get("realm") or {}).get("name"):
+        assets = [asset for asset in assets if asset["realm"] == query["realm"]["name"]]
+    if (query.get("select") or {}).get("basic"):
+        assets = [{key: value for key, value in asset.items() if key != "attributes"} for asset in assets]
+
+    offset = query.get("offset") or 0
+    limit = query.get("limit")
+
+    return JSONResponse(list(assets)[offset:offset + limit if limit else None])
+
+
+async def get_asset(request: Request):
+    await _latency()
+    asset = ASSETS.get(request.path_params["asset_id"])
+
+    return JSONResponse(asset) if asset else Response(status_code=404)
+
+
+async def create_asset(request: Request):
+    await _latency()
+    asset = {**await request.json(), "id": uuid.uuid4().hex[:22], "version": 0}
+    ASSETS[asset["id"]] = asset
+
+    return JSONResponse(asset)
+
+
+async def write_attribute_value(request: Request):
+    await _latency()
+    asset = ASSETS.get(request.path_params["asset_id"])
+    if asset is None:
+        return Response(status_code=404)
+
+    asset["attributes"].setdefault(request.path_params["name"], {"name": request.path_params["name"]})["value"] = await request.json()
+
+    return Response(status_code=200)
+
+
+async def write_attribute_values(request: Request):
+    await _latency()
+
+    return JSONResponse([
+        {"ref": state["ref"], "failure": None if state["ref"]["id"] in ASSETS else "ASSET_NOT_FOUND"}
+        for state in await request.json()
+    ])
+
+
+async def health(request: Request):
+    return JSONResponse({"status": "UP"})
+
+
+app = Starlette(routes=[
+    Route("/auth/realms/{realm}/protocol/openid-connect/token", token, methods=["POST"]),
+    Route("/api/{realm}/service", register_service, methods=["POST"]),
+    Route("/api/{realm}/service/{service_id}/{instance_id}", heartbeat, methods=["PUT", "DELETE"]),
+    Route("/api/{realm}/model/assetInfos", asset_infos),
+    Route("/api/{realm}/model/assetInfo/{asset_type}", asset_info),
+    Route("/api/{realm}/realm", realms),
+    Route("/api/{realm}/realm/{name}", realm),
+    Route("/api/{realm}/asset/query", query_assets, methods=["POST"]),
+    Route("/api/{realm}/asset/attributes", write_attribute_values, methods=["PUT"]),
+    Route("/api/{realm}/asset", create_asset, methods=["POST"]),
+    Route("/api/{realm}/asset/{asset_id}", get_asset),
+    Route("/api/{realm}/asset/{asset_id}/attribute/{name}", write_attribute_value, methods=["PUT"]),
+    Route("/api/{realm}/health", health),
+])
@@ -0,0 +1,228 @@
+"""
+Load test of the MCP server against the fake OpenRemote manager in `fake_manager.py`.
+
+Starts the fake manager and the MCP server (`app:app`) as subprocesses, drives concurrent MCP sessions over
+streamable HTTP and reports the startup time, tool latency (p50/p99), throughput and memory use of the server.
+
+    uv run python benchmarks/run.py --sessions 20 --calls 50
+    uv run python benchmarks/run.py --json baseline.json
+    uv run python benchmarks/run.py --baseline baseline.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from fastmcp import Client
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Tool calls of the load mix, with a function building (randomized) arguments
+SCENARIOS = {
+    "asset_query": lambda options: {"asset_query_schema": {"types": [f"Bench{random.randrange(options.asset_types)}Asset"], "limit": 20}},
+    "asset_get_by_id": lambda options: {"asset_id": f"bench{random.randrange(options.assets):018d}"},
+    "asset_model_get_type": lambda options: {"asset_type": f"Bench{random.randrange(options.asset_types)}Asset"},
+    "realm_get_all": lambda options: {},
+    "hierarchy_get_subtree": lambda options: {"asset_id": f"bench{random.randrange(options.assets):018d}", "max_depth": 2},
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _percentile(values: list[float], percentile: float) -> float | None:
+    if not values:
+        return None
+
+    values = sorted(values)
+    return values[min(len(values) - 1, round(percentile / 100 * (len(values) - 1)))]
+
+
+def _memory(pid: int) -> dict[str, float | None]:
+    """Resident (and peak resident) memory in MiB, read from /proc so only available on Linux."""
+    memory = {"rss_mib": None, "peak_rss_mib": None}
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                memory["rss_mib"] = round(int(line.split()[1]) / 1024, 1)
+            elif line.startswith("VmHWM:"):
+                memory["peak_rss_mib"] = round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+
+    return memory
+
+
+async def _wait_for(url: str, timeout: float, process: subprocess.Popen) -> float:
+    """Seconds until the url responds with 200."""
+    started = time.perf_counter()
+    async with httpx.AsyncClient() as client:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"Process exited with code {process.returncode} before {url} was available")
+            try:
+                if (await client.get(url)).status_code == 200:
+                    return time.perf_counter() - started
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.02)
+
+    raise TimeoutError(f"{url} not available after {timeout}s")
+
+
+async def _run_session(url: str, options, latencies: dict[str, list[float]], errors: dict[str, int]):
+    async with Client(url) as client:
+        started = time.perf_counter()
+        tools = {tool.name for tool in await client.list_tools()}
+        latencies.setdefault("tools/list", []).append(time.perf_counter() - started)
+
+        scenarios = [name for name in options.tools if name in tools]
+        for call in range(options.calls):
+            name = scenarios[call % len(scenarios)]
+            started = time.perf_counter()
+            result = await client.call_tool(name, SCENARIOS[name](options), raise_on_error=False)
+            latencies.setdefault(name, []).append(time.perf_counter() - started)
+            if result.is_error:
+                errors[name] = errors.get(name, 0) + 1
+
+
+async def benchmark(options) -> dict:
+    manager_port, server_port = _free_port(), _free_port()
+    env = {
+        **os.environ,
+        "BENCH_ASSET_TYPES": str(options.asset_types),
+        "BENCH_ASSETS": str(options.assets),
+        "BENCH_LATENCY": str(options.latency),
+    }
+
+    manager = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "fake_manager:app", "--app-dir", str(ROOT / "benchmarks"), "--port", str(manager_port), "--log-level", "warning"],
+        env=env,
+    )
+    server = None
+    try:
+        await _wait_for(f"http://127.0.0.1:{manager_port}/api/master/health", 30, manager)
+
+        with tempfile.TemporaryDirectory() as state_dir:
+            server = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "app:app", "--port", str(server_port), "--log-level", "warning"],
+                cwd=ROOT,
+                env={
+                    **env,
+                    "OPENREMOTE_URL": f"http://127.0.0.1:{manager_port}",
+                    "OPENREMOTE_CLIENT_ID": "benchmark",
+                    "OPENREMOTE_CLIENT_SECRET": "benchmark",
+                    "OPENREMOTE_VERIFY_SSL": "0",
+                    # Start cold, without a snapshot or cache of a previous run, and without locking out a server running
+                    # from the same directory
+                    "ASSET_SNAPSHOT_PATH": str(Path(state_dir) / "asset_models.json"),
+                    "APP_LEADER_LOCK_PATH": str(Path(state_dir) / "leader.lock"),
+                    "CACHE_SHARED_PATH": str(Path(state_dir) / "metadata"),
+                },
+            )
+            startup_seconds = await _wait_for(f"http://127.0.0.1:{server_port}/api/health/ready", options.startup_timeout, server)
+            idle_memory = _memory(server.pid)
+
+            url = f"http://127.0.0.1:{server_port}/mcp"
+            latencies: dict[str, list[float]] = {}
+            errors: dict[str, int] = {}
+
+            started = time.perf_counter()
+            await asyncio.gather(*(_run_session(url, options, latencies, errors) for _ in range(options.sessions)))
+            duration = time.perf_counter() - started
+            loaded_memory = _memory(server.pid)
+    finally:
+        for process in (server, manager):
+            if process is not None:
+                process.terminate()
+                process.wait(10)
+
+    calls = [latency for name, values in latencies.items() if name != "tools/list" for latency in values]
+
+    return {
+        "options": {
+            "sessions": options.sessions,
+            "calls": options.calls,
+            "asset_types": options.asset_types,
+            "assets": options.assets,
+            "latency": options.latency,
+        },
+        "startup_seconds": round(startup_seconds, 3),
+        "duration_seconds": round(duration, 3),
+        "throughput": round(len(calls) / duration, 1),
+        "errors": errors,
+        "memory": {"idle": idle_memory, "loaded": loaded_memory},
+        "latency_ms": {
+            name: {
+                "count": len(values),
+                "p50": round(_percentile(values, 50) * 1000, 2),
+                "p99": round(_percentile(values, 99) * 1000, 2),
+            }
+            for name, values in sorted({**latencies, "all": calls}.items())
+        },
+    }
+
+
+def report(results: dict, baseline: dict | None = None):
+    def change(value, previous) -> str:
+        if previous in (None, 0) or value is None:
+            return ""
+        return f" ({(value - previous) / previous * 100:+.0f}%)"
+
+    previous = baseline or {}
+    print(f"Startup:    {results['startup_seconds']:.3f}s{change(results['startup_seconds'], previous.get('startup_seconds'))}")
+    print(f"Throughput: {results['throughput']} calls/s{change(results['throughput'], previous.get('throughput'))}")
+    print(f"Memory:     {results['memory']['idle']['rss_mib']} MiB idle, {results['memory']['loaded']['peak_rss_mib']} MiB peak")
+    if results["errors"]:
+        print(f"Errors:     {results['errors']}")
+
+    print()
+    print(f"{'tool':<28}{'calls':>8}{'p50 ms':>16}{'p99 ms':>16}")
+    for name, latency in results["latency_ms"].items():
+        previous_latency = previous.get("latency_ms", {}).get(name, {})
+        p50 = f"{latency['p50']}{change(latency['p50'], previous_latency.get('p50'))}"
+        p99 = f"{latency['p99']}{change(latency['p99'], previous_latency.get('p99'))}"
+        print(f"{name:<28}{latency['count']:>8}{p50:>16}{p99:>16}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20, help="Concurrent MCP sessions.")
+    parser.add_argument("--calls", type=int, default=50, help="Tool calls per session.")
+    parser.add_argument("--tools", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS), help="Tools of the load mix.")
+    parser.add_argument("--asset-types", type=int, default=20, help="Asset types of the fake manager.")
+    parser.add_argument("--assets", type=int, default=1000, help="Assets of the fake manager.")
+    parser.add_argument("--latency", type=float, default=0, help="Seconds added to every response of the fake manager.")
+    parser.add_argument("--startup-timeout", type=float, default=60, help="Seconds to wait for the server to become ready.")
+    parser.add_argument("--json", type=Path, help="Write the results to this file, e.g. to use as baseline.")
+    parser.add_argument("--baseline", type=Path, help="Results of a previous run to compare with.")
+    parser.add_argument("--max-regression", type=float, default=None, help="Fail when the p99 latency of all calls regressed by more than this percentage compared to the baseline.")
+    options = parser.parse_args()
+
+    results = asyncio.run(benchmark(options))
+    baseline = json.loads(options.baseline.read_text()) if options.baseline else None
+    report(results, baseline)
+
+    if options.json:
+        options.json.write_text(json.dumps(results, indent=2))
+
+    if baseline and options.max_regression is not None:
+        previous, current = baseline["latency_ms"]["all"]["p99"], results["latency_ms"]["all"]["p99"]
+        if previous and (current - previous) / previous * 100 > options.max_regression:
+            print(f"\np99 latency regressed from {previous}ms to {current}ms")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
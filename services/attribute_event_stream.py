@@ -0,0 +1,128 @@
+import asyncio
+import json
+import logging
+import ssl
+from typing import Callable
+from urllib.parse import quote, urlsplit
+
+from websockets.asyncio.client import connect, ClientConnection
+
+from .token_manager import TokenManager
+
+logger = logging.getLogger("uvicorn")
+
+
+class AttributeEventStream:
+    """
+    Subscription to the attribute events of a set of assets over the OpenRemote event websocket.
+    Reconnects (and resubscribes) automatically, `on_missed_events` is called whenever events may have been missed.
+    """
+
+    def __init__(
+            self,
+            host: str,
+            token_manager: TokenManager,
+            on_event: Callable[[str, str, object, int | None], None],
+            on_missed_events: Callable[[], None],
+            realm: str = 'master',
+            verify_SSL: bool = True,
+            reconnect_delay: float = 5,
+    ):
+        url = urlsplit(host)
+        self.__url = f"{'wss' if url.scheme == 'https' else 'ws'}://{url.netloc}/websocket/events?Realm={quote(realm)}"
+        self.__token_manager = token_manager
+        self.__on_event = on_event
+        self.__on_missed_events = on_missed_events
+        self.__reconnect_delay = reconnect_delay
+        self.__ssl: ssl.SSLContext | None = None
+        if url.scheme == 'https' and not verify_SSL:
+            self.__ssl = ssl.create_default_context()
+            self.__ssl.check_hostname = False
+            self.__ssl.verify_mode = ssl.CERT_NONE
+
+        self.__connection: ClientConnection | None = None
+        self.__task: asyncio.Task | None = None
+        self.subscriptions: set[str] = set()
+        self.connects = 0
+        self.events = 0
+
+    @property
+    def connected(self) -> bool:
+        return self.__connection is not None
+
+    def start(self):
+        if self.__task is None:
+            self.__task = asyncio.create_task(self.__run())
+
+    async def stop(self):
+        if self.__task is not None:
+            self.__task.cancel()
+            self.__task = None
+
+    async def subscribe(self, asset_id: str):
+        self.subscriptions.add(asset_id)
+        await self.__send("SUBSCRIBE", {
+            "eventType": "attribute",
+            "subscriptionId": asset_id,
+            "filter": {"filterType": "asset", "assetIds": [asset_id]},
+        })
+
+    async def unsubscribe(self, asset_id: str):
+        self.subscriptions.discard(asset_id)
+        await self.__send("UNSUBSCRIBE", {"subscriptionId": asset_id})
+
+    async def __send(self, message_type: str, payload: dict):
+        connection = self.__connection
+        if connection is None:
+            return  # (Re)subscribed once connected
+
+        try:
+            await connection.send(f"{message_type}:{json.dumps(payload)}")
+        except Exception as e:
+            logger.debug(f"Failed to send {message_type} over the event websocket: {e}")
+
+    async def __run(self):
+        while True:
+            try:
+                token = await self.__token_manager.get_token()
+                async with connect(f"{self.__url}&Authorization={quote(f'Bearer {token}')}", ssl=self.__ssl) as connection:
+                    self.__connection = connection
+                    self.connects += 1
+                    logger.debug(f"Connected to the OpenRemote event websocket, subscribing to {len(self.subscriptions)} asset(s)")
+
+                    for asset_id in list(self.subscriptions):
+                        await self.subscribe(asset_id)
+                    # Values read while disconnected can be outdated by now
+                    self.__on_missed_events()
+
+                    async for message in connection:
+                        self.__handle(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Lost connection to the OpenRemote event websocket, reconnecting")
+                logger.debug(e)
+            finally:
+                self.__connection = None
+                self.__on_missed_events()
+
+            await asyncio.sleep(self.__reconnect_delay)
+
+    def __handle(self, message: str | bytes):
+        if isinstance(message, bytes):
+            message = message.decode()
+
+        message_type, _, payload = message.partition(":")
+        if message_type != "TRIGGERED":
+            return
+
+        try:
+            events = json.loads(payload).get("events") or []
+        except ValueError:
+            return
+
+        for event in events:
+            ref = event.get("ref") or {}
+            if event.get("eventType") == "attribute" and ref.get("id") and ref.get("name"):
+                self.events += 1
+                self.__on_event(ref["id"], ref["name"], event.get("value"), event.get("timestamp"))
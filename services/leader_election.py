@@ -0,0 +1,78 @@
+import fcntl
+import logging
+import os
+from pathlib import Path
+from typing import IO
+
+from pydantic import ImportString, TypeAdapter
+
+logger = logging.getLogger("uvicorn")
+
+
+class LeaderElection:
+    """
+    Elects the single process (worker or replica) owning the registrations with OpenRemote and sending the heartbeats.
+
+    `try_acquire` is called periodically by every process, also by the leader to renew its leadership,
+    and must not block. This base class makes every process the leader, the behavior of a single process.
+    """
+
+    async def try_acquire(self) -> bool:
+        return True
+
+    async def release(self):
+        pass
+
+
+class FileLeaderElection(LeaderElection):
+    """
+    The leader is the process holding an exclusive lock on a file, the OS releases it when the process exits.
+    Only elects between processes sharing the file system, e.g. the workers of a single host.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.__file: IO | None = None
+
+    async def try_acquire(self) -> bool:
+        if self.__file is not None:
+            return True
+
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        file = open(self.path, "a+")
+        try:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            file.close()
+            return False
+
+        # The pid of the leader, for debugging only
+        file.truncate(0)
+        file.write(str(os.getpid()))
+        file.flush()
+
+        self.__file = file
+        logger.info(f"Process {os.getpid()} is the leader")
+
+        return True
+
+    async def release(self):
+        if self.__file is None:
+            return
+
+        fcntl.flock(self.__file.fileno(), fcntl.LOCK_UN)
+        self.__file.close()
+        self.__file = None
+
+
+def create_leader_election(backend: str, path: str) -> LeaderElection:
+    """
+    Create the leader election `backend`: 'file' (a lock on `path`), 'none' (every process is the leader),
+    or the import path of a `LeaderElection` factory, e.g. 'my_package.election:RedisLeaderElection'.
+    """
+    if backend == "file":
+        return FileLeaderElection(path)
+    if backend == "none":
+        return LeaderElection()
+
+    return TypeAdapter(ImportString).validate_python(backend)()
@@ -0,0 +1,204 @@
+import importlib.util
+import logging
+import time
+from contextvars import ContextVar
+
+import httpx
+from httpx import Response
+from openremote_client import OpenRemoteClient
+from openremote_client.authenticator import Authenticator
+from openremote_client.http import HttpClient
+from openremote_client.url_builder import UrlBuilder
+
+from .resilience import UpstreamResilience
+from .token_manager import TokenManager
+from .upstream_limiter import UpstreamLimiter
+
+logger = logging.getLogger("uvicorn")
+
+
+class UpstreamTimer:
+    """Accumulates the time spent waiting on OpenRemote, concurrent requests are summed."""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.requests = 0
+
+
+# Set by callers (e.g. the metrics middleware) to measure the upstream time of everything they await
+upstream_timer: ContextVar[UpstreamTimer | None] = ContextVar("upstream_timer", default=None)
+
+
+class PooledHttpClient(HttpClient):
+    """
+    HttpClient sharing a single pooled httpx.AsyncClient for all requests, the default HttpClient
+    opens (and tears down) a new connection for every request.
+    """
+
+    def __init__(
+            self,
+            url_builder: UrlBuilder,
+            authenticator: Authenticator,
+            realm: str = 'master',
+            verify_SSL: bool = True,
+            limits: httpx.Limits = httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            timeout: httpx.Timeout = httpx.Timeout(30),
+            http2: bool = False,
+            limiter: UpstreamLimiter | None = None,
+            resilience: UpstreamResilience | None = None,
+    ):
+        super().__init__(url_builder, authenticator, realm, verify_SSL)
+        self.__url_builder = url_builder
+        self.__authenticator = authenticator
+        self.__realm = realm
+        self.__limits = limits
+
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("HTTP/2 requested but the 'h2' package is not installed, falling back to HTTP/1.1")
+            http2 = False
+
+        self.__client = httpx.AsyncClient(verify=verify_SSL, limits=limits, timeout=timeout, http2=http2)
+        self.__http2 = http2
+        self.limiter = limiter
+        self.resilience = resilience
+
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def set_realm(self, realm: str):
+        super().set_realm(realm)
+        self.__realm = realm
+
+    async def request(self, method: str, path: str, headers: dict | None = None, **kwargs) -> Response:
+        if headers is None:
+            headers = {}
+
+        token = await self.__authenticator.get_token()
+        response = await self.__send(method, path, {**headers, 'Authorization': f'Bearer {token}'}, **kwargs)
+
+        if response.status_code == 401 and isinstance(self.__authenticator, TokenManager):
+            # Token was revoked or expired early, retry exactly once with a fresh one
+            token = await self.__authenticator.refresh(stale_token=token)
+            response = await self.__send(method, path, {**headers, 'Authorization': f'Bearer {token}'}, **kwargs)
+
+        return response
+
+    async def __send(self, method: str, path: str, headers: dict, **kwargs) -> Response:
+        if self.resilience is not None:
+            return await self.resilience.run(method, path, lambda: self.__limited(method, path, headers, **kwargs))
+
+        return await self.__limited(method, path, headers, **kwargs)
+
+    async def __limited(self, method: str, path: str, headers: dict, **kwargs) -> Response:
+        # Each retry waits for a slot again, so backoff delays don't hold on to one
+        if self.limiter is not None:
+            return await self.limiter.run(method, path, lambda: self.__request(method, path, headers, **kwargs))
+
+        return await self.__request(method, path, headers, **kwargs)
+
+    async def __request(self, method: str, path: str, headers: dict, **kwargs) -> Response:
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        started = time.perf_counter()
+        try:
+            return await self.__client.request(
+                method,
+                url=self.__url_builder.build(path, realm=self.__realm),
+                headers=headers,
+                **kwargs
+            )
+        finally:
+            self.in_flight -= 1
+
+            timer = upstream_timer.get()
+            if timer is not None:
+                timer.seconds += time.perf_counter() - started
+                timer.requests += 1
+
+    async def get(self, path: str, **kwargs) -> Response:
+        return await self.request("GET", path, **kwargs)
+
+    async def post(self, path: str, **kwargs) -> Response:
+        return await self.request("POST", path, **kwargs)
+
+    async def put(self, path: str, **kwargs) -> Response:
+        return await self.request("PUT", path, **kwargs)
+
+    async def delete(self, path: str, **kwargs) -> Response:
+        return await self.request("DELETE", path, **kwargs)
+
+    def __pool_connections(self) -> tuple[int, int] | None:
+        """Number of connections in the pool and how many are idle, None if httpx doesn't expose them."""
+        # httpx has no public API for its connection pool, read it from the (private) transport
+        try:
+            connections = list(self.__client._transport._pool.connections)
+            return len(connections), sum(1 for connection in connections if connection.is_idle())
+        except (AttributeError, TypeError):
+            return None
+
+    def stats(self) -> dict:
+        """Pool utilization, used to size the pool limits for the expected load."""
+        connections, idle = self.__pool_connections() or (None, None)
+
+        return {
+            "http2": self.__http2,
+            "max_connections": self.__limits.max_connections,
+            "max_keepalive_connections": self.__limits.max_keepalive_connections,
+            "connections": connections,
+            "active_connections": connections - idle if connections is not None else None,
+            "idle_connections": idle,
+            "requests": self.requests,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+        }
+
+    async def aclose(self):
+        if isinstance(self.__authenticator, TokenManager):
+            await self.__authenticator.aclose()
+
+        await self.__client.aclose()
+
+
+class PooledOpenRemoteClient(OpenRemoteClient):
+    """OpenRemoteClient with all API endpoints bound to a PooledHttpClient."""
+
+    http_client: PooledHttpClient
+    token_manager: TokenManager
+
+    def __init__(
+            self,
+            host: str,
+            client_id: str,
+            client_secret: str,
+            realm: str = 'master',
+            verify_SSL: bool = True,
+            limits: httpx.Limits = httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            timeout: httpx.Timeout = httpx.Timeout(30),
+            http2: bool = False,
+            token_refresh_margin: int = 30,
+            limiter: UpstreamLimiter | None = None,
+            resilience: UpstreamResilience | None = None,
+    ):
+        # Not calling OpenRemoteClient.__init__, it would build a default (unpooled) HttpClient and Authenticator for nothing
+        self.host = str(host)
+        self.realm_name = realm
+        self.verify_SSL = verify_SSL
+
+        url_builder = UrlBuilder(host)
+        self.token_manager = TokenManager(url_builder, client_id, client_secret, verify_SSL, token_refresh_margin)
+        self.http_client = PooledHttpClient(url_builder, self.token_manager, realm, verify_SSL, limits, timeout, http2, limiter, resilience)
+
+        # The API endpoints of OpenRemoteClient, bound to the pooled http client
+        for name, api in OpenRemoteClient.__annotations__.items():
+            if not name.startswith('_'):
+                setattr(self, name, api(self.http_client))
+
+        self.get = self.http_client.get
+        self.post = self.http_client.post
+        self.put = self.http_client.put
+        self.delete = self.http_client.delete
+
+    def set_realm(self, realm: str):
+        self.http_client.set_realm(realm)
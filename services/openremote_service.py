@@ -1,84 +1,298 @@
 import asyncio
 import logging
+import time
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Iterable, TypeVar
 
+import httpx
 from openremote_client import OpenRemoteClient
 from openremote_client.schemas import ExternalServiceSchema
 
+from .leader_election import LeaderElection
+from .openremote_client import PooledOpenRemoteClient
+from .resilience import UpstreamResilience
+from .upstream_limiter import UpstreamLimiter
+
 logger = logging.getLogger("uvicorn")
 
+T = TypeVar('T')
+
+DEFAULT_TARGET = "default"
+
+# OpenRemote manager to use for the current tool call, see `get_openremote_service`
+current_target: ContextVar[str | None] = ContextVar("current_target", default=None)
+
 
 class OpenRemoteService:
     __heartbeat_interval: int
     client: OpenRemoteClient
+    target: str
     service_id: str
     instance_id: int
+    registration_schema: ExternalServiceSchema
+    last_heartbeat_at: float | None = None
+    last_heartbeat_ok: bool | None = None
+    registrations: int = 1
+    is_leader: bool = True
 
     @classmethod
-    async def register(cls, openremote_client: OpenRemoteClient, external_service_schema: ExternalServiceSchema, heartbeat_interval: int = 45):
+    async def register(cls, openremote_client: OpenRemoteClient, external_service_schema: ExternalServiceSchema, heartbeat_interval: int = 45, target: str = DEFAULT_TARGET, leader: bool = True):
+        if not leader:
+            # Another process owns the registration, this one only serves tool calls until it takes over
+            return cls(client=openremote_client, external_service_schema=external_service_schema, heartbeat_interval=heartbeat_interval, target=target, leader=False)
+
         try:
             service_registry = await openremote_client.services.register_service(
                 external_service_schema
             )
 
-            return cls(
+            openremote_service = cls(
                 client=openremote_client,
                 external_service_schema=service_registry.content,
-                heartbeat_interval=heartbeat_interval
+                heartbeat_interval=heartbeat_interval,
+                target=target
             )
+            openremote_service.registration_schema = external_service_schema
+
+            return openremote_service
         except Exception as e:
-            logger.error("Failed to connect to OpenRemote")
+            logger.error(f"Failed to connect to OpenRemote target '{target}'")
             logger.debug(e)
 
-            raise RuntimeError("Failed to connect to OpenRemote")
+            raise RuntimeError(f"Failed to connect to OpenRemote target '{target}'")
 
 
     async def __heartbeat_loop(self):
         while True:
             await asyncio.sleep(self.__heartbeat_interval)
-            await self.send_heartbeat()
 
-    def __init__(self, client: OpenRemoteClient, external_service_schema: ExternalServiceSchema, heartbeat_interval: int = 45):
+            try:
+                await self.send_heartbeat()
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code != 404:
+                    logger.warning(f"Failed to send heartbeat to OpenRemote target '{self.target}'")
+                    logger.debug(e)
+                    continue
+
+                # The manager forgot this instance (e.g. after a restart or an expired lease), register again
+                logger.warning(f"OpenRemote target '{self.target}' doesn't know instance '{self.instance_id}', registering again")
+                try:
+                    await self.reregister()
+                except Exception as e:
+                    logger.warning(f"Failed to register again with OpenRemote target '{self.target}'")
+                    logger.debug(e)
+            except Exception as e:
+                logger.warning(f"Failed to send heartbeat to OpenRemote target '{self.target}'")
+                logger.debug(e)
+
+    def __init__(self, client: OpenRemoteClient, external_service_schema: ExternalServiceSchema, heartbeat_interval: int = 45, target: str = DEFAULT_TARGET, leader: bool = True):
         self.client = client
+        self.target = target
         self.service_id = external_service_schema.serviceId
         self.instance_id = external_service_schema.instanceId
+        self.registration_schema = external_service_schema.model_copy(update={"instanceId": None})
+        self.registrations = 1 if leader else 0
+        self.is_leader = leader
         self.__heartbeat_interval = heartbeat_interval
+        self.__heartbeat = None
+
+        if not leader:
+            logger.info(f"Not registering OpenRemote service on target '{self.target}', another process owns the registration")
+            return
 
-        asyncio.run_coroutine_threadsafe(self.__heartbeat_loop(), asyncio.get_event_loop())
+        self.__heartbeat = asyncio.run_coroutine_threadsafe(self.__heartbeat_loop(), asyncio.get_event_loop())
 
-        logger.info(f"Registered OpenRemote service with service_id '{self.service_id}' and instance_id '{self.instance_id}'")
+        logger.info(f"Registered OpenRemote service with service_id '{self.service_id}' and instance_id '{self.instance_id}' on target '{self.target}'")
 
     async def send_heartbeat(self):
-        await self.client.services.heartbeat(self.service_id, self.instance_id)
+        try:
+            await self.client.services.heartbeat(self.service_id, self.instance_id)
+        except Exception:
+            self.last_heartbeat_ok = False
+            raise
+        finally:
+            self.last_heartbeat_at = time.time()
+
+        self.last_heartbeat_ok = True
         logger.info("Sent heartbeat to OpenRemote")
 
+    async def reregister(self):
+        """Register again with the original registration, e.g. when the manager no longer knows the instance."""
+        service_registry = await self.client.services.register_service(self.registration_schema)
+        self.service_id = service_registry.content.serviceId
+        self.instance_id = service_registry.content.instanceId
+        self.registrations += 1
+        self.last_heartbeat_ok = True
+        self.last_heartbeat_at = time.time()
+
+        logger.info(f"Registered OpenRemote service again with instance_id '{self.instance_id}' on target '{self.target}'")
+
+    async def lead(self):
+        """Take over the registration and the heartbeats, e.g. after the previous leader exited."""
+        await self.reregister()
+        self.is_leader = True
+        self.__heartbeat = asyncio.run_coroutine_threadsafe(self.__heartbeat_loop(), asyncio.get_event_loop())
+
+    def follow(self):
+        """Stop sending heartbeats, another process took over the registration."""
+        if self.__heartbeat is not None:
+            self.__heartbeat.cancel()
+            self.__heartbeat = None
+
+        self.is_leader = False
+        self.last_heartbeat_ok = None
+        logger.info(f"Stopped sending heartbeats to OpenRemote target '{self.target}', another process owns the registration")
+
     async def deregister(self):
         await self.client.services.deregister_service(self.service_id, self.instance_id)
         logger.info("Deregistered OpenRemote service")
 
 
-__openremote_service: OpenRemoteService | None = None
-
+__openremote_services: dict[str, OpenRemoteService] = {}
+__realm_targets: dict[str, str] = {}
 
-def get_openremote_service() -> OpenRemoteService:
-    global __openremote_service
 
-    if __openremote_service is None:
+def get_openremote_service(target: str | None = None, realm: str | None = None) -> OpenRemoteService:
+    """
+    Get the service of an OpenRemote manager. Without an explicit target, the target of the current tool call
+    is used, then the target the realm is mapped to, and finally the default target.
+    """
+    if not __openremote_services:
         raise RuntimeError("OpenRemote service not initialized")
 
-    return __openremote_service
+    target = target or current_target.get() or resolve_target(realm) or DEFAULT_TARGET
+
+    openremote_service = __openremote_services.get(target)
+    if openremote_service is None:
+        raise ValueError(f"Unknown OpenRemote target '{target}', available targets are {list(__openremote_services)}")
+
+    return openremote_service
+
+
+def get_openremote_services() -> dict[str, OpenRemoteService]:
+    return dict(__openremote_services)
+
 
+def resolve_target(realm: str | None) -> str | None:
+    """Target a realm is mapped to, if any."""
+    return __realm_targets.get(realm) if realm else None
 
-async def init_openremote_service(service_schema: ExternalServiceSchema, host: str, client_id: str, client_secret: str, verify_SSL: bool = True):
-    global __openremote_service
 
-    openremote_client = OpenRemoteClient(
+async def fan_out(call: Callable[[OpenRemoteService], Awaitable[T]], targets: Iterable[str] | None = None) -> dict[str, T | Exception]:
+    """Call every (or the given) OpenRemote target concurrently, failures are returned instead of raised."""
+    openremote_services = [get_openremote_service(target) for target in targets] if targets is not None else list(__openremote_services.values())
+
+    results = await asyncio.gather(*(call(openremote_service) for openremote_service in openremote_services), return_exceptions=True)
+
+    return {openremote_service.target: result for openremote_service, result in zip(openremote_services, results)}
+
+
+def create_openremote_client(
+        host: str,
+        client_id: str,
+        client_secret: str,
+        verify_SSL: bool = True,
+        limits: httpx.Limits = httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        timeout: httpx.Timeout = httpx.Timeout(30),
+        http2: bool = False,
+        token_refresh_margin: int = 30,
+        limiter: UpstreamLimiter | None = None,
+        resilience: UpstreamResilience | None = None,
+) -> PooledOpenRemoteClient:
+    return PooledOpenRemoteClient(
         host=host,
         client_id=client_id,
         client_secret=client_secret,
-        verify_SSL=verify_SSL
+        verify_SSL=verify_SSL,
+        limits=limits,
+        timeout=timeout,
+        http2=http2,
+        token_refresh_margin=token_refresh_margin,
+        limiter=limiter,
+        resilience=resilience,
     )
 
-    __openremote_service = await OpenRemoteService.register(
+
+async def register_openremote_service(
+        openremote_client: OpenRemoteClient,
+        service_schema: ExternalServiceSchema,
+        heartbeat_interval: int = 45,
+        target: str = DEFAULT_TARGET,
+        realms: Iterable[str] = (),
+        leader: bool = True,
+):
+    """
+    Register with an OpenRemote manager, the client can already be used (e.g. to prefetch) in the meantime.
+    Processes that aren't the leader only set up the service, see `start_leader_election`.
+    """
+    __openremote_services[target] = await OpenRemoteService.register(
         openremote_client,
-        service_schema
+        service_schema,
+        heartbeat_interval=heartbeat_interval,
+        target=target,
+        leader=leader,
     )
+
+    for realm in realms:
+        __realm_targets[realm] = target
+
+
+async def init_openremote_service(
+        service_schema: ExternalServiceSchema,
+        host: str,
+        client_id: str,
+        client_secret: str,
+        verify_SSL: bool = True,
+        limits: httpx.Limits = httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        timeout: httpx.Timeout = httpx.Timeout(30),
+        http2: bool = False,
+        token_refresh_margin: int = 30,
+        limiter: UpstreamLimiter | None = None,
+        resilience: UpstreamResilience | None = None,
+        heartbeat_interval: int = 45,
+        target: str = DEFAULT_TARGET,
+        realms: Iterable[str] = (),
+        leader: bool = True,
+):
+    openremote_client = create_openremote_client(
+        host, client_id, client_secret, verify_SSL, limits, timeout, http2, token_refresh_margin, limiter, resilience
+    )
+
+    await register_openremote_service(openremote_client, service_schema, heartbeat_interval, target, realms, leader)
+
+
+async def __leader_election_loop(leader_election: LeaderElection, interval: float):
+    while True:
+        await asyncio.sleep(interval)
+
+        try:
+            leader = await leader_election.try_acquire()
+        except Exception as e:
+            logger.warning("Leader election failed, keeping the current role")
+            logger.debug(e)
+            continue
+
+        for openremote_service in __openremote_services.values():
+            if leader and not openremote_service.is_leader:
+                try:
+                    await openremote_service.lead()
+                except Exception as e:
+                    # Tried again on the next round
+                    logger.warning(f"Failed to take over the registration with OpenRemote target '{openremote_service.target}'")
+                    logger.debug(e)
+            elif not leader and openremote_service.is_leader:
+                openremote_service.follow()
+
+
+def start_leader_election(leader_election: LeaderElection, interval: float) -> asyncio.Task:
+    """
+    Check the leadership every interval, a process that becomes the leader registers with every manager and
+    sends the heartbeats, a process that lost it stops sending them.
+    """
+    return asyncio.create_task(__leader_election_loop(leader_election, interval))
+
+
+async def close_openremote_service():
+    for openremote_service in __openremote_services.values():
+        if isinstance(openremote_service.client, PooledOpenRemoteClient):
+            await openremote_service.client.http_client.aclose()
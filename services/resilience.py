@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import random
+import re
+import time
+from typing import Awaitable, Callable
+
+import httpx
+from httpx import Response
+
+logger = logging.getLogger("uvicorn")
+
+RETRY_STATUS_CODES = (429, 502, 503, 504)
+FAILURE_STATUS_CODES = (502, 503, 504)
+# PUT of a registered service, its heartbeat
+HEARTBEAT_PATH = re.compile(r"/?service/[^/]+/[^/]+/?")
+
+
+class UpstreamUnavailableError(Exception):
+    """OpenRemote can't be called right now, raised without sending the request."""
+
+
+class CircuitOpenError(UpstreamUnavailableError):
+    pass
+
+
+class RetryPolicy:
+    """Capped exponential backoff with full jitter, so retries of concurrent callers don't synchronize."""
+
+    def __init__(self, attempts: int = 3, base_delay: float = 0.2, max_delay: float = 2.0):
+        self.attempts = max(attempts, 1)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and short-circuits calls for `reset_timeout` seconds,
+    then lets a single trial call through (half open) which closes it again on success.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.opens = 0
+        self.short_circuited = 0
+        self.__trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+
+        return self.OPEN if time.monotonic() - self.opened_at < self.reset_timeout else self.HALF_OPEN
+
+    def before_call(self):
+        state = self.state
+        if state == self.CLOSED:
+            return
+
+        if state == self.HALF_OPEN and not self.__trial_in_flight:
+            self.__trial_in_flight = True
+            return
+
+        self.short_circuited += 1
+        retry_in = max(self.reset_timeout - (time.monotonic() - self.opened_at), 0)
+        raise CircuitOpenError(
+            f"OpenRemote {self.name} requests are failing, not calling OpenRemote for the next {retry_in:.0f}s. Try again later."
+        )
+
+    def on_success(self):
+        if self.opened_at is not None:
+            logger.info(f"Circuit breaker '{self.name}' closed, OpenRemote recovered")
+
+        self.failures = 0
+        self.opened_at = None
+        self.__trial_in_flight = False
+
+    def on_failure(self):
+        self.failures += 1
+        if self.__trial_in_flight or (self.opened_at is None and self.failures >= self.failure_threshold):
+            if self.opened_at is None:
+                self.opens += 1
+                logger.warning(f"Circuit breaker '{self.name}' opened after {self.failures} consecutive failures")
+            self.opened_at = time.monotonic()
+
+        self.__trial_in_flight = False
+
+    def on_abort(self):
+        """The call ended without telling anything about the upstream (e.g. it was cancelled)."""
+        self.__trial_in_flight = False
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "opens": self.opens,
+            "short_circuited": self.short_circuited,
+        }
+
+
+class UpstreamResilience:
+    """
+    Circuit breakers per endpoint (e.g. 'asset query') for all requests, and retries for requests that are safe
+    to send again: reads, POST queries and heartbeats. Writes (e.g. of attribute values or rulesets) are never retried.
+    """
+
+    def __init__(self, retry: RetryPolicy = RetryPolicy(), failure_threshold: int = 5, reset_timeout: float = 30):
+        self.retry = retry
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.breakers: dict[str, CircuitBreaker] = {}
+        self.retries = 0
+
+    @staticmethod
+    def endpoint(method: str, path: str) -> str:
+        resource = path.strip('/').split('/', 1)[0] or "root"
+        if path.rstrip('/').endswith('/query'):
+            return f"{resource} query"
+
+        return f"{resource} {'read' if method.upper() in ('GET', 'HEAD', 'OPTIONS') else 'write'}"
+
+    @staticmethod
+    def is_idempotent(method: str, path: str) -> bool:
+        method = method.upper()
+        if method in ("GET", "HEAD", "OPTIONS"):
+            return True
+        if method == "POST":
+            return path.rstrip('/').endswith('/query')
+        if method == "PUT":
+            return HEARTBEAT_PATH.fullmatch(path) is not None
+
+        return False
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        if endpoint not in self.breakers:
+            self.breakers[endpoint] = CircuitBreaker(endpoint, self.failure_threshold, self.reset_timeout)
+
+        return self.breakers[endpoint]
+
+    async def run(self, method: str, path: str, send: Callable[[], Awaitable[Response]]) -> Response:
+        breaker = self.breaker(self.endpoint(method, path))
+        attempts = self.retry.attempts if self.is_idempotent(method, path) else 1
+
+        for attempt in range(attempts):
+            breaker.before_call()
+            try:
+                response = await send()
+            except httpx.TransportError:
+                breaker.on_failure()
+                if attempt + 1 == attempts:
+                    raise
+            except BaseException:
+                breaker.on_abort()
+                raise
+            else:
+                if response.status_code in FAILURE_STATUS_CODES:
+                    breaker.on_failure()
+                else:
+                    breaker.on_success()
+
+                if response.status_code not in RETRY_STATUS_CODES or attempt + 1 == attempts:
+                    return response
+
+            self.retries += 1
+            await asyncio.sleep(self.retry.delay(attempt))
+
+    def stats(self) -> dict:
+        return {
+            "retries": self.retries,
+            "breakers": {endpoint: breaker.stats() for endpoint, breaker in self.breakers.items()},
+        }
@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+
+import httpx
+from openremote_client.authenticator import Authenticator
+from openremote_client.url_builder import UrlBuilder
+
+logger = logging.getLogger("uvicorn")
+
+
+class TokenManager(Authenticator):
+    """
+    Authenticator that refreshes the access token in the background before it expires, and makes
+    sure concurrent callers share a single refresh instead of each requesting a new token.
+    """
+
+    def __init__(self, url_builder: UrlBuilder, client_id: str, client_secret: str, verify_SSL: bool = True, refresh_margin: int = 30):
+        super().__init__(url_builder, client_id, client_secret, verify_SSL)
+        self.__url_builder = url_builder
+        self.__client_id = client_id
+        self.__client_secret = client_secret
+        self.__verify_SSL = verify_SSL
+        self.__refresh_margin = refresh_margin
+        self.__refresh_lock = asyncio.Lock()
+        self.__refresh_task: asyncio.Task | None = None
+        self.__refresh_at: float | None = None
+
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self.refresh_seconds_total = 0.0
+        self.refresh_seconds_max = 0.0
+
+    async def __authenticate(self):
+        started = time.perf_counter()
+
+        try:
+            async with httpx.AsyncClient(verify=self.__verify_SSL) as client:
+                response = await client.post(
+                    self.__url_builder.build_base('/auth/realms/master/protocol/openid-connect/token'),
+                    data={
+                        "grant_type": "client_credentials",
+                        "client_id": self.__client_id,
+                        "client_secret": self.__client_secret,
+                        "scope": "profile"
+                    },
+                    headers={"Content-Type": "application/x-www-form-urlencoded"},
+                )
+                response.raise_for_status()
+        except Exception:
+            self.refresh_failures += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self.refresh_seconds_total += elapsed
+            self.refresh_seconds_max = max(self.refresh_seconds_max, elapsed)
+
+        json = response.json()
+        expires_in = json["expires_in"]
+
+        self.access_token = json["access_token"]
+        self.expires_on = datetime.now() + timedelta(seconds=expires_in - 1)
+        # Refresh ahead of expiry, at the latest halfway through short-lived tokens
+        self.__refresh_at = time.monotonic() + expires_in - min(self.__refresh_margin, expires_in / 2)
+        self.refreshes += 1
+
+        logger.debug(f"Refreshed OpenRemote access token in {elapsed * 1000:.0f}ms, expires in {expires_in}s")
+
+    async def refresh(self, stale_token: str | None = None) -> str:
+        """
+        Refresh the access token, concurrent callers wait for the same refresh. When stale_token is given
+        (e.g. rejected with a 401), the refresh is skipped if another caller already replaced it.
+        """
+        async with self.__refresh_lock:
+            if self.is_authenticated() and (stale_token is None or self.access_token != stale_token):
+                return self.access_token
+
+            if stale_token is not None:
+                self.access_token = None
+
+            await self.__authenticate()
+
+            return self.access_token
+
+    async def get_token(self) -> str:
+        if self.__refresh_task is None:
+            self.__refresh_task = asyncio.create_task(self.__refresh_loop())
+
+        if not self.is_authenticated():
+            return await self.refresh()
+
+        return self.access_token
+
+    async def __refresh_loop(self):
+        while True:
+            delay = 5 if self.__refresh_at is None else max(self.__refresh_at - time.monotonic(), 1)
+            await asyncio.sleep(delay)
+
+            try:
+                async with self.__refresh_lock:
+                    if self.__refresh_at is not None and time.monotonic() < self.__refresh_at:
+                        continue  # Already refreshed by a caller
+
+                    self.__refresh_at = None
+                    await self.__authenticate()
+            except Exception as e:
+                logger.warning("Failed to refresh OpenRemote access token, retrying")
+                logger.debug(e)
+
+    def stats(self) -> dict:
+        return {
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+            "refresh_seconds_total": round(self.refresh_seconds_total, 6),
+            "refresh_seconds_max": round(self.refresh_seconds_max, 6),
+            "expires_in": round((self.expires_on - datetime.now()).total_seconds()) if self.expires_on else None,
+        }
+
+    async def aclose(self):
+        if self.__refresh_task is not None:
+            self.__refresh_task.cancel()
+            self.__refresh_task = None
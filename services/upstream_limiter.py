@@ -0,0 +1,190 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Hashable
+
+import httpx
+from httpx import Response
+
+from .resilience import UpstreamUnavailableError
+
+# Set by callers (e.g. per MCP session) so queued upstream requests are served fairly between them
+current_session: ContextVar[Hashable | None] = ContextVar("current_session", default=None)
+
+OVERLOADED_STATUS_CODES = (429, 503)
+
+
+class UpstreamOverloadedError(UpstreamUnavailableError):
+    """No upstream capacity became available before the queue deadline."""
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit that adapts to the upstream (AIMD): it grows by one per limit's worth of fast responses,
+    shrinks by half on overload (429/503 or timeouts) and by a tenth on responses slower than `latency_target`.
+
+    Waiters are queued per session and served round robin, so one busy session can't starve the others.
+    """
+
+    def __init__(self, max_limit: int, min_limit: int = 1, latency_target: float = 2.0):
+        self.max_limit = max_limit
+        self.min_limit = min(min_limit, max_limit)
+        self.latency_target = latency_target
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self.__queues: OrderedDict[Hashable, deque[asyncio.Future]] = OrderedDict()
+        self.__last_decrease = 0.0
+
+        self.rejected = 0
+        self.decreases = 0
+
+    @property
+    def queued(self) -> int:
+        return sum(len(queue) for queue in self.__queues.values())
+
+    async def acquire(self, session: Hashable | None, timeout: float):
+        if self.in_flight < int(self.limit) and not self.__queues:
+            self.in_flight += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self.__queues.setdefault(session, deque()).append(future)
+        try:
+            await asyncio.wait_for(future, max(timeout, 0))
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # Granted just as the wait ended, hand the slot to the next waiter
+                self.release()
+            else:
+                self.__dequeue(session, future)
+
+            if isinstance(e, asyncio.TimeoutError):
+                self.rejected += 1
+                raise UpstreamOverloadedError() from None
+            raise
+
+    def release(self, latency: float | None = None, overloaded: bool = False):
+        """Release a slot, adapting the limit to the latency and outcome of the request when given."""
+        self.in_flight -= 1
+
+        if overloaded or (latency is not None and latency > self.latency_target):
+            # Decrease at most once per latency target, requests sent before a decrease report the same overload
+            now = time.monotonic()
+            if now - self.__last_decrease >= self.latency_target:
+                self.limit = max(self.min_limit, self.limit * (0.5 if overloaded else 0.9))
+                self.__last_decrease = now
+                self.decreases += 1
+        elif latency is not None:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+        self.__wake()
+
+    def __dequeue(self, session: Hashable | None, future: asyncio.Future):
+        queue = self.__queues.get(session)
+        if queue is None:
+            return
+
+        try:
+            queue.remove(future)
+        except ValueError:
+            pass
+        if not queue:
+            del self.__queues[session]
+
+    def __wake(self):
+        while self.__queues and self.in_flight < int(self.limit):
+            session, queue = next(iter(self.__queues.items()))
+            future = queue.popleft()
+            if queue:
+                self.__queues.move_to_end(session)
+            else:
+                del self.__queues[session]
+
+            if not future.done():
+                self.in_flight += 1
+                future.set_result(None)
+
+    def stats(self) -> dict:
+        return {
+            "limit": round(self.limit, 2),
+            "max_limit": self.max_limit,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "decreases": self.decreases,
+        }
+
+
+class UpstreamLimiter:
+    """
+    Bounds the concurrent requests to an OpenRemote manager, overall and per endpoint class (query, write, read).
+    Requests wait at most `queue_timeout` seconds for a slot, after which UpstreamOverloadedError is raised.
+    """
+
+    def __init__(
+            self,
+            max_concurrency: int = 64,
+            class_concurrency: dict[str, int] | None = None,
+            latency_target: float = 2.0,
+            queue_timeout: float = 10,
+    ):
+        self.queue_timeout = queue_timeout
+        self.limiter = AdaptiveLimiter(max_concurrency, latency_target=latency_target)
+        self.class_limiters = {
+            endpoint_class: AdaptiveLimiter(limit, latency_target=latency_target)
+            for endpoint_class, limit in (class_concurrency or {}).items()
+        }
+
+    @staticmethod
+    def classify(method: str, path: str) -> str:
+        if path.rstrip('/').endswith('/query'):
+            return "query"
+
+        return "read" if method.upper() in ("GET", "HEAD", "OPTIONS") else "write"
+
+    async def run(self, method: str, path: str, send: Callable[[], Awaitable[Response]]) -> Response:
+        endpoint_class = self.classify(method, path)
+        limiters = [limiter for limiter in (self.class_limiters.get(endpoint_class), self.limiter) if limiter is not None]
+
+        session = current_session.get()
+        deadline = time.monotonic() + self.queue_timeout
+        acquired = []
+        try:
+            for limiter in limiters:
+                await limiter.acquire(session, deadline - time.monotonic())
+                acquired.append(limiter)
+        except UpstreamOverloadedError:
+            for limiter in acquired:
+                limiter.release()
+            raise UpstreamOverloadedError(
+                f"OpenRemote is overloaded, no capacity for {endpoint_class} requests became available "
+                f"within {self.queue_timeout:g}s. Try again later."
+            ) from None
+        except BaseException:
+            for limiter in acquired:
+                limiter.release()
+            raise
+
+        started = time.perf_counter()
+        response = None
+        timed_out = False
+        try:
+            response = await send()
+            return response
+        except httpx.TimeoutException:
+            timed_out = True
+            raise
+        finally:
+            # Other failures (e.g. connection errors) say nothing about the upstream load
+            latency = time.perf_counter() - started if response is not None or timed_out else None
+            overloaded = timed_out or (response is not None and response.status_code in OVERLOADED_STATUS_CODES)
+            for limiter in acquired:
+                limiter.release(latency, overloaded)
+
+    def stats(self) -> dict:
+        return {
+            "queue_timeout": self.queue_timeout,
+            "all": self.limiter.stats(),
+            **{endpoint_class: limiter.stats() for endpoint_class, limiter in self.class_limiters.items()},
+        }
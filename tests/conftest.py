@@ -0,0 +1,13 @@
+import os
+
+import pytest
+
+# The settings are read on import of the app, the tests never reach this manager
+os.environ.setdefault("OPENREMOTE_URL", "http://openremote.test")
+os.environ.setdefault("OPENREMOTE_CLIENT_ID", "test")
+os.environ.setdefault("OPENREMOTE_CLIENT_SECRET", "test")
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
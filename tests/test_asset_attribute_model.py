@@ -0,0 +1,56 @@
+import gc
+import json
+
+from app.utils import AssetAttributeModelFactory, load_asset_model_snapshot, save_asset_model_snapshot
+from app.utils.asset_model_snapshot import SNAPSHOT_VERSION
+
+LOCATION = {"name": "location", "type": "GEO_JSONPoint", "optional": True}
+NOTES = {"name": "notes", "type": "text", "optional": True}
+TEMPERATURE = {"name": "temperature", "type": "number", "optional": False}
+
+
+def test_models_interned_while_in_use():
+    factory = AssetAttributeModelFactory()
+
+    room = factory("RoomAsset", [LOCATION, NOTES])
+    assert factory("BuildingAsset", [LOCATION, NOTES]) is room
+    assert factory.stats()["models"] == 1
+
+    del room
+    gc.collect()
+
+    assert factory.stats()["models"] == 0
+    factory("RoomAsset", [LOCATION, NOTES])
+    assert factory.stats()["built"] == 2
+
+
+def test_clear_drops_fields():
+    factory = AssetAttributeModelFactory()
+    model = factory("SensorAsset", [LOCATION, TEMPERATURE])
+    assert factory.stats()["fields"] == 2
+
+    factory.clear()
+
+    assert factory.stats()["fields"] == 0
+    assert factory("SensorAsset", [LOCATION, TEMPERATURE]) is model
+
+
+def test_unknown_value_types_accept_any_value():
+    factory = AssetAttributeModelFactory()
+    model = factory("CustomAsset", [{"name": "custom", "type": "customType"}])
+
+    assert model(custom={"any": "value"}).custom == {"any": "value"}
+
+
+def test_snapshots_of_older_versions_are_discarded(tmp_path):
+    path = str(tmp_path / "asset_models.json")
+    asset_infos = [{"assetDescriptor": {"name": "RoomAsset"}, "attributeDescriptors": [NOTES]}]
+    save_asset_model_snapshot(path, "http://openremote.test", asset_infos, {})
+
+    assert load_asset_model_snapshot(path, "http://openremote.test").version == SNAPSHOT_VERSION
+
+    snapshot = json.loads((tmp_path / "asset_models.json").read_text())
+    snapshot["version"] = SNAPSHOT_VERSION - 1
+    (tmp_path / "asset_models.json").write_text(json.dumps(snapshot))
+
+    assert load_asset_model_snapshot(path, "http://openremote.test") is None
@@ -0,0 +1,168 @@
+from types import SimpleNamespace
+
+import pytest
+from openremote_client.schemas import AssetObjectSchema
+
+from app.services import asset
+
+LOCATION = {"type": "Point", "coordinates": [4.4, 51.9]}
+
+
+class OpenRemote:
+    """Stand-in for the assets API of an OpenRemote manager, records the created assets."""
+
+    def __init__(self):
+        self.created: list[AssetObjectSchema] = []
+        self.failing: set[str] = set()
+
+    async def create_asset(self, asset_object: AssetObjectSchema):
+        if asset_object.name in self.failing:
+            raise ConnectionError("unavailable")
+        content = asset_object.model_copy(update={"id": f"id{len(self.created) + 1}"})
+        self.created.append(content)
+        return SimpleNamespace(content=content)
+
+
+@pytest.fixture
+def openremote(monkeypatch) -> OpenRemote:
+    openremote = OpenRemote()
+    monkeypatch.setattr(asset, "get_openremote_service", lambda: SimpleNamespace(
+        target=asset.DEFAULT_TARGET,
+        client=SimpleNamespace(realm_name="master", asset=openremote),
+    ))
+
+    monkeypatch.setattr(asset, "asset_attribute_descriptors", {
+        "WeatherAsset": [
+            {"name": "location", "type": "GEO_JSONPoint", "optional": True},
+            {"name": "temperature", "type": "number", "optional": False},
+        ],
+        "ThingAsset": [],
+    })
+    monkeypatch.setattr(asset, "asset_attribute_models", {})
+
+    return openremote
+
+
+async def create(**kwargs) -> dict:
+    return await asset.create.fn(**{"name": "Weather", "type": "WeatherAsset", "parentId": None, "realm": "master", **kwargs})
+
+
+@pytest.mark.parametrize("location", [LOCATION, {"name": "location", "type": "GEO_JSONPoint", "value": LOCATION}])
+@pytest.mark.anyio
+async def test_location_accepted(openremote, location):
+    await create(attributes={"location": location, "temperature": "21.5"})
+
+    [created] = openremote.created
+    assert created.attributes["location"] == {"name": "location", "type": "GEO_JSONPoint", "value": LOCATION}
+    assert created.attributes["temperature"] == {"name": "temperature", "type": "number", "value": 21.5}
+
+
+@pytest.mark.anyio
+async def test_invalid_attributes_rejected_locally(openremote):
+    result = await create(attributes={"location": "51.9, 4.4"})
+
+    assert result["status_code"] == 400
+    assert {(error["attribute"], error["type"]) for error in result["errors"]} == {("location", "dict_type"), ("temperature", "missing")}
+    assert openremote.created == []
+
+
+@pytest.mark.anyio
+async def test_unknown_type_rejected_locally(openremote):
+    result = await create(type="WindAsset", attributes={})
+
+    assert result["status_code"] == 400
+    assert "Unknown asset type 'WindAsset'" in result["detail"]
+    assert openremote.created == []
+
+
+@pytest.mark.anyio
+async def test_assets_of_other_targets_left_to_their_manager(openremote, monkeypatch):
+    monkeypatch.setattr(asset, "get_openremote_service", lambda: SimpleNamespace(
+        target="site", client=SimpleNamespace(realm_name="master", asset=openremote),
+    ))
+
+    # Only known to the other manager
+    await create(type="WindAsset", attributes={"speed": 4})
+    # Checked against the models of the other manager by itself
+    await create(attributes={"location": "51.9, 4.4"})
+
+    assert [created.attributes for created in openremote.created] == [
+        {"speed": {"name": "speed", "value": 4}},
+        {"location": {"name": "location", "value": "51.9, 4.4"}},
+    ]
+
+
+def bulk(*assets: dict) -> list[asset.BulkAssetSchema]:
+    def thing(item: dict) -> dict:
+        return {"type": "ThingAsset", **item, "children": [thing(child) for child in item.get("children", [])]}
+
+    return [asset.BulkAssetSchema(**thing(item)) for item in assets]
+
+
+@pytest.mark.anyio
+async def test_bulk_parents_resolved_by_ref(openremote):
+    result = await asset.create_many.fn(bulk(
+        {"name": "Pump", "parentId": "site"},
+        {"ref": "site", "name": "Site", "children": [{"name": "Meter"}]},
+        {"name": "Valve", "parentId": "existing1"},
+    ))
+
+    assert result["created"] == 4
+    ids = {created.name: created.id for created in openremote.created}
+    parents = {created.name: created.parentId for created in openremote.created}
+    # Refs are replaced by the id of the created asset, anything else is an existing asset
+    assert parents == {"Site": None, "Pump": ids["Site"], "Meter": ids["Site"], "Valve": "existing1"}
+    assert [item["name"] for item in result["results"]] == ["Pump", "Site", "Meter", "Valve"]
+    assert [item["level"] for item in result["results"]] == [1, 0, 1, 0]
+
+
+def test_bulk_duplicate_refs_rejected():
+    items, parents, results = asset._plan_bulk_create(bulk(
+        {"ref": "site", "name": "Site"},
+        {"ref": "site", "name": "Other site"},
+    ))
+
+    assert "failure" not in results[0]
+    assert results[1]["failure"] == "DUPLICATE_REF"
+
+
+def test_bulk_parent_cycles_rejected():
+    items, parents, results = asset._plan_bulk_create(bulk(
+        {"ref": "a", "name": "A", "parentId": "b"},
+        {"ref": "b", "name": "B", "parentId": "a", "children": [{"name": "C"}]},
+        {"ref": "d", "name": "D", "parentId": "d"},
+        {"name": "E"},
+    ))
+
+    assert [result.get("failure") for result in results] == ["PARENT_CYCLE"] * 4 + [None]
+    assert parents == [1, 0, 1, 3, None]
+
+
+@pytest.mark.anyio
+async def test_bulk_invalid_assets_create_nothing(openremote):
+    result = await asset.create_many.fn(bulk(
+        {"ref": "site", "name": "Site"},
+        {"ref": "site", "name": "Other site"},
+        {"name": "Weather", "type": "WeatherAsset", "attributes": {}},
+    ))
+
+    assert result["status_code"] == 400
+    assert [item.get("failure") for item in result["results"]] == [None, "DUPLICATE_REF", "INVALID_ASSET"]
+    assert openremote.created == []
+
+
+@pytest.mark.anyio
+async def test_bulk_children_of_failed_parents_not_created(openremote):
+    openremote.failing.add("Site")
+
+    result = await asset.create_many.fn(bulk(
+        {"ref": "site", "name": "Site", "children": [{"name": "Building", "children": [{"name": "Room"}]}]},
+        {"name": "Pump", "parentId": "site"},
+        {"name": "Valve"},
+    ))
+
+    assert result["created"] == 1
+    assert [(item["name"], item.get("failure")) for item in result["results"]] == [
+        ("Site", "UNKNOWN"), ("Building", "PARENT_FAILED"), ("Room", "PARENT_FAILED"), ("Pump", "PARENT_FAILED"), ("Valve", None),
+    ]
+    assert [created.name for created in openremote.created] == ["Valve"]
@@ -0,0 +1,93 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from openremote_client.schemas import AssetObjectSchema, AssetQuerySchema
+
+from app.services import hierarchy
+from app.utils import AssetIndex, IndexedAsset
+
+
+def indexed(asset_id: str, parent_id: str | None = None) -> IndexedAsset:
+    return IndexedAsset(id=asset_id, name=asset_id, type="ThingAsset", realm="master", parent_id=parent_id)
+
+
+def test_replace_applies_changes_made_during_rebuild():
+    index = AssetIndex()
+    index.replace([indexed("site"), indexed("building", "site"), indexed("old")])
+
+    changes = index.track_changes()
+    index.upsert(indexed("room", "building"))
+    index.remove("old")
+    index.replace([indexed("site"), indexed("building", "site"), indexed("old")], changes)
+    index.untrack_changes(changes)
+
+    assert set(index.assets) == {"site", "building", "room"}
+    assert [asset.id for asset, _ in index.descendants("site")] == ["building", "room"]
+
+
+def test_changes_are_only_tracked_until_untracked():
+    index = AssetIndex()
+    changes = index.track_changes()
+    index.untrack_changes(changes)
+    index.upsert(indexed("site"))
+
+    assert changes == {}
+
+
+def test_remove_drops_descendants():
+    index = AssetIndex()
+    index.replace([indexed("site"), indexed("building", "site"), indexed("room", "building"), indexed("other")])
+
+    index.remove("building")
+
+    assert set(index.assets) == {"site", "other"}
+    assert list(index.descendants("site")) == []
+
+
+def openremote_service(pages: dict[int, list[AssetObjectSchema]], fetching: asyncio.Event, release: asyncio.Event):
+    queries = []
+
+    async def get_all_realms():
+        return SimpleNamespace(content=[SimpleNamespace(name="master")])
+
+    async def query_assets(query: AssetQuerySchema):
+        queries.append(query)
+        fetching.set()
+        await release.wait()
+        return SimpleNamespace(content=pages.get(query.offset, []))
+
+    client = SimpleNamespace(
+        realm=SimpleNamespace(get_all_realms=get_all_realms),
+        asset=SimpleNamespace(query_assets=query_assets),
+    )
+
+    return SimpleNamespace(target="rebuild-test", client=client), queries
+
+
+def asset(asset_id: str, parent_id: str | None = None) -> AssetObjectSchema:
+    return AssetObjectSchema.model_construct(id=asset_id, name=asset_id, type="ThingAsset", realm="master", parentId=parent_id)
+
+
+@pytest.mark.anyio
+async def test_rebuild_keeps_changes_observed_meanwhile(monkeypatch):
+    monkeypatch.setattr(hierarchy.config, "asset_query_max_page_size", 2)
+    monkeypatch.setitem(hierarchy.asset_indexes, "rebuild-test", AssetIndex())
+    fetching, release = asyncio.Event(), asyncio.Event()
+    service, queries = openremote_service({
+        0: [asset("site"), asset("building", "site")],
+        # The second page overlaps the first, e.g. when an asset was deleted meanwhile
+        2: [asset("building", "site"), asset("deleted")],
+    }, fetching, release)
+
+    rebuild = asyncio.create_task(hierarchy.rebuild_asset_index(service))
+    await fetching.wait()
+    hierarchy.observe_assets("rebuild-test", [asset("room", "building")])
+    hierarchy.forget_asset("rebuild-test", "deleted")
+    release.set()
+    await rebuild
+
+    index = hierarchy.asset_indexes["rebuild-test"]
+    assert [asset.id for asset, _ in index.descendants(None)] == ["site", "building", "room"]
+    assert all(query.orderBy.property == "CREATED_ON" for query in queries)
+    assert [query.offset for query in queries] == [0, 2, 4]
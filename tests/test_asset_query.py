@@ -0,0 +1,58 @@
+from types import SimpleNamespace
+
+import pytest
+from openremote_client.schemas import AssetObjectSchema, AssetQuerySchema
+
+from app.services import asset
+from app.utils import compact
+
+
+def openremote_service(assets: list[AssetObjectSchema]):
+    async def query_assets(query: AssetQuerySchema):
+        return SimpleNamespace(content=assets[query.offset:query.offset + query.limit])
+
+    return SimpleNamespace(target=None, client=SimpleNamespace(asset=SimpleNamespace(query_assets=query_assets)))
+
+
+@pytest.fixture
+def assets(monkeypatch):
+    assets = [AssetObjectSchema.model_construct(id=f"asset{i}", name=f"A{i}") for i in range(3)]
+    monkeypatch.setattr(asset, "get_openremote_service", lambda: openremote_service(assets))
+
+    return assets
+
+
+async def query(**kwargs) -> dict:
+    arguments = {"cursor": None, "page_size": 100, "fields": ["name"], "attributes": None, **kwargs}
+
+    return compact(await asset.query.fn(AssetQuerySchema(), **arguments))
+
+
+@pytest.mark.anyio
+async def test_query_pages_contain_assets_and_next_cursor(assets):
+    first = await query(page_size=2)
+    assert [item["id"] for item in first["assets"]] == ["asset0", "asset1"]
+    assert first["next_cursor"]
+
+    last = await query(page_size=2, cursor=first["next_cursor"])
+    assert last == {"assets": [{"id": "asset2", "name": "A2"}], "next_cursor": None}
+
+
+@pytest.mark.anyio
+async def test_query_without_matches_contains_assets_and_next_cursor(monkeypatch):
+    monkeypatch.setattr(asset, "get_openremote_service", lambda: openremote_service([]))
+
+    assert await query() == {"assets": [], "next_cursor": None}
+
+
+@pytest.mark.anyio
+async def test_query_with_fields_keeps_all_attributes(monkeypatch):
+    attributes = {"temperature": {"name": "temperature", "type": "number", "value": 21.5}, "notes": {"name": "notes", "type": "text", "value": "ok"}}
+    assets = [AssetObjectSchema.model_construct(id="asset0", name="A0", type="ThingAsset", attributes=attributes)]
+    monkeypatch.setattr(asset, "get_openremote_service", lambda: openremote_service(assets))
+
+    assert await query(fields=["name"]) == {"assets": [{"id": "asset0", "name": "A0", "attributes": attributes}], "next_cursor": None}
+    assert await query(fields=["name"], attributes=["notes"]) == {
+        "assets": [{"id": "asset0", "name": "A0", "attributes": {"notes": attributes["notes"]}}],
+        "next_cursor": None,
+    }
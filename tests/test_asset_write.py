@@ -0,0 +1,90 @@
+from types import SimpleNamespace
+
+import pytest
+from pydantic import ValidationError
+
+from app.services import asset
+
+
+@pytest.fixture
+def sensor_asset(monkeypatch):
+    monkeypatch.setitem(asset.asset_attribute_descriptors, "SensorAsset", [
+        {"name": "temperature", "type": "number", "optional": False},
+    ])
+    monkeypatch.delitem(asset.asset_attribute_models, "SensorAsset", raising=False)
+    asset._attribute_value_adapter.cache_clear()
+
+
+@pytest.mark.anyio
+async def test_write_without_values_does_not_query_assets(monkeypatch):
+    def unavailable():
+        raise AssertionError("OpenRemote should not be called")
+
+    monkeypatch.setattr(asset, "get_openremote_service", unavailable)
+
+    assert await asset.write_attribute_values.fn([]) == []
+
+
+def test_attribute_value_adapter_is_reused(sensor_asset):
+    assert asset._validate_attribute_value("SensorAsset", "temperature", "21.5") == 21.5
+    assert asset._validate_attribute_value("SensorAsset", "temperature", 22) == 22
+    with pytest.raises(ValidationError):
+        asset._validate_attribute_value("SensorAsset", "temperature", "warm")
+
+    cache_info = asset._attribute_value_adapter.cache_info()
+    assert cache_info.misses == 1
+    assert cache_info.hits == 2
+
+
+def test_unknown_attributes_are_left_to_openremote(sensor_asset):
+    assert asset._validate_attribute_value("SensorAsset", "humidity", "anything") == "anything"
+    assert asset._validate_attribute_value("UnknownAsset", "temperature", "warm") == "warm"
+
+
+def test_location_values_are_objects(monkeypatch):
+    monkeypatch.setitem(asset.asset_attribute_descriptors, "WeatherAsset", [
+        {"name": "location", "type": "GEO_JSONPoint", "optional": True},
+    ])
+    monkeypatch.delitem(asset.asset_attribute_models, "WeatherAsset", raising=False)
+    asset._attribute_value_adapter.cache_clear()
+    location = {"type": "Point", "coordinates": [4.4, 51.9]}
+
+    assert asset._validate_attribute_value("WeatherAsset", "location", location) == location
+    with pytest.raises(ValidationError):
+        asset._validate_attribute_value("WeatherAsset", "location", "51.9, 4.4")
+
+
+@pytest.mark.anyio
+async def test_last_write_of_an_attribute_wins(monkeypatch, sensor_asset):
+    sent = []
+
+    class Response:
+        def __init__(self, states):
+            self.states = states
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return [{"ref": state["ref"]} for state in self.states]
+
+    async def query_assets(query):
+        return SimpleNamespace(content=[SimpleNamespace(id="a1", type="SensorAsset")])
+
+    async def put(path, json):
+        sent.extend((state["ref"]["name"], state["value"]) for state in json)
+        return Response(json)
+
+    client = SimpleNamespace(asset=SimpleNamespace(query_assets=query_assets), put=put)
+    monkeypatch.setattr(asset, "get_openremote_service", lambda: SimpleNamespace(client=client))
+    monkeypatch.setattr(asset.config, "asset_write_batch_size", 1)
+
+    writes = [
+        asset.AttributeWriteSchema(asset_id="a1", attribute_name="temperature", value=20),
+        asset.AttributeWriteSchema(asset_id="a1", attribute_name="notes", value="first"),
+        asset.AttributeWriteSchema(asset_id="a1", attribute_name="temperature", value=21),
+    ]
+    results = await asset.write_attribute_values.fn(writes)
+
+    assert sorted(sent) == [("notes", "first"), ("temperature", 21)]
+    assert [result["success"] for result in results] == [True, True, True]
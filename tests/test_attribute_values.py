@@ -0,0 +1,128 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.services import asset
+from app.utils import AttributeValueCache
+
+
+class EventStream:
+    """Stand-in for the event websocket, records the subscriptions."""
+
+    def __init__(self):
+        self.connected = True
+        self.subscriptions: set[str] = set()
+
+    async def subscribe(self, asset_id: str):
+        self.subscriptions.add(asset_id)
+
+    async def unsubscribe(self, asset_id: str):
+        self.subscriptions.discard(asset_id)
+
+
+class OpenRemote:
+    def __init__(self):
+        self.requests = 0
+        self.requested = asyncio.Event()
+        self.release = asyncio.Event()
+        self.error: BaseException | None = None
+
+    async def get_asset(self, asset_id: str):
+        self.requests += 1
+        self.requested.set()
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+
+        return SimpleNamespace(content=SimpleNamespace(attributes={
+            "temperature": {"value": 21.5, "timestamp": 1000},
+        }))
+
+
+@pytest.fixture
+def live(monkeypatch):
+    cache = AttributeValueCache(max_assets=10)
+    stream = EventStream()
+    openremote = OpenRemote()
+    service = SimpleNamespace(target="attribute-test", client=SimpleNamespace(asset=openremote))
+
+    monkeypatch.setattr(asset, "get_openremote_service", lambda: service)
+    monkeypatch.setattr(asset, "get_live_attributes", lambda _: (cache, stream))
+
+    return SimpleNamespace(cache=cache, stream=stream, openremote=openremote)
+
+
+async def read(asset_id: str = "sensor") -> dict:
+    return await asset.read_attribute_values(asset_id, None)
+
+
+@pytest.mark.anyio
+async def test_concurrent_reads_wait_for_the_values(live):
+    first = asyncio.create_task(read())
+    await live.openremote.requested.wait()
+    second = asyncio.create_task(read())
+    await asyncio.sleep(0)
+
+    # The entry collecting events isn't served before the values are in
+    assert not second.done()
+    live.cache.apply_event("sensor", "temperature", 22.0, 2000)
+    live.openremote.release.set()
+
+    for result in await asyncio.gather(first, second):
+        assert result["source"] == "openremote"
+        assert result["live"] is True
+        assert result["attributes"]["temperature"]["value"] == 22.0
+
+    assert live.openremote.requests == 1
+    assert (await read())["source"] == "cache"
+
+
+@pytest.mark.anyio
+async def test_values_not_live_after_missed_events(live):
+    reading = asyncio.create_task(read())
+    await live.openremote.requested.wait()
+    live.cache.mark_stale()
+    live.openremote.release.set()
+
+    assert (await reading)["live"] is False
+    assert live.cache.get("sensor") is None
+
+
+@pytest.mark.anyio
+async def test_failed_read_drops_entry_and_subscription(live):
+    live.openremote.error = httpx.ConnectError("unreachable")
+    live.openremote.release.set()
+
+    with pytest.raises(httpx.ConnectError):
+        await read()
+
+    assert "sensor" not in live.cache
+    assert live.stream.subscriptions == set()
+
+
+@pytest.mark.anyio
+async def test_cancelled_read_drops_entry_and_subscription(live):
+    reading = asyncio.create_task(read())
+    await live.openremote.requested.wait()
+    assert live.stream.subscriptions == {"sensor"}
+
+    reading.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await reading
+    await asyncio.sleep(0)
+
+    assert "sensor" not in live.cache
+    assert live.stream.subscriptions == set()
+
+
+@pytest.mark.anyio
+async def test_not_found_is_returned(live):
+    request = httpx.Request("GET", "http://openremote.test/api/master/asset/sensor")
+    live.openremote.error = httpx.HTTPStatusError("Not found", request=request, response=httpx.Response(404, text="Not found", request=request))
+    live.openremote.release.set()
+
+    assert await read() == {"status_code": 404, "detail": "Not found"}
+    assert "sensor" not in live.cache
+    assert live.stream.subscriptions == set()
@@ -0,0 +1,128 @@
+import asyncio
+import importlib
+from types import SimpleNamespace
+
+import pytest
+from fastmcp import FastMCP
+from fastmcp.server.middleware import MiddlewareContext
+from mcp.types import CallToolRequestParams, ToolAnnotations
+
+from app.middleware import CoalescingMiddleware
+from services.openremote_service import current_target
+
+# The module, `app.middleware.coalescing` is the middleware instance
+coalescing_module = importlib.import_module("app.middleware.coalescing")
+
+mcp = FastMCP("Test")
+
+
+@mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
+def read() -> str:
+    return "value"
+
+
+@mcp.tool
+def write() -> str:
+    return "written"
+
+
+def context(name: str = "read", **arguments) -> MiddlewareContext:
+    return MiddlewareContext(
+        message=CallToolRequestParams(name=name, arguments=arguments),
+        fastmcp_context=SimpleNamespace(fastmcp=mcp),
+    )
+
+
+class Upstream:
+    def __init__(self):
+        self.calls = 0
+        self.called = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def __call__(self, context: MiddlewareContext):
+        self.calls += 1
+        call = self.calls
+        self.called.set()
+        await self.release.wait()
+        return f"result {call}"
+
+
+@pytest.fixture
+def access_token(monkeypatch):
+    token = SimpleNamespace(value=SimpleNamespace(token="token-a"))
+    monkeypatch.setattr(coalescing_module, "get_access_token", lambda: token.value)
+
+    return token
+
+
+@pytest.mark.anyio
+async def test_cancelled_first_caller_does_not_fail_waiters(access_token):
+    middleware = CoalescingMiddleware(ttl=10)
+    upstream = Upstream()
+
+    first = asyncio.create_task(middleware.on_call_tool(context(), upstream))
+    await upstream.called.wait()
+    second = asyncio.create_task(middleware.on_call_tool(context(), upstream))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    await asyncio.sleep(0)
+    upstream.release.set()
+
+    assert await second == "result 1"
+    assert upstream.calls == 1
+    assert middleware.stats()["coalesced"] == 1
+
+
+@pytest.mark.anyio
+async def test_results_not_shared_between_access_tokens(access_token):
+    middleware = CoalescingMiddleware(ttl=10)
+    upstream = Upstream()
+    upstream.release.set()
+
+    assert await middleware.on_call_tool(context(), upstream) == "result 1"
+    assert await middleware.on_call_tool(context(), upstream) == "result 1"
+
+    access_token.value = SimpleNamespace(token="token-b")
+    assert await middleware.on_call_tool(context(), upstream) == "result 2"
+
+
+@pytest.mark.anyio
+async def test_results_not_shared_between_targets(access_token):
+    middleware = CoalescingMiddleware(ttl=10)
+    upstream = Upstream()
+    upstream.release.set()
+
+    assert await middleware.on_call_tool(context(), upstream) == "result 1"
+
+    token = current_target.set("secondary")
+    try:
+        assert await middleware.on_call_tool(context(), upstream) == "result 2"
+    finally:
+        current_target.reset(token)
+
+
+@pytest.mark.anyio
+async def test_reads_overlapping_a_write_are_not_reused(access_token):
+    middleware = CoalescingMiddleware(ttl=10)
+    upstream = Upstream()
+
+    reading = asyncio.create_task(middleware.on_call_tool(context(), upstream))
+    await upstream.called.wait()
+    upstream.release.set()
+    await middleware.on_call_tool(context("write"), upstream)
+
+    assert await reading == "result 1"
+    assert await middleware.on_call_tool(context(), upstream) == "result 3"
+
+
+@pytest.mark.anyio
+async def test_invalidate_drops_results(access_token):
+    middleware = CoalescingMiddleware(ttl=10)
+    upstream = Upstream()
+    upstream.release.set()
+
+    await middleware.on_call_tool(context(), upstream)
+    middleware.invalidate()
+
+    assert await middleware.on_call_tool(context(), upstream) == "result 2"
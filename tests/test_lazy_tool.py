@@ -0,0 +1,68 @@
+import pytest
+from fastmcp import FastMCP, Client
+from fastmcp.tools import Tool
+
+from app.middleware.target_routing import TargetRoutingMiddleware
+from app.services import asset
+from app.utils import LazyTool, load_asset_model_snapshot
+
+
+def lazy_tool(builds: list) -> LazyTool:
+    def add(a: int, b: int) -> int:
+        return a + b
+
+    def factory() -> Tool:
+        builds.append("add")
+        return Tool.from_function(add)
+
+    return LazyTool.from_factory(factory, name="add", description="Add two numbers.")
+
+
+@pytest.mark.anyio
+async def test_lazy_tool_listed_with_multiple_targets():
+    builds = []
+    mcp = FastMCP("Test")
+    mcp.add_tool(lazy_tool(builds))
+    mcp.add_middleware(TargetRoutingMiddleware(["primary", "secondary"]))
+
+    async with Client(mcp) as client:
+        for _ in range(2):
+            [tool] = await client.list_tools()
+
+            assert set(tool.inputSchema["properties"]) == {"a", "b", "target"}
+            assert tool.inputSchema["properties"]["target"]["enum"] == ["primary", "secondary"]
+            assert tool.inputSchema["required"] == ["a", "b"]
+
+        result = await client.call_tool("add", {"a": 1, "b": 2, "target": "secondary"})
+        assert result.data == 3
+
+    assert builds == ["add"]
+
+
+@pytest.mark.anyio
+async def test_lazy_tool_compiled_once_when_listed():
+    builds = []
+    tool = lazy_tool(builds)
+
+    for _ in range(3):
+        assert set(tool.to_mcp_tool().inputSchema["properties"]) == {"a", "b"}
+
+    assert tool.is_compiled
+    assert not tool.compile_on_list
+    assert builds == ["add"]
+
+
+@pytest.mark.anyio
+async def test_snapshot_does_not_build_lazy_tools(monkeypatch, tmp_path):
+    monkeypatch.setattr(asset.config, "asset_tools_lazy", True)
+    monkeypatch.setattr(asset.config, "asset_snapshot_path", str(tmp_path / "asset_models.json"))
+    monkeypatch.setattr(asset, "asset_attribute_descriptors", {"SensorAsset": [], "ThingAsset": []})
+    monkeypatch.setattr(asset, "asset_create_tools", {})
+    monkeypatch.setattr(asset, "get_create_tool", lambda name: pytest.fail(f"Built the tool of {name}"))
+    asset_infos = [{"assetDescriptor": {"name": "SensorAsset"}, "attributeDescriptors": []}]
+
+    await asset.save_asset_snapshot(asset_infos)
+
+    snapshot = load_asset_model_snapshot(asset.config.asset_snapshot_path, str(asset.config.openremote_url))
+    assert snapshot.asset_infos == asset_infos
+    assert snapshot.schemas == {}
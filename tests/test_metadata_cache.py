@@ -0,0 +1,135 @@
+import asyncio
+
+import pytest
+
+from app.utils import MetadataCache, SingleFlight, content
+
+
+class Response:
+    def __init__(self, value):
+        self.content = value
+
+
+async def respond(value):
+    return Response(value)
+
+
+@pytest.mark.anyio
+async def test_cancelled_first_caller_does_not_fail_waiters():
+    cache = MetadataCache(ttls={"realm": 60})
+    started = asyncio.Event()
+    release = asyncio.Event()
+    fetches = 0
+
+    async def fetch():
+        nonlocal fetches
+        fetches += 1
+        started.set()
+        await release.wait()
+        return ["master"]
+
+    first = asyncio.create_task(cache.get_or_fetch("realm", None, fetch))
+    await started.wait()
+    second = asyncio.create_task(cache.get_or_fetch("realm", None, fetch))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await second == ["master"]
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    assert fetches == 1
+    assert cache.stats()["coalesced"] == 1
+    # Stored although the caller that started the fetch is gone
+    assert await cache.get_or_fetch("realm", None, fetch) == ["master"]
+    assert fetches == 1
+
+
+@pytest.mark.anyio
+async def test_fetch_cancelled_once_all_callers_are():
+    cache = MetadataCache(ttls={"realm": 60})
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def fetch():
+        started.set()
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    callers = [asyncio.create_task(cache.get_or_fetch("realm", None, fetch)) for _ in range(2)]
+    await started.wait()
+    for caller in callers:
+        caller.cancel()
+
+    await asyncio.wait_for(cancelled.wait(), 1)
+
+    # A later call fetches again instead of joining the cancelled fetch
+    assert await cache.get_or_fetch("realm", None, lambda: content(respond(["master"]))) == ["master"]
+
+
+@pytest.mark.anyio
+async def test_errors_reach_every_caller_and_are_not_cached():
+    cache = MetadataCache(ttls={"realm": 60})
+    release = asyncio.Event()
+
+    async def fetch():
+        await release.wait()
+        raise ValueError("unavailable")
+
+    callers = [asyncio.create_task(cache.get_or_fetch("realm", None, fetch)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+
+    for caller in callers:
+        with pytest.raises(ValueError):
+            await caller
+
+    assert await cache.get_or_fetch("realm", None, lambda: content(respond(["master"]))) == ["master"]
+
+
+@pytest.mark.anyio
+async def test_caches_content_only():
+    cache = MetadataCache(ttls={"realm": 60})
+
+    value = await cache.get_or_fetch("realm", None, lambda: content(respond(["master"])))
+
+    assert value == ["master"]
+    assert await cache.get_or_fetch("realm", None, lambda: content(respond(["other"]))) == ["master"]
+
+
+@pytest.mark.anyio
+async def test_results_fetched_before_invalidation_are_not_stored():
+    cache = MetadataCache(ttls={"realm": 60})
+    release = asyncio.Event()
+
+    async def fetch():
+        await release.wait()
+        return ["old"]
+
+    caller = asyncio.create_task(cache.get_or_fetch("realm", None, fetch))
+    await asyncio.sleep(0)
+    cache.invalidate("realm")
+    release.set()
+
+    assert await caller == ["old"]
+    assert await cache.get_or_fetch("realm", None, lambda: content(respond(["new"]))) == ["new"]
+
+
+@pytest.mark.anyio
+async def test_single_flight_runs_call_once():
+    flights = SingleFlight()
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    assert await asyncio.gather(*(flights.run("key", call) for _ in range(5))) == [1] * 5
+    assert len(flights) == 0
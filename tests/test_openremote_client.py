@@ -0,0 +1,36 @@
+import openremote_client
+
+from services.openremote_client import PooledOpenRemoteClient
+
+
+def test_client_only_builds_the_pooled_http_client(monkeypatch):
+    def unpooled(*args, **kwargs):
+        raise AssertionError("The default HttpClient should not be built")
+
+    monkeypatch.setattr(openremote_client, "HttpClient", unpooled)
+    monkeypatch.setattr(openremote_client, "Authenticator", unpooled)
+
+    client = PooledOpenRemoteClient("http://openremote.test", "client", "secret")
+
+    assert client.asset._Asset__client is client.http_client
+    assert client.rule._Rule__client is client.http_client
+    assert client.get == client.http_client.get
+
+
+def test_pool_stats():
+    client = PooledOpenRemoteClient("http://openremote.test", "client", "secret")
+
+    stats = client.http_client.stats()
+    assert stats["connections"] == 0
+    assert stats["active_connections"] == 0
+
+
+def test_pool_stats_without_exposed_pool():
+    client = PooledOpenRemoteClient("http://openremote.test", "client", "secret")
+    client.http_client._PooledHttpClient__client._transport = object()
+
+    stats = client.http_client.stats()
+    assert stats["connections"] is None
+    assert stats["active_connections"] is None
+    assert stats["idle_connections"] is None
+    assert stats["requests"] == 0
@@ -0,0 +1,57 @@
+import httpx
+import pytest
+
+from services.resilience import UpstreamResilience, RetryPolicy
+
+
+@pytest.mark.parametrize("method, path", [
+    ("GET", "/asset/a1"),
+    ("HEAD", "/asset/a1"),
+    ("OPTIONS", "/asset"),
+    ("POST", "/asset/query"),
+    ("PUT", "/service/mcp-server/4f2c"),
+])
+def test_retried(method, path):
+    assert UpstreamResilience.is_idempotent(method, path)
+
+
+@pytest.mark.parametrize("method, path", [
+    ("PUT", "/asset/attributes"),
+    ("PUT", "/asset/a1/attribute/temperature"),
+    ("PUT", "/rules/realm/12"),
+    ("POST", "/rules/realm"),
+    ("POST", "/asset"),
+    ("DELETE", "/rules/12"),
+    ("POST", "/service"),
+])
+def test_not_retried(method, path):
+    assert not UpstreamResilience.is_idempotent(method, path)
+
+
+def unavailable():
+    """Send function answering 503, and the number of times it was called."""
+    sent = 0
+
+    async def send():
+        nonlocal sent
+        sent += 1
+        return httpx.Response(503)
+
+    return send, lambda: sent
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("method, path, expected", [
+    ("POST", "/asset/query", 3),
+    ("PUT", "/service/mcp-server/4f2c", 3),
+    ("PUT", "/asset/attributes", 1),
+    ("PUT", "/rules/asset/7", 1),
+])
+async def test_attempts(method, path, expected):
+    resilience = UpstreamResilience(RetryPolicy(attempts=3, base_delay=0, max_delay=0), failure_threshold=10)
+    send, sent = unavailable()
+
+    response = await resilience.run(method, path, send)
+
+    assert response.status_code == 503
+    assert sent() == expected
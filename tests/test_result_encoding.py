@@ -0,0 +1,80 @@
+import json
+
+import pytest
+from fastmcp import FastMCP, Client
+
+from app.middleware.result_encoding import ResultEncodingMiddleware
+from app.utils import compact, tabulate
+
+
+def test_compact_keeps_top_level_keys():
+    assert compact({"assets": [], "next_cursor": None}) == {"assets": [], "next_cursor": None}
+
+
+def test_compact_drops_nested_nulls_and_empty_values():
+    asset = {"id": "a1", "parentId": None, "path": [], "attributes": {"notes": {"name": "notes", "meta": {}}}}
+
+    assert compact({"assets": [asset]}) == {
+        "assets": [{"id": "a1", "attributes": {"notes": {"name": "notes", "meta": {}}}}],
+    }
+
+
+def test_compact_keeps_attribute_values():
+    attributes = {
+        "tags": {"name": "tags", "value": [], "timestamp": None},
+        "setpoint": {"name": "setpoint", "value": None},
+        "config": {"name": "config", "value": {"schedule": None, "days": []}},
+    }
+
+    assert compact([{"attributes": attributes}]) == [{"attributes": {
+        "tags": {"name": "tags", "value": []},
+        "setpoint": {"name": "setpoint", "value": None},
+        "config": {"name": "config", "value": {"schedule": None, "days": []}},
+    }}]
+
+
+def test_compact_unwraps_responses():
+    response = {"status_code": 200, "content": {"name": "master", "displayName": None}, "response": {}}
+
+    assert compact(response) == {"name": "master"}
+    assert compact({"results": [response]}) == {"results": [{"name": "master"}]}
+
+
+def test_tabulate_keeps_missing_values():
+    assert tabulate([{"a": 1}, {"b": 2}, {"a": 3}]) == {"columns": ["a", "b"], "rows": [[1, None], [None, 2], [3, None]]}
+
+
+@pytest.mark.anyio
+async def test_structured_content_compacted_without_output_schema():
+    mcp = FastMCP("Test")
+    mcp.add_middleware(ResultEncodingMiddleware())
+
+    @mcp.tool
+    def page():
+        return {"assets": [{"id": "a1", "parentId": None}], "next_cursor": None}
+
+    assert (await mcp.get_tool("page")).output_schema is None
+
+    async with Client(mcp) as client:
+        result = await client.call_tool("page", {})
+
+    assert json.loads(result.content[0].text) == {"assets": [{"id": "a1"}], "next_cursor": None}
+    assert result.structured_content == {"assets": [{"id": "a1"}], "next_cursor": None}
+
+
+@pytest.mark.anyio
+async def test_structured_content_kept_with_output_schema():
+    mcp = FastMCP("Test")
+    mcp.add_middleware(ResultEncodingMiddleware())
+
+    @mcp.tool
+    def realm() -> dict[str, str | None]:
+        return {"name": "master", "displayName": None}
+
+    assert (await mcp.get_tool("realm")).output_schema is not None
+
+    async with Client(mcp) as client:
+        result = await client.call_tool("realm", {})
+
+    assert json.loads(result.content[0].text) == {"name": "master", "displayName": None}
+    assert result.structured_content == {"name": "master", "displayName": None}
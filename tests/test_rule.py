@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.services import rule
+from app.utils import metadata_cache
+
+
+class Rules:
+    """Stand-in for the OpenRemote rules API, records the requested paths."""
+
+    def __init__(self):
+        self.rulesets = {1: {"id": 1, "version": 1, "name": "Lights", "rules": "rule 1"}}
+        self.paths = []
+        self.fetched = []
+
+    async def get(self, path: str, params: dict | None = None):
+        self.paths.append(path)
+        rulesets = [{key: value for key, value in ruleset.items() if key != "rules"} for ruleset in self.rulesets.values()]
+        return httpx.Response(200, json=rulesets, request=httpx.Request("GET", f"http://openremote.test{path}"))
+
+    async def get_realm_ruleset(self, rule_id: int):
+        self.fetched.append(rule_id)
+        return SimpleNamespace(response=httpx.Response(200, json=self.rulesets[rule_id]))
+
+    async def update_realm_ruleset(self, rule_id: int, schema):
+        self.rulesets[rule_id] = {**self.rulesets[rule_id], "version": self.rulesets[rule_id]["version"] + 1, "rules": schema}
+
+
+@pytest.fixture
+def rules(monkeypatch):
+    rules = Rules()
+    client = SimpleNamespace(get=rules.get, rule=rules)
+    monkeypatch.setattr(rule, "get_openremote_service", lambda: SimpleNamespace(target="rule-test", client=client))
+    metadata_cache.invalidate("ruleset")
+
+    return rules
+
+
+@pytest.mark.anyio
+async def test_listing_paths_are_quoted(rules):
+    await rule.get_realm_rulesets.fn("smart/city", False)
+    await rule.get_asset_rulesets.fn("../asset?x=1", False)
+
+    assert rules.paths == ["/rules/realm/for/smart%2Fcity", "/rules/asset/for/..%2Fasset%3Fx%3D1"]
+
+
+@pytest.mark.anyio
+async def test_rules_only_fetched_again_once_changed(rules):
+    listed = await rule.get_realm_rulesets.fn("master", True)
+    assert listed[0]["rules"] == "rule 1"
+
+    await rule.get_realm_rulesets.fn("master", True)
+    assert rules.fetched == [1]
+
+    await rule.update_realm_ruleset.fn(1, "rule 2")
+    listed = await rule.get_realm_rulesets.fn("master", True)
+
+    assert listed[0]["rules"] == "rule 2"
+    assert rules.fetched == [1, 1]
+    assert len(rules.paths) == 2
@@ -0,0 +1,66 @@
+from pathlib import Path
+
+import pytest
+from openremote_client.schemas import RealmSchema
+
+from app.config import Config
+from app.utils import SharedCacheStore, FileSharedCacheStore
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_shared_cache_store_is_abstract():
+    class IncompleteStore(SharedCacheStore):
+        def get(self, resource, key):
+            return None
+
+    with pytest.raises(TypeError):
+        IncompleteStore()
+
+
+def test_file_store_shares_content(tmp_path):
+    realms = [RealmSchema.model_construct(name="master"), RealmSchema.model_construct(name="site")]
+    FileSharedCacheStore(str(tmp_path)).set("realm", ("default", None), realms, 60)
+
+    _, value = FileSharedCacheStore(str(tmp_path)).get("realm", ("default", None))
+
+    assert [realm.name for realm in value] == ["master", "site"]
+
+
+def test_file_store_drops_expired_and_invalidated_entries(tmp_path):
+    store = FileSharedCacheStore(str(tmp_path))
+    store.set("realm", "expired", ["master"], -1)
+    store.set("asset_model", "kept", ["RoomAsset"], 60)
+    store.set("realm", "invalidated", ["master"], 60)
+
+    store.invalidate("realm")
+
+    assert store.get("realm", "expired") is None
+    assert store.get("realm", "invalidated") is None
+    assert store.get("asset_model", "kept")[1] == ["RoomAsset"]
+
+
+def config(**settings) -> Config:
+    return Config(openremote_url="http://openremote.test", openremote_client_id="test", openremote_client_secret="test", **settings)
+
+
+def test_single_worker_defaults():
+    single = config(app_workers=1)
+
+    assert single.leader_election == "none"
+    assert not single.stateless_http
+
+
+def test_multiple_worker_defaults():
+    multiple = config(app_workers=4)
+
+    assert multiple.leader_election == "file"
+    assert multiple.stateless_http
+    assert config(app_workers=4, app_leader_election="none").leader_election == "none"
+
+
+def test_shared_paths_are_absolute(tmp_path):
+    settings = config(app_leader_lock_path=".cache/leader.lock", cache_shared_path=str(tmp_path / "metadata"))
+
+    assert settings.app_leader_lock_path == str(PROJECT_ROOT / ".cache" / "leader.lock")
+    assert settings.cache_shared_path == str(tmp_path / "metadata")
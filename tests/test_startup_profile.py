@@ -0,0 +1,20 @@
+import time
+
+from app.startup_profile import StartupProfile
+
+
+def test_phases_are_not_counted_twice_by_marks():
+    profile = StartupProfile()
+    with profile.phase("config"):
+        with profile.phase("settings"):
+            time.sleep(0.02)
+        time.sleep(0.02)
+    profile.mark("import")
+
+    phases = profile.report()["phases_ms"]
+    assert phases["config"] >= 40
+    assert phases["import"] < 20
+
+    time.sleep(0.02)
+    profile.mark("registration")
+    assert profile.report()["phases_ms"]["registration"] >= 20
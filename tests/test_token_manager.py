@@ -0,0 +1,131 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from openremote_client.url_builder import UrlBuilder
+
+from services import token_manager
+from services.openremote_client import PooledHttpClient
+from services.token_manager import TokenManager
+
+
+class OpenRemote:
+    """Stand-in for the token endpoint and the API of OpenRemote, the API only accepts the latest token."""
+
+    def __init__(self, expires_in: int = 60):
+        self.expires_in = expires_in
+        self.tokens = 0
+        self.requests: list[str] = []
+        self.reject_all = False
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/openid-connect/token"):
+            self.tokens += 1
+            token = f"t{self.tokens}"
+            # Let concurrent callers pile up behind the refresh
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json={"access_token": token, "expires_in": self.expires_in})
+
+        self.requests.append(request.headers["Authorization"])
+        if self.reject_all or request.headers["Authorization"] != f"Bearer t{self.tokens}":
+            return httpx.Response(401)
+        return httpx.Response(200, json=[])
+
+
+@pytest.fixture
+def openremote(monkeypatch) -> OpenRemote:
+    openremote = OpenRemote()
+    transport = httpx.MockTransport(openremote.handle)
+
+    class MockAsyncClient(httpx.AsyncClient):
+        def __init__(self, **kwargs):
+            kwargs.pop("limits", None)
+            super().__init__(transport=transport, **kwargs)
+
+    monkeypatch.setattr(httpx, "AsyncClient", MockAsyncClient)
+
+    return openremote
+
+
+def manager(refresh_margin: int = 30) -> TokenManager:
+    return TokenManager(UrlBuilder("http://openremote.test"), "client", "secret", refresh_margin=refresh_margin)
+
+
+@pytest.mark.anyio
+async def test_concurrent_callers_share_a_refresh(openremote):
+    tokens = manager()
+
+    assert await asyncio.gather(*(tokens.get_token() for _ in range(10))) == ["t1"] * 10
+    assert openremote.tokens == 1
+
+    # Callers rejected with the same token also share the refresh
+    assert await asyncio.gather(*(tokens.refresh(stale_token="t1") for _ in range(10))) == ["t2"] * 10
+    assert openremote.tokens == 2
+
+    await tokens.aclose()
+
+
+@pytest.mark.anyio
+async def test_token_refreshed_in_the_background_before_it_expires(openremote, monkeypatch):
+    tokens = manager(refresh_margin=30)
+    clock = SimpleNamespace(now=1000.0)
+    delays = []
+
+    async def sleep(delay):
+        # Time passes instantly, until the background refresh is done
+        if tokens.refreshes >= 2:
+            await asyncio.Event().wait()
+        delays.append(delay)
+        clock.now += delay
+        await asyncio.sleep(0)
+
+    monkeypatch.setattr(token_manager, "time", SimpleNamespace(monotonic=lambda: clock.now, perf_counter=time.perf_counter))
+    monkeypatch.setattr(token_manager, "asyncio", SimpleNamespace(Lock=asyncio.Lock, create_task=asyncio.create_task, sleep=sleep))
+
+    assert await tokens.get_token() == "t1"
+    for _ in range(100):
+        if tokens.refreshes == 2:
+            break
+        await asyncio.sleep(0.01)
+
+    # Refreshed refresh_margin seconds ahead of the expiry of the 60 seconds token, without a caller asking for it
+    assert 30 in delays
+    assert openremote.tokens == 2
+    assert await tokens.get_token() == "t2"
+    assert openremote.tokens == 2
+
+    await tokens.aclose()
+
+
+@pytest.mark.anyio
+async def test_request_retried_once_with_a_fresh_token_on_401(openremote):
+    tokens = manager()
+    client = PooledHttpClient(UrlBuilder("http://openremote.test"), tokens)
+
+    await tokens.get_token()
+    # Revoked upstream, e.g. the manager restarted
+    openremote.tokens += 1
+
+    response = await client.get("/asset")
+
+    assert response.status_code == 200
+    assert openremote.requests == ["Bearer t1", "Bearer t3"]
+    assert openremote.tokens == 3
+
+    await tokens.aclose()
+
+
+@pytest.mark.anyio
+async def test_request_not_retried_twice_on_401(openremote):
+    tokens = manager()
+    client = PooledHttpClient(UrlBuilder("http://openremote.test"), tokens)
+    openremote.reject_all = True
+
+    response = await client.get("/asset")
+
+    assert response.status_code == 401
+    assert openremote.requests == ["Bearer t1", "Bearer t2"]
+
+    await tokens.aclose()
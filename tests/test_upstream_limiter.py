@@ -0,0 +1,150 @@
+import asyncio
+
+import httpx
+import pytest
+
+from services.upstream_limiter import AdaptiveLimiter, UpstreamLimiter, UpstreamOverloadedError
+
+
+@pytest.mark.anyio
+async def test_sessions_served_round_robin():
+    limiter = AdaptiveLimiter(1)
+    await limiter.acquire("holder", 1)
+    granted = []
+
+    async def wait(session: str, name: str):
+        await limiter.acquire(session, 1)
+        granted.append(name)
+
+    # A busy session queues up first, the other session still gets the second slot
+    waiters = [asyncio.create_task(wait(session, name)) for session, name in [("a", "a1"), ("a", "a2"), ("a", "a3"), ("b", "b1")]]
+    await asyncio.sleep(0)
+    assert limiter.queued == 4
+
+    for _ in waiters:
+        limiter.release()
+    await asyncio.gather(*waiters)
+
+    assert granted == ["a1", "b1", "a2", "a3"]
+
+
+@pytest.mark.anyio
+async def test_rejected_when_no_slot_frees_up_in_time():
+    limiter = UpstreamLimiter(max_concurrency=1, queue_timeout=0.01)
+    release = asyncio.Event()
+    sent = 0
+
+    async def send():
+        nonlocal sent
+        sent += 1
+        await release.wait()
+        return httpx.Response(200)
+
+    holder = asyncio.create_task(limiter.run("GET", "/asset/a1", send))
+    await asyncio.sleep(0)
+
+    with pytest.raises(UpstreamOverloadedError):
+        await limiter.run("GET", "/asset/a2", send)
+
+    release.set()
+    await holder
+    assert sent == 1
+    assert limiter.stats()["all"] == {
+        "limit": 1, "max_limit": 1, "in_flight": 0, "queued": 0, "rejected": 1, "decreases": 0,
+    }
+
+
+@pytest.mark.anyio
+async def test_cancelled_waiter_leaves_the_queue():
+    limiter = AdaptiveLimiter(1)
+    await limiter.acquire(None, 1)
+
+    waiter = asyncio.create_task(limiter.acquire(None, 1))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert limiter.queued == 0
+    limiter.release()
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.anyio
+async def test_waiter_cancelled_once_granted_releases_the_slot():
+    limiter = AdaptiveLimiter(1)
+    await limiter.acquire(None, 1)
+
+    waiter = asyncio.create_task(limiter.acquire(None, 1))
+    await asyncio.sleep(0)
+    # Granted, but cancelled before it got to run
+    limiter.release()
+    assert limiter.in_flight == 1
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert limiter.in_flight == 0
+    await asyncio.wait_for(limiter.acquire(None, 1), 1)
+
+
+@pytest.mark.anyio
+async def test_cancelled_holder_releases_the_slot():
+    limiter = UpstreamLimiter(max_concurrency=1, queue_timeout=1)
+    started = asyncio.Event()
+
+    async def hang():
+        started.set()
+        await asyncio.Event().wait()
+
+    async def ok():
+        return httpx.Response(200)
+
+    holder = asyncio.create_task(limiter.run("GET", "/asset/a1", hang))
+    await started.wait()
+    waiter = asyncio.create_task(limiter.run("GET", "/asset/a2", ok))
+    await asyncio.sleep(0)
+
+    holder.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await holder
+
+    assert (await waiter).status_code == 200
+    assert limiter.limiter.in_flight == 0
+
+
+def test_limit_decreases_on_slow_responses():
+    limiter = AdaptiveLimiter(10, latency_target=0.5)
+    limiter.in_flight = 3
+
+    limiter.release(latency=1.0)
+    assert limiter.limit == pytest.approx(9.0)
+    # Requests sent before the decrease report the same slowness, it's counted once
+    limiter.release(latency=1.0)
+    assert limiter.limit == pytest.approx(9.0)
+    assert limiter.decreases == 1
+
+    limiter.release(latency=0.1)
+    assert limiter.limit == pytest.approx(9.0 + 1 / 9.0)
+
+
+def test_limit_halves_on_overload():
+    limiter = AdaptiveLimiter(10, min_limit=4)
+    limiter.in_flight = 1
+
+    limiter.release(latency=0.1, overloaded=True)
+    assert limiter.limit == pytest.approx(5.0)
+    assert limiter.decreases == 1
+
+
+@pytest.mark.anyio
+async def test_limit_decreases_on_overloaded_responses():
+    limiter = UpstreamLimiter(max_concurrency=8, class_concurrency={"query": 4})
+
+    async def unavailable():
+        return httpx.Response(503)
+
+    await limiter.run("POST", "/asset/query", unavailable)
+
+    assert limiter.limiter.limit == pytest.approx(4.0)
+    assert limiter.class_limiters["query"].limit == pytest.approx(2.0)